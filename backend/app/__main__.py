@@ -1,19 +1,36 @@
+from contextlib import asynccontextmanager
 from pathlib import Path
 import os
 
 from fastapi import FastAPI, Request, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import JSONResponse, Response
 
+from . import config
 from .auth import get_current_user
-from .db import init_db
-from .routes import category_router, transaction_router, account_router, auth_router
+from .compression import APIGZipMiddleware, api_prefixes
+from .db import init_db, close_executor, close_pool, PoolTimeout
+from .etag import NotModified
+from .writer import close_writer
+from .passwords import PasswordPoolFull, close_password_pool
+from .static import mount_spa, reload_on_sighup
+from .routes import category_router, transaction_router, account_router, auth_router, metrics_router, report_router, sync_router
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    stop_reloading = reload_on_sighup(_spa) if _spa is not None else (lambda: None)
+    yield
+    stop_reloading()
+    close_writer()
+    close_password_pool()
+    close_executor()
+    close_pool()
 
 app = FastAPI(
     title="Financial Tracker",
     description="Track income and expenses with categories",
-    version="1.1.0"
+    version="1.1.0",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -29,6 +46,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.exception_handler(PoolTimeout)
+async def pool_timeout_handler(request: Request, exc: PoolTimeout) -> JSONResponse:
+    return JSONResponse(status_code=503, content={"detail": "Database busy, try again"}, headers={"Retry-After": "1"})
+
+@app.exception_handler(PasswordPoolFull)
+async def password_pool_full_handler(request: Request, exc: PasswordPoolFull) -> JSONResponse:
+    return JSONResponse(status_code=503, content={"detail": "Too many sign-ins in progress, try again"}, headers={"Retry-After": "1"})
+
+@app.exception_handler(NotModified)
+async def not_modified_handler(request: Request, exc: NotModified) -> Response:
+    return Response(status_code=304, headers=exc.headers)
+
 @app.exception_handler(Exception)
 async def unhandled_exception_handler(request: Request, exc: Exception) -> JSONResponse:
     return JSONResponse(status_code=500, content={"detail": f"Internal server error: {exc}"})
@@ -39,16 +68,21 @@ app.include_router(auth_router)
 app.include_router(category_router, dependencies=[Depends(get_current_user)])
 app.include_router(transaction_router, dependencies=[Depends(get_current_user)])
 app.include_router(account_router, dependencies=[Depends(get_current_user)])
+app.include_router(report_router, dependencies=[Depends(get_current_user)])
+app.include_router(sync_router, dependencies=[Depends(get_current_user)])
+app.include_router(metrics_router, dependencies=[Depends(get_current_user)])
+
+# The SPA catch-all serves its own precompressed files; only API paths are gzipped here.
+app.add_middleware(
+    APIGZipMiddleware,
+    prefixes=api_prefixes(
+        app, auth_router, category_router, transaction_router, account_router, report_router, sync_router, metrics_router,
+    ),
+    minimum_size=config.GZIP_MIN_SIZE,
+    compresslevel=config.GZIP_LEVEL,
+)
 
 _static_dir = os.environ.get("FT_STATIC_DIR") or str(Path(__file__).resolve().parents[2] / "frontend" / "dist")
 _static_path = Path(_static_dir)
 
-if _static_path.is_dir():
-    app.mount("/assets", StaticFiles(directory=str(_static_path / "assets")), name="assets")
-
-    @app.get("/{full_path:path}", include_in_schema=False)
-    async def serve_spa(full_path: str) -> FileResponse:
-        candidate = _static_path / full_path
-        if candidate.is_file():
-            return FileResponse(str(candidate))
-        return FileResponse(str(_static_path / "index.html"))
\ No newline at end of file
+_spa = mount_spa(app, _static_path) if _static_path.is_dir() else None
@@ -4,10 +4,16 @@ import bcrypt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlite3 import Connection
+from typing import AsyncContextManager, Callable
 import os
+import uuid
 
-from .db import get_connection
+from . import config
+from .db import get_checkout, run_db
+from .models.token import get_revoked_tokens
 from .models.user import get_user_by_username
+from .revocation import get_denylist
+from .usercache import get_user_cache
 
 SECRET_KEY = os.environ.get("SECRET_KEY", "dev-secret-change-in-production")
 ALGORITHM = "HS256"
@@ -16,7 +22,7 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 60
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token")
 
 def hash_password(plain: str) -> str:
-    return bcrypt.hashpw(plain.encode(), bcrypt.gensalt()).decode()
+    return bcrypt.hashpw(plain.encode(), bcrypt.gensalt(config.BCRYPT_ROUNDS)).decode()
 
 def verify_password(plain: str, hashed: str) -> bool:
     return bcrypt.checkpw(plain.encode(), hashed.encode())
@@ -25,12 +31,19 @@ def create_access_token(data: dict) -> str:
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode["exp"] = expire
+    # Lets a single token be revoked on logout (see revocation.py).
+    to_encode["jti"] = uuid.uuid4().hex
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
-def get_current_user(
+async def get_current_user(
         token: str = Depends(oauth2_scheme),
-        conn: Connection = Depends(get_connection)
+        checkout: Callable[[], AsyncContextManager[Connection]] = Depends(get_checkout),
     ):
+    # A cache hit does no database work at all; only a miss checks out a connection.
+    cache = get_user_cache()
+    user = cache.get(token)
+    if user is not None:
+        return user
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -43,7 +56,17 @@ def get_current_user(
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-    user = get_user_by_username(username, conn)
-    if user is None:
+    async with checkout() as conn:
+        denylist = get_denylist()
+        if not denylist.loaded:
+            denylist.load(await run_db(get_revoked_tokens, conn))
+        # Taken before the revocation check so a logout racing this lookup keeps it out of the cache.
+        generation = cache.generation()
+        if denylist.is_revoked(payload.get("jti")):
+            raise credentials_exception
+        row = await run_db(get_user_by_username, username, conn)
+    if row is None:
         raise credentials_exception
+    user = {"id": row["id"], "username": row["username"]}
+    cache.put(token, user, payload["exp"], generation)
     return user
\ No newline at end of file
@@ -0,0 +1,198 @@
+"""
+Per-user read-through cache for serialized list and report responses.
+
+Entries are serialized bodies keyed by (user_id, resource, key), where resource is
+"transactions", "accounts", "categories" or "reports" and key identifies the
+endpoint and its parameters. Eviction is LRU, bounded by total body bytes and
+entry count; a body larger than a quarter of the byte budget is not stored.
+
+Each (user, resource) pair has a generation number, and every key carries
+the generation it was read at. Model-layer write functions commit through
+commit(), which bumps the generation of only the resources their write
+affects (dropping those entries) both before and after the commit, and
+refuses stores in between. So:
+
+- a write to transactions leaves the user's cached categories untouched;
+- a reader that sees the new data version (and so the new ETag) can only
+  find entries loaded after the commit;
+- a slow read that started before a write can never re-cache the data that
+  write replaced.
+
+The user's data version itself is only used for the ETag (etag.py).
+
+The cache lives in this process only. Writes from other processes (e.g.
+`cli reconcile --fix`) do not invalidate it; restart the server after them.
+"""
+import threading
+from collections import OrderedDict
+from sqlite3 import Connection
+from typing import Any, Awaitable, Callable, Hashable
+
+from fastapi import Response
+
+from . import config
+
+_COUNTERS = ("hits", "misses", "stores", "skipped", "evictions", "invalidations")
+
+
+class ResponseCache:
+    def __init__(self, max_bytes: int = config.CACHE_MAX_BYTES, max_entries: int = config.CACHE_MAX_ENTRIES) -> None:
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple, bytes] = OrderedDict()
+        self._index: dict[tuple[int, str], set[tuple]] = {}
+        self._generations: dict[tuple[int, str], int] = {}
+        # (user, resource) -> writes currently between begin_write and end_write.
+        self._writing: dict[tuple[int, str], int] = {}
+        self._bytes = 0
+        self._stats = dict.fromkeys(_COUNTERS, 0)
+
+    def generation(self, user_id: int, resource: str) -> int:
+        with self._lock:
+            return self._generations.get((user_id, resource), 0)
+
+    def get(self, user_id: int, resource: str, key: Hashable) -> bytes | None:
+        with self._lock:
+            body = self._entries.get((user_id, resource, key))
+            if body is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end((user_id, resource, key))
+            self._stats["hits"] += 1
+            return body
+
+    def put(self, user_id: int, resource: str, key: Hashable, body: bytes, generation: int) -> bool:
+        """Store a body read at `generation`; refused if the resource was invalidated since or is being written."""
+        with self._lock:
+            if (
+                self._generations.get((user_id, resource), 0) != generation
+                or (user_id, resource) in self._writing
+                or len(body) > self.max_bytes // 4
+            ):
+                self._stats["skipped"] += 1
+                return False
+            full_key = (user_id, resource, key)
+            self._discard(full_key)
+            self._entries[full_key] = body
+            self._index.setdefault((user_id, resource), set()).add(full_key)
+            self._bytes += len(body)
+            self._stats["stores"] += 1
+            while self._entries and (self._bytes > self.max_bytes or len(self._entries) > self.max_entries):
+                self._discard(next(iter(self._entries)))
+                self._stats["evictions"] += 1
+            return True
+
+    def invalidate(self, user_id: int, *resources: str) -> None:
+        """Drop the user's cached responses for the given resources."""
+        with self._lock:
+            self._invalidate(user_id, resources)
+
+    def begin_write(self, user_id: int, *resources: str) -> None:
+        """Invalidate `resources` and refuse to store them until end_write()."""
+        with self._lock:
+            for resource in resources:
+                self._writing[(user_id, resource)] = self._writing.get((user_id, resource), 0) + 1
+            self._invalidate(user_id, resources)
+
+    def end_write(self, user_id: int, *resources: str) -> None:
+        """Invalidate `resources` again once the write has committed (or failed)."""
+        with self._lock:
+            for resource in resources:
+                pending = self._writing.pop((user_id, resource), 0) - 1
+                if pending > 0:
+                    self._writing[(user_id, resource)] = pending
+            self._invalidate(user_id, resources)
+
+    def _invalidate(self, user_id: int, resources: tuple[str, ...]) -> None:
+        for resource in resources:
+            self._generations[(user_id, resource)] = self._generations.get((user_id, resource), 0) + 1
+            for full_key in list(self._index.get((user_id, resource), ())):
+                self._discard(full_key)
+        self._stats["invalidations"] += 1
+
+    def _discard(self, full_key: tuple) -> None:
+        body = self._entries.pop(full_key, None)
+        if body is None:
+            return
+        self._bytes -= len(body)
+        keys = self._index.get(full_key[:2])
+        if keys is not None:
+            keys.discard(full_key)
+            if not keys:
+                del self._index[full_key[:2]]
+
+    def clear(self) -> None:
+        """Drop every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._index.clear()
+            self._generations.clear()
+            self._writing.clear()
+            self._bytes = 0
+            self._stats = dict.fromkeys(_COUNTERS, 0)
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update(entries=len(self._entries), bytes=self._bytes,
+                         max_bytes=self.max_bytes, max_entries=self.max_entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+
+_cache: ResponseCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> ResponseCache:
+    """Return the process-wide response cache."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache()
+    return _cache
+
+
+def invalidate(user_id: int, *resources: str) -> None:
+    """Drop the user's cached responses for `resources`."""
+    get_cache().invalidate(user_id, *resources)
+
+
+def commit(conn: Connection, user_id: int, *resources: str) -> None:
+    """Commit a write that changed the user's `resources`, invalidating their cached responses around it."""
+    cache = get_cache()
+    cache.begin_write(user_id, *resources)
+    try:
+        conn.commit()
+    finally:
+        cache.end_write(user_id, *resources)
+
+
+async def read_through(
+    response: Response,
+    user_id: int,
+    resource: str,
+    key: Hashable,
+    load: Callable[[], Awaitable[Any]],
+    serialize: Callable[[Any], bytes],
+    media_type: str = "application/json",
+) -> Response:
+    """
+    Serve a cached body, or await `load()`, serialize it and cache it.
+    The key must include anything that changes the bytes, such as the media
+    type. Headers set on `response` by dependencies (e.g. ETag) are carried
+    over to the returned Response.
+    """
+    cache = get_cache()
+    generation = cache.generation(user_id, resource)
+    key = (generation, key)
+    body = cache.get(user_id, resource, key)
+    if body is None:
+        body = serialize(await load())
+        cache.put(user_id, resource, key, body, generation)
+    result = Response(content=body, media_type=media_type)
+    result.headers.raw.extend(response.headers.raw)
+    return result
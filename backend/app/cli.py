@@ -0,0 +1,112 @@
+"""
+Maintenance commands.
+
+Run from the project root:
+    python -m backend.app.cli rollup rebuild [--user ID] [--verify]
+    python -m backend.app.cli rollup verify [--user ID]
+    python -m backend.app.cli reconcile [--user ID] [--fix]
+
+Commands open their own connection to DB_PATH (migrating it first) and are
+safe to run next to a live server: writes happen in one BEGIN IMMEDIATE
+transaction, so they serialise with the app's writer, and reconcile reads
+through a separate read-only connection that never blocks it.
+"""
+import argparse
+import sys
+import time
+
+from .db import DB_PATH, connect
+from .migrations import migrate
+from .models.reconcile import find_balance_drift, fix_balance_drift
+from .models.rollup import rebuild_rollup, verify_rollup
+
+
+def _rollup_verify(conn, user_id: int | None) -> int:
+    mismatches = verify_rollup(conn, user_id)
+    for m in mismatches:
+        print(
+            f"  mismatch user={m['user_id']} month={m['month']} type={m['type']} "
+            f"category={m['category_id']} account={m['account_id']}: "
+            f"expected {m['expected_total']}/{m['expected_count']}, "
+            f"stored {m['stored_total']}/{m['stored_count']}"
+        )
+    print(f"rollup verify: {len(mismatches)} mismatching key(s)")
+    return 1 if mismatches else 0
+
+
+def _rollup_rebuild(conn, user_id: int | None, verify: bool) -> int:
+    started = time.monotonic()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        rows = rebuild_rollup(conn, user_id)
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+    print(f"rollup rebuild: {rows} row(s) written in {time.monotonic() - started:.2f}s")
+    return _rollup_verify(conn, user_id) if verify else 0
+
+
+def _reconcile(conn, path: str, user_id: int | None, fix: bool) -> int:
+    reader = connect(path, readonly=True)
+    try:
+        report = find_balance_drift(reader, user_id)
+    finally:
+        reader.close()
+    for d in report.drift:
+        edited = f"; {d['adjustments']:+d} set directly, {d['unexplained']:+d} unexplained" if d["adjustments"] else ""
+        print(
+            f"  drift account={d['account_id']} user={d['user_id']} ({d['name']}): "
+            f"balance {d['balance']}, ledger implies {d['implied']} ({d['difference']:+d}){edited}"
+        )
+    print(
+        f"reconcile: {report.accounts} account(s), {report.transactions} transaction(s) in "
+        f"{report.seconds:.2f}s ({report.rows_per_second:,.0f} rows/s); {len(report.drift)} drifted"
+    )
+    if not report.drift:
+        return 0
+    if not fix:
+        return 1
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        fixed = fix_balance_drift(conn, [d["account_id"] for d in report.drift])
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+    print(f"reconcile: fixed {fixed} account(s)")
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m backend.app.cli")
+    parser.add_argument("--db", default=DB_PATH, help="database path (default: %(default)s)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rollup = commands.add_parser("rollup", help="monthly_totals maintenance")
+    rollup_actions = rollup.add_subparsers(dest="action", required=True)
+    rebuild = rollup_actions.add_parser("rebuild", help="recompute monthly_totals from the ledger")
+    rebuild.add_argument("--user", type=int, help="only this user id")
+    rebuild.add_argument("--verify", action="store_true", help="verify the result afterwards")
+    verify = rollup_actions.add_parser("verify", help="compare monthly_totals with the ledger")
+    verify.add_argument("--user", type=int, help="only this user id")
+
+    reconcile = commands.add_parser("reconcile", help="check accounts.balance against the ledger")
+    reconcile.add_argument("--user", type=int, help="only this user id")
+    reconcile.add_argument("--fix", action="store_true", help="reset drifted balances to the ledger value")
+
+    args = parser.parse_args(argv)
+    conn = connect(args.db)
+    try:
+        migrate(conn)
+        if args.command == "reconcile":
+            return _reconcile(conn, args.db, args.user, args.fix)
+        if args.action == "rebuild":
+            return _rollup_rebuild(conn, args.user, args.verify)
+        return _rollup_verify(conn, args.user)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,49 @@
+"""
+Gzip for API responses.
+
+Starlette's GZipMiddleware would also wrap the SPA, which already picks a
+precompressed variant per request (static.py): files without a sibling would
+be gzipped again on every request under the identity variant's ETag. So the
+middleware only sees paths under the API's own prefixes: the first path
+segment of every router's routes, plus the OpenAPI and docs URLs.
+
+A body gzipped here is a different representation from the identity one, so
+its ETag is weakened (W/"..."). If-None-Match compares weakly (etag.py), so
+either form still revalidates to a 304.
+"""
+from fastapi import APIRouter, FastAPI
+from starlette.datastructures import MutableHeaders
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+def api_prefixes(app: FastAPI, *routers: APIRouter) -> tuple[str, ...]:
+    """First path segment of every route in `routers` and of the docs URLs, e.g. ("/accounts", "/docs", ...)."""
+    paths = [route.path for router in routers for route in router.routes]
+    paths += [url for url in (app.openapi_url, app.docs_url, app.redoc_url) if url]
+    return tuple(sorted({"/" + path.lstrip("/").split("/", 1)[0] for path in paths}))
+
+
+class APIGZipMiddleware:
+    def __init__(self, app: ASGIApp, prefixes: tuple[str, ...], minimum_size: int, compresslevel: int) -> None:
+        self.app = app
+        self.prefixes = prefixes
+        self.gzip = GZipMiddleware(app, minimum_size=minimum_size, compresslevel=compresslevel)
+
+    def _is_api(self, path: str) -> bool:
+        return any(path == prefix or path.startswith(prefix + "/") for prefix in self.prefixes)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._is_api(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_weak_etag(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/") and headers.get("content-encoding") == "gzip":
+                    headers["ETag"] = f"W/{etag}"
+            await send(message)
+
+        await self.gzip(scope, receive, send_weak_etag)
@@ -5,6 +5,67 @@ import os
 from pathlib import Path
 
 
+def _env_int(name: str, default: int) -> int:
+    """Read an integer setting from the environment, falling back to default."""
+    value = os.environ.get(name)
+    return int(value) if value not in (None, "") else default
+
+
+def _env_float(name: str, default: float) -> float:
+    """Read a float setting from the environment, falling back to default."""
+    value = os.environ.get(name)
+    return float(value) if value not in (None, "") else default
+
+
+# ── SQLite connection pool ───────────────────────────────────────────────────
+# Every pooled connection is configured once with these pragmas when it is
+# opened, instead of on every request.
+DB_POOL_SIZE = _env_int("FT_DB_POOL_SIZE", 8)
+DB_POOL_TIMEOUT = _env_float("FT_DB_POOL_TIMEOUT", 5.0)            # seconds to wait for a free connection
+DB_POOL_RECYCLE = _env_float("FT_DB_POOL_RECYCLE", 3600.0)         # seconds before a connection is reopened
+DB_BUSY_TIMEOUT_MS = _env_int("FT_DB_BUSY_TIMEOUT_MS", 5000)
+DB_SYNCHRONOUS = os.environ.get("FT_DB_SYNCHRONOUS", "NORMAL").upper()
+DB_CACHE_SIZE_KIB = _env_int("FT_DB_CACHE_SIZE_KIB", 8192)         # page cache per connection
+DB_MMAP_SIZE = _env_int("FT_DB_MMAP_SIZE", 64 * 1024 * 1024)       # bytes
+DB_TEMP_STORE = os.environ.get("FT_DB_TEMP_STORE", "MEMORY").upper()
+# Threads reserved for blocking SQLite calls made from async handlers.
+DB_THREADS = _env_int("FT_DB_THREADS", DB_POOL_SIZE)
+
+# ── Single writer ────────────────────────────────────────────────────────────
+# All writes are funnelled through one thread; submitters wait up to
+# DB_POOL_TIMEOUT for a queue slot before getting a 503.
+DB_WRITE_QUEUE_SIZE = _env_int("FT_DB_WRITE_QUEUE_SIZE", 1000)
+
+# ── Statement import ─────────────────────────────────────────────────────────
+# Rows committed per writer transaction while importing a bank statement.
+IMPORT_CHUNK_SIZE = _env_int("FT_IMPORT_CHUNK_SIZE", 500)
+
+# ── Response cache ───────────────────────────────────────────────────────────
+# Per-user cache of serialized list/report responses; 0 bytes disables it.
+CACHE_MAX_BYTES = _env_int("FT_CACHE_MAX_BYTES", 16 * 1024 * 1024)
+CACHE_MAX_ENTRIES = _env_int("FT_CACHE_MAX_ENTRIES", 10000)
+
+# ── Password hashing ─────────────────────────────────────────────────────────
+# bcrypt runs in a process pool; once every worker is busy and QUEUE_SIZE more
+# jobs are waiting, further logins/registrations get a 503. Changing ROUNDS
+# re-hashes each stored password on its owner's next login.
+BCRYPT_ROUNDS = _env_int("FT_BCRYPT_ROUNDS", 12)
+PASSWORD_WORKERS = _env_int("FT_PASSWORD_WORKERS", max(1, (os.cpu_count() or 2) // 2))
+PASSWORD_QUEUE_SIZE = _env_int("FT_PASSWORD_QUEUE_SIZE", 32)
+
+# ── Authenticated users ──────────────────────────────────────────────────────
+# Bearer token -> user, so protected requests skip the JWT decode and the users
+# lookup; 0 seconds disables it.
+AUTH_CACHE_TTL = _env_float("FT_AUTH_CACHE_TTL", 60.0)
+AUTH_CACHE_MAX_ENTRIES = _env_int("FT_AUTH_CACHE_MAX_ENTRIES", 10000)
+
+# ── Compression ──────────────────────────────────────────────────────────────
+# API responses at least this large are gzipped for clients that accept it.
+# Static assets are precompressed at build time and never compressed here.
+GZIP_MIN_SIZE = _env_int("FT_GZIP_MIN_SIZE", 1024)
+GZIP_LEVEL = _env_int("FT_GZIP_LEVEL", 6)
+
+
 def load_config(app) -> None:
     """Load config into app.config from env and instance."""
     app.config["SECRET_KEY"] = os.environ.get("SECRET_KEY", "dev-secret-change-in-production")
@@ -1,69 +1,312 @@
+import asyncio
+import functools
+import queue
 import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Generator
+from typing import Any, AsyncContextManager, AsyncGenerator, AsyncIterator, Callable, TypeVar
+from weakref import WeakKeyDictionary
 import os
 
+from . import config
+from .migrations import migrate
+
 _data_dir = Path(os.environ.get("FT_DATA_DIR") or Path(__file__).resolve().parents[2] / "instance")
 _data_dir.mkdir(parents=True, exist_ok=True)
 DB_PATH = str(_data_dir / "app.db")
 
-def get_connection() -> Generator[sqlite3.Connection, None, None]:
-    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+T = TypeVar("T")
+
+_SYNCHRONOUS_MODES = {"OFF", "NORMAL", "FULL", "EXTRA"}
+_TEMP_STORE_MODES = {"DEFAULT", "FILE", "MEMORY"}
+
+
+class PoolTimeout(Exception):
+    """Raised when no pooled connection becomes free within the checkout timeout."""
+
+
+def connect(path: str = DB_PATH, readonly: bool = False) -> sqlite3.Connection:
+    """
+    Open a connection with the per-connection pragmas from config applied once.
+    With readonly=True the file is opened in read-only mode (for batch jobs
+    that must never take the write lock) and the journal mode is left as is.
+    """
+    if config.DB_SYNCHRONOUS not in _SYNCHRONOUS_MODES:
+        raise ValueError(f"Invalid FT_DB_SYNCHRONOUS: {config.DB_SYNCHRONOUS!r}")
+    if config.DB_TEMP_STORE not in _TEMP_STORE_MODES:
+        raise ValueError(f"Invalid FT_DB_TEMP_STORE: {config.DB_TEMP_STORE!r}")
+    if readonly:
+        conn = sqlite3.connect(
+            f"{Path(path).resolve().as_uri()}?mode=ro", uri=True,
+            check_same_thread=False, timeout=config.DB_BUSY_TIMEOUT_MS / 1000,
+        )
+    else:
+        conn = sqlite3.connect(path, check_same_thread=False, timeout=config.DB_BUSY_TIMEOUT_MS / 1000)
     conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA journal_mode=WAL")
-    try:
-        yield conn
-    finally:
-        conn.close()
+    if not readonly:
+        conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(f"PRAGMA synchronous={config.DB_SYNCHRONOUS}")
+    conn.execute(f"PRAGMA cache_size={-int(config.DB_CACHE_SIZE_KIB)}")
+    conn.execute(f"PRAGMA mmap_size={int(config.DB_MMAP_SIZE)}")
+    conn.execute(f"PRAGMA temp_store={config.DB_TEMP_STORE}")
+    conn.execute(f"PRAGMA busy_timeout={int(config.DB_BUSY_TIMEOUT_MS)}")
+    return conn
+
+
+class ConnectionPool:
+    """
+    Bounded pool of pre-configured SQLite connections.
+
+    At most `size` connections are checked out at once; callers beyond that
+    wait up to `timeout` seconds and then get PoolTimeout. Idle connections
+    are health-checked on checkout and reopened after `recycle` seconds.
+    """
+
+    def __init__(
+        self,
+        path: str = DB_PATH,
+        size: int = config.DB_POOL_SIZE,
+        timeout: float = config.DB_POOL_TIMEOUT,
+        recycle: float = config.DB_POOL_RECYCLE,
+    ) -> None:
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+        self.path = path
+        self.size = size
+        self.timeout = timeout
+        self.recycle = recycle
+        self._slots = threading.BoundedSemaphore(size)
+        # LIFO so the most recently used (warmest) connection is reused first.
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._opened_at: dict[int, float] = {}
+        self._lock = threading.Lock()
+        # Per event loop: async callers wait here, not on a thread in acquire().
+        self._gates: WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore] = WeakKeyDictionary()
+        self._closed = False
+        self._stats = {
+            "checkouts": 0,
+            "timeouts": 0,
+            "opened": 0,
+            "discarded": 0,
+            "wait_seconds_total": 0.0,
+            "wait_seconds_max": 0.0,
+        }
+
+    def _open(self) -> sqlite3.Connection:
+        conn = connect(self.path)
+        with self._lock:
+            self._opened_at[id(conn)] = time.monotonic()
+            self._stats["opened"] += 1
+        return conn
 
-def init_db():
-    conn = sqlite3.connect(DB_PATH)
-    conn.executescript(
+    def _discard(self, conn: sqlite3.Connection) -> None:
+        with self._lock:
+            self._opened_at.pop(id(conn), None)
+            self._stats["discarded"] += 1
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+    def _is_healthy(self, conn: sqlite3.Connection) -> bool:
+        opened_at = self._opened_at.get(id(conn))
+        if opened_at is None or time.monotonic() - opened_at > self.recycle:
+            return False
+        try:
+            conn.execute("SELECT 1").fetchone()
+        except sqlite3.Error:
+            return False
+        return True
+
+    def gate(self) -> asyncio.Semaphore:
         """
-        CREATE TABLE IF NOT EXISTS categories (
-            id      INTEGER PRIMARY KEY AUTOINCREMENT,
-            name    TEXT NOT NULL UNIQUE
-        );
-        CREATE TABLE IF NOT EXISTS transactions (
-            id           INTEGER PRIMARY KEY AUTOINCREMENT,
-            type         TEXT NOT NULL CHECK (type IN ('income', 'expense')),
-            amount_cents INTEGER NOT NULL,
-            date         TEXT NOT NULL,
-            note         TEXT,
-            category_id  INTEGER REFERENCES categories(id)
-        );
-        CREATE TABLE IF NOT EXISTS accounts (
-            id      INTEGER PRIMARY KEY AUTOINCREMENT,
-            type    TEXT NOT NULL CHECK (type IN ('ewallet', 'bank')),
-            name    TEXT NOT NULL,
-            balance INTEGER NOT NULL
-        );
-        CREATE TABLE IF NOT EXISTS users (
-            id              INTEGER PRIMARY KEY AUTOINCREMENT,
-            username        TEXT NOT NULL UNIQUE,
-            hashed_password TEXT NOT NULL
-        );
+        Semaphore with one permit per connection for the running event loop.
+
+        Async callers take a permit before calling acquire() on an executor
+        thread, so that call never blocks: waiting happens on the loop, and
+        the threads stay free to run queries for requests that already hold
+        a connection.
         """
-    )
-
-    migrations = [
-        ("categories",   "user_id INTEGER REFERENCES users(id)"),
-        ("transactions", "user_id INTEGER REFERENCES users(id)"),
-        ("accounts",     "user_id INTEGER REFERENCES users(id)"),
-        ("transactions", "account_id INTEGER REFERENCES accounts(id)"),
-        ("accounts",     "balance INTEGER NOT NULL DEFAULT 0"),
-        ("categories",   "type TEXT NOT NULL DEFAULT 'expense'"),
-        ("categories",   "icon TEXT NOT NULL DEFAULT ''"),
-        ("categories",   "color TEXT NOT NULL DEFAULT 'amber'"),
-        ("accounts",     "icon TEXT NOT NULL DEFAULT ''"),
-        ("accounts",     "currency TEXT NOT NULL DEFAULT 'IDR'"),
-    ]
-    for table, column_def in migrations:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            gate = self._gates.get(loop)
+            if gate is None:
+                gate = self._gates[loop] = asyncio.Semaphore(self.size)
+        return gate
+
+    def _timed_out(self, wait: float) -> PoolTimeout:
+        with self._lock:
+            self._stats["timeouts"] += 1
+        return PoolTimeout(f"No database connection available within {wait:g}s")
+
+    def acquire(self, timeout: float | None = None, started: float | None = None) -> sqlite3.Connection:
+        """
+        Check out a connection, waiting up to `timeout` seconds for a free slot.
+        `started` is when the caller began waiting, if earlier than this call.
+        """
+        if self._closed:
+            raise RuntimeError("Connection pool is closed")
+        wait = self.timeout if timeout is None else timeout
+        started = time.monotonic() if started is None else started
+        if not self._slots.acquire(timeout=wait):
+            raise self._timed_out(wait)
         try:
-            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column_def}")
-            conn.commit()
-        except sqlite3.OperationalError:
-            pass
+            while True:
+                try:
+                    conn = self._idle.get_nowait()
+                except queue.Empty:
+                    conn = self._open()
+                    break
+                if self._is_healthy(conn):
+                    break
+                self._discard(conn)
+        except BaseException:
+            self._slots.release()
+            raise
+        waited = time.monotonic() - started
+        with self._lock:
+            self._stats["checkouts"] += 1
+            self._stats["wait_seconds_total"] += waited
+            self._stats["wait_seconds_max"] = max(self._stats["wait_seconds_max"], waited)
+        return conn
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        """Return a connection to the pool, rolling back anything left uncommitted."""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            self._discard(conn)
+        else:
+            if self._closed:
+                self._discard(conn)
+            else:
+                self._idle.put(conn)
+        finally:
+            self._slots.release()
+
+    def stats(self) -> dict:
+        """Snapshot of pool size, utilisation and checkout wait times."""
+        with self._lock:
+            stats = dict(self._stats)
+            open_connections = len(self._opened_at)
+        idle = self._idle.qsize()
+        stats.update(
+            size=self.size,
+            open=open_connections,
+            idle=idle,
+            in_use=open_connections - idle,
+        )
+        checkouts = stats["checkouts"]
+        stats["wait_seconds_avg"] = stats["wait_seconds_total"] / checkouts if checkouts else 0.0
+        return stats
+
+    def close(self) -> None:
+        """Close every idle connection; checked-out ones are closed on release."""
+        self._closed = True
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
 
-    conn.commit()
-    conn.close()
+
+_pool: ConnectionPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """Return the process-wide pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool()
+    return _pool
+
+
+def close_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=config.DB_THREADS, thread_name_prefix="db")
+    return _executor
+
+
+def close_executor() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
+
+
+async def run_db(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run blocking SQLite work off the event loop.
+
+    Calls go to a dedicated executor capped at FT_DB_THREADS, so database
+    work never occupies Starlette's shared threadpool and in-flight requests
+    just await a slot instead of holding a thread each.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), functools.partial(fn, *args, **kwargs))
+
+
+@asynccontextmanager
+async def checkout() -> AsyncIterator[sqlite3.Connection]:
+    """Hold a pooled connection for the duration of an `async with` block."""
+    pool = get_pool()
+    gate = pool.gate()
+    started = time.monotonic()
+    try:
+        await asyncio.wait_for(gate.acquire(), pool.timeout)
+    except asyncio.TimeoutError:
+        raise pool._timed_out(pool.timeout) from None
+    try:
+        conn = await run_db(pool.acquire, None, started)
+        try:
+            yield conn
+        finally:
+            pool.release(conn)
+    finally:
+        gate.release()
+
+
+async def get_connection() -> AsyncGenerator[sqlite3.Connection, None]:
+    async with checkout() as conn:
+        yield conn
+
+
+def get_checkout() -> Callable[[], AsyncContextManager[sqlite3.Connection]]:
+    """
+    Dependency for code that only sometimes needs the database (e.g. a cache
+    miss): returns checkout itself, so no connection is taken until it is used.
+    """
+    return checkout
+
+
+def init_db() -> None:
+    """Apply pending schema migrations; a no-op single read when up to date."""
+    conn = connect(DB_PATH)
+    try:
+        migrate(conn)
+    finally:
+        conn.close()
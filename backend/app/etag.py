@@ -0,0 +1,85 @@
+"""
+Conditional GET for the list endpoints.
+
+The ETag of a list response is derived from the user's data version
+(models/version.py), which every write bumps. The `list_etag` dependency
+reads that version — one primary-key lookup — before the route body runs; if
+the client's If-None-Match still matches, NotModified short-circuits to a 304
+without running the list query or serializing anything.
+
+The version is read before the list query, so a concurrent write can only
+make a response newer than its tag (costing one extra 200 later), never
+older.
+"""
+from sqlite3 import Connection
+
+from fastapi import Depends, Request, Response
+
+from .auth import get_current_user
+from .db import get_connection, run_db
+from .formats import JSON, response_format
+from .models.version import get_version
+
+CACHE_CONTROL = "private, no-cache"
+
+
+class NotModified(Exception):
+    """Raised by list_etag when the client's cached representation is current."""
+
+    def __init__(self, etag: str, vary: str | None = None) -> None:
+        super().__init__(etag)
+        self.etag = etag
+        self.vary = vary
+
+    @property
+    def headers(self) -> dict[str, str]:
+        headers = {"ETag": self.etag, "Cache-Control": CACHE_CONTROL}
+        if self.vary:
+            headers["Vary"] = self.vary
+        return headers
+
+
+def _matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def _check(request: Request, response: Response, etag: str, vary: str | None = None) -> str:
+    if _matches(request.headers.get("if-none-match"), etag):
+        raise NotModified(etag, vary)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    if vary:
+        response.headers["Vary"] = vary
+    return etag
+
+
+async def data_version(
+    conn: Connection = Depends(get_connection),
+    current_user=Depends(get_current_user),
+) -> int:
+    """The user's data version; FastAPI runs this once per request however many dependants use it."""
+    return await run_db(get_version, current_user["id"], conn)
+
+
+async def list_etag(
+    request: Request,
+    response: Response,
+    version: int = Depends(data_version),
+    current_user=Depends(get_current_user),
+) -> str:
+    return _check(request, response, f'"{current_user["id"]}-{version}"')
+
+
+async def format_etag(
+    request: Request,
+    response: Response,
+    media_type: str = Depends(response_format),
+    version: int = Depends(data_version),
+    current_user=Depends(get_current_user),
+) -> str:
+    """list_etag for endpoints that negotiate their representation: the tag names the format."""
+    suffix = "" if media_type == JSON else f"-{media_type.rsplit('/', 1)[1]}"
+    return _check(request, response, f'"{current_user["id"]}-{version}{suffix}"', vary="Accept")
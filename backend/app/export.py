@@ -0,0 +1,61 @@
+"""
+Transaction export encoders.
+
+The export route pulls rows from an open cursor with fetchmany() and passes
+each batch through one of these encoders, so only one batch is ever held in
+memory whatever the size of the ledger. `columns` is also the payload of the
+columnar list format (see formats.py).
+"""
+import csv
+import io
+import json
+from typing import Sequence
+
+EXPORT_COLUMNS = ("id", "type", "amount_cents", "date", "note", "category_id", "account_id")
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+    "columnar": "application/x-ndjson",
+}
+
+TYPE_DICTIONARY = ("income", "expense")
+_TYPE_CODES = {name: code for code, name in enumerate(TYPE_DICTIONARY)}
+
+
+def csv_header() -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(EXPORT_COLUMNS)
+    return buffer.getvalue()
+
+
+def csv_batch(rows: Sequence[Sequence]) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue()
+
+
+def ndjson_batch(rows: Sequence[Sequence]) -> str:
+    return "".join(
+        json.dumps(dict(zip(EXPORT_COLUMNS, row)), ensure_ascii=False, separators=(",", ":")) + "\n"
+        for row in rows
+    )
+
+
+def columns(rows: Sequence[Sequence]) -> dict:
+    """
+    One array per EXPORT_COLUMNS field for rows in that column order, with
+    `type` dictionary-encoded as indexes into TYPE_DICTIONARY.
+    """
+    fields = [list(values) for values in zip(*rows)] if rows else [[] for _ in EXPORT_COLUMNS]
+    payload = {"count": len(rows)}
+    for name, values in zip(EXPORT_COLUMNS, fields):
+        if name == "type":
+            values = {"dictionary": list(TYPE_DICTIONARY), "codes": [_TYPE_CODES[value] for value in values]}
+        payload[name] = values
+    return payload
+
+
+def columnar_batch(rows: Sequence[Sequence]) -> str:
+    """One NDJSON line holding the batch in columnar form."""
+    return json.dumps(columns(rows), ensure_ascii=False, separators=(",", ":")) + "\n"
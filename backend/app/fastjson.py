@@ -0,0 +1,31 @@
+"""
+Fast JSON for the read endpoints.
+
+List routes turn SQLite row tuples straight into dicts keyed by the response
+schema's field names and encode them with orjson, instead of building a
+Pydantic model per row and having FastAPI validate and re-serialize it. The
+bytes are identical to what the schema would produce (compact separators,
+UTF-8, same escaping); tests/test_fastjson.py holds both paths to that.
+
+orjson is optional: without it the stdlib encoder, configured to the same
+output, is used.
+"""
+import json
+from typing import Any, Iterable, Sequence
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+def dumps(obj: Any) -> bytes:
+    """Compact UTF-8 JSON, byte-for-byte what Pydantic's dump_json emits for the same data."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), allow_nan=False).encode()
+
+
+def records(rows: Iterable[Sequence], fields: Sequence[str]) -> list[dict]:
+    """Rows whose values are in `fields` order, as dicts in that key order."""
+    return [dict(zip(fields, row)) for row in rows]
@@ -0,0 +1,78 @@
+"""
+Content negotiation for transaction lists.
+
+`GET /transactions/` picks its representation from the Accept header:
+
+- application/json (default): one object per transaction.
+- application/vnd.financialtracker.columnar+json: one array per field
+  (export.columns), so key names are sent once instead of once per row.
+- application/msgpack: the same columnar payload as MessagePack. `msgpack`
+  is in requirements.txt; if it is missing anyway that type is simply not
+  offered.
+
+Columnar payloads are built straight from the query's row tuples, never
+through a per-row Pydantic model.
+"""
+import json
+
+from fastapi import HTTPException, Request
+
+try:
+    import msgpack
+except ImportError:  # not installed; MSGPACK is not offered
+    msgpack = None
+
+JSON = "application/json"
+COLUMNAR = "application/vnd.financialtracker.columnar+json"
+MSGPACK = "application/msgpack"
+
+_ALIASES = {"application/x-msgpack": MSGPACK}
+
+
+def available() -> tuple[str, ...]:
+    """Media types this server can produce, in order of preference."""
+    return (JSON, COLUMNAR, MSGPACK) if msgpack is not None else (JSON, COLUMNAR)
+
+
+def negotiate(accept: str | None) -> str | None:
+    """Best available media type for an Accept header, or None if none is acceptable."""
+    offered = available()
+    if not accept:
+        return JSON
+    best, best_q = None, 0.0
+    for part in accept.split(","):
+        media, *params = (piece.strip() for piece in part.split(";"))
+        media = _ALIASES.get(media.lower(), media.lower())
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if media in ("*/*", "application/*"):
+            candidate = JSON
+        elif media in offered:
+            candidate = media
+        else:
+            continue
+        # Ties go to the earlier (preferred) type in `offered`.
+        if q > best_q or (q == best_q and best is not None and offered.index(candidate) < offered.index(best)):
+            best, best_q = candidate, q
+    return best
+
+
+async def response_format(request: Request) -> str:
+    """Dependency: the negotiated media type; 406 if nothing offered is acceptable."""
+    media_type = negotiate(request.headers.get("accept"))
+    if media_type is None:
+        raise HTTPException(status_code=406, detail=f"Supported media types: {', '.join(available())}")
+    return media_type
+
+
+def encode(payload: dict, media_type: str) -> bytes:
+    """Serialize a columnar payload as `media_type` (COLUMNAR or MSGPACK)."""
+    if media_type == MSGPACK:
+        return msgpack.packb(payload)
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode()
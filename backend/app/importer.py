@@ -0,0 +1,219 @@
+"""
+Bank statement import: incremental CSV and OFX parsing.
+
+Parsers are generators over a binary file object and yield one ParsedRow or
+RowError per statement line, so memory stays flat whatever the file size.
+Category and account names are resolved through name→id maps loaded once per
+import, and every row carries a dedupe hash of (date, amount, note, account).
+"""
+import csv
+import hashlib
+import io
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from typing import BinaryIO, Iterator, Optional
+
+
+@dataclass(frozen=True)
+class CsvMapping:
+    """Which CSV columns hold which fields, and how to read them."""
+    date_column: str = "date"
+    amount_column: str = "amount"
+    note_column: Optional[str] = "note"
+    type_column: Optional[str] = None
+    category_column: Optional[str] = None
+    account_column: Optional[str] = None
+    date_format: str = "%Y-%m-%d"
+    amount_scale: int = 1
+    delimiter: str = ","
+
+
+@dataclass(frozen=True)
+class ParsedRow:
+    line: int
+    type: str
+    amount_cents: int
+    date: str
+    note: Optional[str]
+    category_name: Optional[str] = None
+    account_name: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class RowError:
+    line: int
+    error: str
+
+
+@dataclass(frozen=True)
+class ImportRow:
+    """A parsed row with names resolved to ids, ready to insert."""
+    line: int
+    type: str
+    amount_cents: int
+    date: str
+    note: Optional[str]
+    category_id: Optional[int]
+    account_id: Optional[int]
+    import_hash: str
+
+
+_TYPE_ALIASES = {
+    "income": "income", "credit": "income", "cr": "income", "deposit": "income",
+    "expense": "expense", "debit": "expense", "dr": "expense", "withdrawal": "expense",
+}
+
+
+def _parse_amount(raw: str, scale: int) -> Decimal:
+    cleaned = raw.strip().replace(",", "").replace(" ", "")
+    if cleaned.startswith("(") and cleaned.endswith(")"):
+        cleaned = "-" + cleaned[1:-1]
+    try:
+        value = Decimal(cleaned) * scale
+    except InvalidOperation:
+        raise ValueError(f"invalid amount {raw!r}") from None
+    if not value.is_finite():
+        raise ValueError(f"invalid amount {raw!r}")
+    return value.to_integral_value(rounding=ROUND_HALF_UP)
+
+
+def _signed_row(line: int, amount: Decimal, type_: Optional[str], date: str, note: Optional[str],
+                category: Optional[str], account: Optional[str]) -> ParsedRow:
+    if type_ is None:
+        type_ = "expense" if amount < 0 else "income"
+    return ParsedRow(line, type_, int(abs(amount)), date, note or None, category or None, account or None)
+
+
+def _field(record: dict, column: Optional[str]) -> Optional[str]:
+    return (record.get(column) or "").strip() if column else None
+
+
+def parse_csv(stream: BinaryIO, mapping: CsvMapping) -> Iterator[ParsedRow | RowError]:
+    """Yield one ParsedRow or RowError per CSV data line (line numbers are 1-based, header = 1)."""
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    reader = None
+    try:
+        reader = csv.DictReader(text, delimiter=mapping.delimiter)
+        required = [mapping.date_column, mapping.amount_column]
+        missing = [column for column in required if column not in (reader.fieldnames or [])]
+        if missing:
+            yield RowError(1, f"missing column(s): {', '.join(missing)}")
+            return
+        for record in reader:
+            line = reader.line_num
+            try:
+                date = datetime.strptime(record[mapping.date_column].strip(), mapping.date_format).date().isoformat()
+                amount = _parse_amount(record[mapping.amount_column] or "", mapping.amount_scale)
+                type_ = None
+                if mapping.type_column:
+                    raw_type = (record.get(mapping.type_column) or "").strip().lower()
+                    type_ = _TYPE_ALIASES.get(raw_type)
+                    if type_ is None:
+                        raise ValueError(f"unknown type {raw_type!r}")
+            except (ValueError, AttributeError) as exc:
+                yield RowError(line, str(exc))
+                continue
+            yield _signed_row(
+                line, amount, type_, date,
+                _field(record, mapping.note_column),
+                _field(record, mapping.category_column),
+                _field(record, mapping.account_column),
+            )
+    except (UnicodeDecodeError, csv.Error) as exc:
+        # The rest of the file cannot be read reliably; report and stop.
+        yield RowError(reader.line_num + 1 if reader is not None else 1, f"unreadable file: {exc}")
+    finally:
+        text.detach()
+
+
+_OFX_TAG = re.compile(r"<(/?)([A-Za-z0-9_.]+)>([^<]*)")
+_CHUNK = 64 * 1024
+
+
+def _ofx_tokens(stream: BinaryIO) -> Iterator[tuple[bool, str, str]]:
+    """Yield (closing, TAG, value) for every tag, reading the file in fixed-size chunks."""
+    text = io.TextIOWrapper(stream, encoding="utf-8", errors="replace")
+    try:
+        buffer = ""
+        while True:
+            chunk = text.read(_CHUNK)
+            buffer += chunk
+            # Keep the last, possibly incomplete, tag for the next round.
+            cut = len(buffer) if not chunk else buffer.rfind("<")
+            for match in _OFX_TAG.finditer(buffer, 0, max(cut, 0)):
+                yield match.group(1) == "/", match.group(2).upper(), match.group(3).strip()
+            if not chunk:
+                return
+            buffer = buffer[cut:] if cut >= 0 else ""
+    finally:
+        text.detach()
+
+
+def parse_ofx(stream: BinaryIO) -> Iterator[ParsedRow | RowError]:
+    """Yield one ParsedRow or RowError per <STMTTRN>; `line` is the transaction's ordinal."""
+    current: dict[str, str] | None = None
+    count = 0
+    for closing, tag, value in _ofx_tokens(stream):
+        if tag == "STMTTRN":
+            if not closing:
+                current = {}
+                continue
+            if current is None:
+                continue
+            count += 1
+            fields, current = current, None
+            try:
+                posted = fields.get("DTPOSTED", "")
+                date = datetime.strptime(posted[:8], "%Y%m%d").date().isoformat()
+                amount = _parse_amount(fields.get("TRNAMT", ""), 1)
+            except ValueError as exc:
+                yield RowError(count, str(exc))
+                continue
+            note = " - ".join(part for part in (fields.get("NAME"), fields.get("MEMO")) if part)
+            yield _signed_row(count, amount, None, date, note, None, None)
+        elif current is not None and not closing and value:
+            current[tag] = value
+
+
+def import_hash(date: str, type_: str, amount_cents: int, note: Optional[str], account_id: Optional[int]) -> str:
+    """Dedupe key: the same (date, signed amount, note, account) is imported only once."""
+    signed = amount_cents if type_ == "income" else -amount_cents
+    key = f"{date}\x1f{signed}\x1f{note or ''}\x1f{account_id if account_id is not None else ''}"
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def resolve(
+    rows: Iterator[ParsedRow | RowError],
+    categories: dict[str, int],
+    accounts: dict[str, int],
+    default_account_id: Optional[int],
+) -> Iterator[ImportRow | RowError]:
+    """Map category/account names to ids via the cached (lower-cased) name maps."""
+    for row in rows:
+        if isinstance(row, RowError):
+            yield row
+            continue
+        category_id = None
+        if row.category_name:
+            category_id = categories.get(row.category_name.lower())
+            if category_id is None:
+                yield RowError(row.line, f"unknown category {row.category_name!r}")
+                continue
+        account_id = default_account_id
+        if row.account_name:
+            account_id = accounts.get(row.account_name.lower())
+            if account_id is None:
+                yield RowError(row.line, f"unknown account {row.account_name!r}")
+                continue
+        yield ImportRow(
+            line=row.line,
+            type=row.type,
+            amount_cents=row.amount_cents,
+            date=row.date,
+            note=row.note,
+            category_id=category_id,
+            account_id=account_id,
+            import_hash=import_hash(row.date, row.type, row.amount_cents, row.note, account_id),
+        )
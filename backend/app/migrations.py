@@ -0,0 +1,367 @@
+"""
+Versioned schema migrations.
+
+Each migration has a fixed version number and a checksum of its SQL. Applied
+versions are recorded in `schema_version`; a database that is already up to
+date costs a single read at startup. Pending migrations run together in one
+`BEGIN IMMEDIATE` transaction, so concurrent boots serialise on the write lock
+and a failure leaves the schema untouched.
+
+Never edit a migration that has shipped — append a new one instead.
+"""
+import hashlib
+import sqlite3
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+
+class MigrationError(Exception):
+    """Raised when the recorded schema history does not match the code."""
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    statements: tuple[str, ...] = ()
+    # (table, column definition) pairs added only if the column is missing.
+    # Used by the baseline to adopt databases created by the old ALTER TABLE loop.
+    add_columns: tuple[tuple[str, str], ...] = ()
+
+    @property
+    def checksum(self) -> str:
+        h = hashlib.sha256()
+        for statement in self.statements:
+            h.update(" ".join(statement.split()).encode())
+            h.update(b";")
+        for table, column_def in self.add_columns:
+            h.update(f"{table}:{column_def}".encode())
+            h.update(b";")
+        return h.hexdigest()
+
+    def apply(self, conn: sqlite3.Connection) -> None:
+        for statement in self.statements:
+            conn.execute(statement)
+        for table, column_def in self.add_columns:
+            column = column_def.split()[0]
+            existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+            if column not in existing:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {column_def}")
+
+
+MIGRATIONS: tuple[Migration, ...] = (
+    Migration(
+        version=1,
+        name="baseline",
+        statements=(
+            """
+            CREATE TABLE IF NOT EXISTS users (
+                id              INTEGER PRIMARY KEY AUTOINCREMENT,
+                username        TEXT NOT NULL UNIQUE,
+                hashed_password TEXT NOT NULL
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS categories (
+                id      INTEGER PRIMARY KEY AUTOINCREMENT,
+                name    TEXT NOT NULL UNIQUE,
+                type    TEXT NOT NULL DEFAULT 'expense',
+                icon    TEXT NOT NULL DEFAULT '',
+                color   TEXT NOT NULL DEFAULT 'amber',
+                user_id INTEGER REFERENCES users(id)
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS accounts (
+                id       INTEGER PRIMARY KEY AUTOINCREMENT,
+                type     TEXT NOT NULL CHECK (type IN ('ewallet', 'bank')),
+                name     TEXT NOT NULL,
+                balance  INTEGER NOT NULL DEFAULT 0,
+                icon     TEXT NOT NULL DEFAULT '',
+                currency TEXT NOT NULL DEFAULT 'IDR',
+                user_id  INTEGER REFERENCES users(id)
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS transactions (
+                id           INTEGER PRIMARY KEY AUTOINCREMENT,
+                type         TEXT NOT NULL CHECK (type IN ('income', 'expense')),
+                amount_cents INTEGER NOT NULL,
+                date         TEXT NOT NULL,
+                note         TEXT,
+                category_id  INTEGER REFERENCES categories(id),
+                account_id   INTEGER REFERENCES accounts(id),
+                user_id      INTEGER REFERENCES users(id)
+            )
+            """,
+        ),
+        add_columns=(
+            ("categories",   "user_id INTEGER REFERENCES users(id)"),
+            ("transactions", "user_id INTEGER REFERENCES users(id)"),
+            ("accounts",     "user_id INTEGER REFERENCES users(id)"),
+            ("transactions", "account_id INTEGER REFERENCES accounts(id)"),
+            ("accounts",     "balance INTEGER NOT NULL DEFAULT 0"),
+            ("categories",   "type TEXT NOT NULL DEFAULT 'expense'"),
+            ("categories",   "icon TEXT NOT NULL DEFAULT ''"),
+            ("categories",   "color TEXT NOT NULL DEFAULT 'amber'"),
+            ("accounts",     "icon TEXT NOT NULL DEFAULT ''"),
+            ("accounts",     "currency TEXT NOT NULL DEFAULT 'IDR'"),
+        ),
+    ),
+    Migration(
+        version=2,
+        name="per_user_indexes",
+        statements=(
+            "CREATE INDEX IF NOT EXISTS idx_transactions_user_date ON transactions (user_id, date, id)",
+            "CREATE INDEX IF NOT EXISTS idx_transactions_user_account ON transactions (user_id, account_id, date)",
+            "CREATE INDEX IF NOT EXISTS idx_transactions_user_category ON transactions (user_id, category_id, date)",
+            "CREATE INDEX IF NOT EXISTS idx_transactions_user_note ON transactions (user_id, note)",
+            "CREATE INDEX IF NOT EXISTS idx_accounts_user_name ON accounts (user_id, name)",
+            "CREATE INDEX IF NOT EXISTS idx_categories_user ON categories (user_id)",
+        ),
+    ),
+    Migration(
+        version=3,
+        name="transaction_filter_indexes",
+        statements=(
+            "CREATE INDEX IF NOT EXISTS idx_transactions_user_type ON transactions (user_id, type, date)",
+            "CREATE INDEX IF NOT EXISTS idx_transactions_user_amount ON transactions (user_id, amount_cents)",
+            "CREATE INDEX IF NOT EXISTS idx_transactions_user ON transactions (user_id, id)",
+        ),
+    ),
+    Migration(
+        version=4,
+        name="transactions_fts",
+        statements=(
+            """
+            CREATE VIRTUAL TABLE IF NOT EXISTS transactions_fts USING fts5(
+                note, category, account, user_id UNINDEXED,
+                tokenize = 'unicode61 remove_diacritics 2',
+                prefix = '2 3'
+            )
+            """,
+            """
+            INSERT INTO transactions_fts (rowid, note, category, account, user_id)
+            SELECT t.id, COALESCE(t.note, ''), COALESCE(c.name, ''), COALESCE(a.name, ''), t.user_id
+            FROM transactions t
+            LEFT JOIN categories c ON c.id = t.category_id AND c.user_id = t.user_id
+            LEFT JOIN accounts a ON a.id = t.account_id AND a.user_id = t.user_id
+            """,
+        ),
+    ),
+    Migration(
+        version=5,
+        name="transaction_import_hash",
+        statements=(
+            "ALTER TABLE transactions ADD COLUMN import_hash TEXT",
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_transactions_user_import_hash "
+            "ON transactions (user_id, import_hash) WHERE import_hash IS NOT NULL",
+        ),
+    ),
+    Migration(
+        version=6,
+        name="monthly_totals",
+        statements=(
+            # category_id / account_id use 0 for "none" so they can be part of the key.
+            """
+            CREATE TABLE IF NOT EXISTS monthly_totals (
+                user_id     INTEGER NOT NULL,
+                month       TEXT NOT NULL,
+                type        TEXT NOT NULL,
+                category_id INTEGER NOT NULL DEFAULT 0,
+                account_id  INTEGER NOT NULL DEFAULT 0,
+                total       INTEGER NOT NULL DEFAULT 0,
+                count       INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (user_id, month, type, category_id, account_id)
+            ) WITHOUT ROWID
+            """,
+            """
+            INSERT INTO monthly_totals (user_id, month, type, category_id, account_id, total, count)
+            SELECT user_id, substr(date, 1, 7), type, COALESCE(category_id, 0), COALESCE(account_id, 0),
+                   SUM(amount_cents), COUNT(*)
+            FROM transactions
+            WHERE user_id IS NOT NULL
+            GROUP BY user_id, substr(date, 1, 7), type, COALESCE(category_id, 0), COALESCE(account_id, 0)
+            """,
+        ),
+    ),
+    Migration(
+        version=7,
+        name="balance_snapshots",
+        statements=(
+            # Balance before any recorded transaction; balance = opening + ledger sum.
+            "ALTER TABLE accounts ADD COLUMN opening_balance INTEGER NOT NULL DEFAULT 0",
+            """
+            UPDATE accounts SET opening_balance = balance - COALESCE((
+                SELECT SUM(CASE WHEN t.type = 'income' THEN t.amount_cents ELSE -t.amount_cents END)
+                FROM transactions t
+                WHERE t.user_id = accounts.user_id AND t.account_id = accounts.id
+            ), 0)
+            """,
+            # Month-end running ledger sum per account (opening balance excluded).
+            """
+            CREATE TABLE IF NOT EXISTS balance_snapshots (
+                user_id      INTEGER NOT NULL,
+                account_id   INTEGER NOT NULL,
+                month        TEXT NOT NULL,
+                ledger_total INTEGER NOT NULL,
+                PRIMARY KEY (user_id, account_id, month)
+            ) WITHOUT ROWID
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_monthly_totals_user_account "
+            "ON monthly_totals (user_id, account_id, month)",
+        ),
+    ),
+    Migration(
+        version=8,
+        name="user_versions",
+        statements=(
+            """
+            CREATE TABLE IF NOT EXISTS user_versions (
+                user_id INTEGER PRIMARY KEY,
+                version INTEGER NOT NULL DEFAULT 0
+            )
+            """,
+        ),
+    ),
+    Migration(
+        version=9,
+        name="change_log",
+        statements=(
+            # Latest version at which each row changed; deleted = 1 is a tombstone.
+            """
+            CREATE TABLE IF NOT EXISTS change_log (
+                user_id   INTEGER NOT NULL,
+                entity    TEXT NOT NULL,
+                entity_id INTEGER NOT NULL,
+                version   INTEGER NOT NULL,
+                deleted   INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (user_id, entity, entity_id)
+            ) WITHOUT ROWID
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_change_log_user_entity_version "
+            "ON change_log (user_id, entity, version)",
+            # Clients holding a version below the floor must resync from scratch;
+            # nothing was logged before this migration.
+            "ALTER TABLE user_versions ADD COLUMN sync_floor INTEGER NOT NULL DEFAULT 0",
+            "UPDATE user_versions SET sync_floor = version",
+        ),
+    ),
+    Migration(
+        version=10,
+        name="revoked_tokens",
+        statements=(
+            # Logged-out token ids, kept until the token would have expired anyway.
+            """
+            CREATE TABLE IF NOT EXISTS revoked_tokens (
+                jti        TEXT PRIMARY KEY,
+                user_id    INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+                expires_at INTEGER NOT NULL
+            ) WITHOUT ROWID
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_revoked_tokens_expires_at ON revoked_tokens (expires_at)",
+        ),
+    ),
+    Migration(
+        version=11,
+        name="transactions_fts_user_token",
+        statements=(
+            # user_id becomes an indexed column so a search matches the user's
+            # token inside FTS5 instead of ranking every user's hits first.
+            "DROP TABLE IF EXISTS transactions_fts",
+            """
+            CREATE VIRTUAL TABLE transactions_fts USING fts5(
+                note, category, account, user_id,
+                tokenize = 'unicode61 remove_diacritics 2',
+                prefix = '2 3'
+            )
+            """,
+            """
+            INSERT INTO transactions_fts (rowid, note, category, account, user_id)
+            SELECT t.id, COALESCE(t.note, ''), COALESCE(c.name, ''), COALESCE(a.name, ''), t.user_id
+            FROM transactions t
+            LEFT JOIN categories c ON c.id = t.category_id AND c.user_id = t.user_id
+            LEFT JOIN accounts a ON a.id = t.account_id AND a.user_id = t.user_id
+            """,
+        ),
+    ),
+    Migration(
+        version=12,
+        name="account_adjustments",
+        statements=(
+            # Net of direct balance edits (PATCH /accounts/{id}); opening_balance
+            # keeps its creation value so reconcile can tell the two apart.
+            "ALTER TABLE accounts ADD COLUMN adjustments INTEGER NOT NULL DEFAULT 0",
+        ),
+    ),
+)
+
+_lock = threading.Lock()
+
+
+def _applied(conn: sqlite3.Connection) -> dict[int, str]:
+    """Return {version: checksum} of applied migrations; empty if untracked."""
+    try:
+        rows = conn.execute("SELECT version, checksum FROM schema_version").fetchall()
+    except sqlite3.OperationalError:
+        return {}
+    return {row[0]: row[1] for row in rows}
+
+
+def _verify(applied: dict[int, str], migrations: tuple[Migration, ...]) -> None:
+    known = {m.version: m for m in migrations}
+    for version, checksum in applied.items():
+        migration = known.get(version)
+        if migration is None:
+            raise MigrationError(f"Database is at unknown schema version {version}")
+        if migration.checksum != checksum:
+            raise MigrationError(
+                f"Checksum mismatch for migration {version} ({migration.name}); "
+                "shipped migrations must not be edited"
+            )
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    """Highest applied migration version, or 0 for an untracked database."""
+    return max(_applied(conn), default=0)
+
+
+def migrate(conn: sqlite3.Connection, migrations: tuple[Migration, ...] = MIGRATIONS) -> int:
+    """Bring the schema up to date and return the resulting version."""
+    latest = migrations[-1].version if migrations else 0
+    applied = _applied(conn)
+    _verify(applied, migrations)
+    if max(applied, default=0) >= latest:
+        return latest
+
+    with _lock:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS schema_version (
+                    version    INTEGER PRIMARY KEY,
+                    name       TEXT NOT NULL,
+                    checksum   TEXT NOT NULL,
+                    applied_at TEXT NOT NULL
+                )
+                """
+            )
+            # Another process may have migrated while we waited for the lock.
+            applied = _applied(conn)
+            _verify(applied, migrations)
+            for migration in migrations:
+                if migration.version in applied:
+                    continue
+                migration.apply(conn)
+                conn.execute(
+                    "INSERT INTO schema_version (version, name, checksum, applied_at) VALUES (?, ?, ?, ?)",
+                    (migration.version, migration.name, migration.checksum,
+                     datetime.now(timezone.utc).isoformat()),
+                )
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+    return latest
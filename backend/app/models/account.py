@@ -1,7 +1,11 @@
 import sqlite3
 from typing import List
 
+from ..cache import commit
+from ..fastjson import records
 from ..schemas.account import AccountCreate, AccountRead
+from .search import rename_account
+from .version import bump_version, log_changes
 
 def get_all_accounts(user_id: int, conn: sqlite3.Connection) -> List[AccountRead]:
     cursor = conn.cursor()
@@ -9,6 +13,11 @@ def get_all_accounts(user_id: int, conn: sqlite3.Connection) -> List[AccountRead
     rows = cursor.fetchall()
     return [AccountRead(id=row["id"], type=row["type"], name=row["name"], balance=row["balance"], icon=row["icon"], currency=row["currency"]) for row in rows]
 
+def get_account_records(user_id: int, conn: sqlite3.Connection) -> List[dict]:
+    fields = tuple(AccountRead.model_fields)
+    cursor = conn.execute(f"SELECT {', '.join(fields)} FROM accounts WHERE user_id = ?", (user_id,))
+    return records(cursor.fetchall(), fields)
+
 def get_accounts_by_name(name: str, user_id: int, conn: sqlite3.Connection) -> List[AccountRead] | None:
     cursor = conn.cursor()
     cursor.execute("SELECT * FROM accounts WHERE name=? AND user_id = ?", (name, user_id))
@@ -20,18 +29,28 @@ def get_accounts_by_name(name: str, user_id: int, conn: sqlite3.Connection) -> L
 def create_account(account: AccountCreate, user_id: int, conn: sqlite3.Connection) -> AccountRead:
     cursor = conn.cursor()
     cursor.execute(
-        "INSERT INTO accounts(type, name, balance, icon, currency, user_id) VALUES (?, ?, ?, ?, ?, ?)",
-        (account.type, account.name, account.balance, account.icon, account.currency, user_id)
+        "INSERT INTO accounts(type, name, balance, opening_balance, icon, currency, user_id) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (account.type, account.name, account.balance, account.balance, account.icon, account.currency, user_id)
     )
-    conn.commit()
     account_id = cursor.lastrowid
+    log_changes(user_id, bump_version(user_id, conn), "accounts", [account_id], conn)
+    commit(conn, user_id, "accounts")
     return AccountRead(id=account_id, type=account.type, name=account.name, balance=account.balance, icon=account.icon, currency=account.currency)
 
 def delete_account(account_id: int, user_id: int, conn: sqlite3.Connection) -> bool:
     cursor = conn.cursor()
     cursor.execute("DELETE FROM accounts WHERE id = ? AND user_id = ?", (account_id, user_id))
-    conn.commit()
-    return cursor.rowcount > 0
+    deleted = cursor.rowcount > 0
+    if deleted:
+        rename_account(account_id, "", user_id, conn)
+        conn.execute("DELETE FROM balance_snapshots WHERE user_id = ? AND account_id = ?", (user_id, account_id))
+        log_changes(user_id, bump_version(user_id, conn), "accounts", [account_id], conn, deleted=True)
+    if deleted:
+        commit(conn, user_id, "accounts")
+    else:
+        conn.commit()
+    return deleted
 
 def update_account(
     account_id: int,
@@ -44,9 +63,17 @@ def update_account(
     row = cursor.fetchone()
     if row is None:
         return None
+    # A direct balance edit is not backed by any transaction: it is recorded
+    # in `adjustments` (opening_balance never changes after creation), and
+    # reconcile reports it as drift from the ledger.
     cursor.execute(
-        "UPDATE accounts SET type = ?, name = ?, balance = ?, icon = ?, currency = ? WHERE id = ? AND user_id = ?",
-        (update.type, update.name, update.balance, update.icon, update.currency, account_id, user_id)
+        "UPDATE accounts SET type = ?, name = ?, balance = ?, adjustments = adjustments + ?, "
+        "icon = ?, currency = ? WHERE id = ? AND user_id = ?",
+        (update.type, update.name, update.balance, update.balance - row["balance"],
+         update.icon, update.currency, account_id, user_id)
     )
-    conn.commit()
+    if row["name"] != update.name:
+        rename_account(account_id, update.name, user_id, conn)
+    log_changes(user_id, bump_version(user_id, conn), "accounts", [account_id], conn)
+    commit(conn, user_id, "accounts")
     return AccountRead(id=account_id, type=update.type, name=update.name, balance=update.balance, icon=update.icon, currency=update.currency)
@@ -0,0 +1,146 @@
+"""
+Account balance history.
+
+An account's balance on any date is its opening_balance, plus any direct
+balance edits (`adjustments`), plus the signed sum of its transactions up to
+that date. `balance_snapshots` stores that running
+ledger sum at every month end, so an as-of query is one snapshot lookup plus
+a scan of at most one month of transactions.
+
+Snapshots are filled lazily from the monthly_totals rollup (refresh_snapshots,
+run on the writer) and cover every completed month from the account's first
+transaction. A write dated in month M deletes the account's snapshots from M
+onward (see rollup.update_rollup), so they always form a contiguous prefix
+and back-dated edits leave older months untouched.
+"""
+import calendar
+from datetime import date as Date
+from sqlite3 import Connection
+
+from ..schemas.account import AccountHistory, BalancePoint
+from .rollup import shift_month as _shift_month
+
+MAX_HISTORY_MONTHS = 120
+
+_SIGNED = "CASE WHEN type = 'income' THEN {col} ELSE -{col} END"
+
+
+def _month_end(month: str) -> str:
+    year, mon = (int(part) for part in month.split("-"))
+    return f"{month}-{calendar.monthrange(year, mon)[1]:02d}"
+
+
+def _last_completed_month() -> str:
+    return _shift_month(Date.today().strftime("%Y-%m"), -1)
+
+
+def snapshots_stale(account_id: int, user_id: int, conn: Connection) -> bool:
+    """True if completed months are missing snapshots that refresh_snapshots would add."""
+    latest = conn.execute(
+        "SELECT MAX(month) FROM balance_snapshots WHERE user_id = ? AND account_id = ?",
+        (user_id, account_id),
+    ).fetchone()[0]
+    if latest is not None:
+        return latest < _last_completed_month()
+    first = conn.execute(
+        "SELECT MIN(month) FROM monthly_totals WHERE user_id = ? AND account_id = ?",
+        (user_id, account_id),
+    ).fetchone()[0]
+    return first is not None and first <= _last_completed_month()
+
+
+def refresh_snapshots(account_id: int, user_id: int, conn: Connection) -> int:
+    """Fill missing month-end snapshots up to the last completed month; returns rows added."""
+    last = _last_completed_month()
+    latest = conn.execute(
+        "SELECT month, ledger_total FROM balance_snapshots WHERE user_id = ? AND account_id = ? "
+        "ORDER BY month DESC LIMIT 1",
+        (user_id, account_id),
+    ).fetchone()
+    if latest is not None:
+        start, running = _shift_month(latest["month"], 1), latest["ledger_total"]
+    else:
+        start = conn.execute(
+            "SELECT MIN(month) FROM monthly_totals WHERE user_id = ? AND account_id = ?",
+            (user_id, account_id),
+        ).fetchone()[0]
+        running = 0
+    if start is None or start > last:
+        return 0
+    totals = dict(conn.execute(
+        f"SELECT month, SUM({_SIGNED.format(col='total')}) FROM monthly_totals "
+        "WHERE user_id = ? AND account_id = ? AND month BETWEEN ? AND ? GROUP BY month",
+        (user_id, account_id, start, last),
+    ).fetchall())
+    rows = []
+    month = start
+    while month <= last:
+        running += totals.get(month, 0)
+        rows.append((user_id, account_id, month, running))
+        month = _shift_month(month, 1)
+    conn.executemany(
+        "INSERT OR REPLACE INTO balance_snapshots (user_id, account_id, month, ledger_total) VALUES (?, ?, ?, ?)",
+        rows,
+    )
+    conn.commit()
+    return len(rows)
+
+
+def balance_as_of(account_id: int, as_of: str, base: int, user_id: int, conn: Connection) -> int:
+    """
+    Balance at the end of `as_of` (YYYY-MM-DD): `base` (opening balance plus
+    adjustments) plus the nearest snapshot plus the transactions after it.
+    """
+    month = as_of[:7]
+    covered = month if as_of >= _month_end(month) else _shift_month(month, -1)
+    snapshot = conn.execute(
+        "SELECT month, ledger_total FROM balance_snapshots "
+        "WHERE user_id = ? AND account_id = ? AND month <= ? ORDER BY month DESC LIMIT 1",
+        (user_id, account_id, covered),
+    ).fetchone()
+    after, ledger = ("", 0) if snapshot is None else (
+        f"{_shift_month(snapshot['month'], 1)}-01", snapshot["ledger_total"]
+    )
+    delta = conn.execute(
+        f"SELECT COALESCE(SUM({_SIGNED.format(col='amount_cents')}), 0) FROM transactions "
+        "WHERE user_id = ? AND account_id = ? AND date >= ? AND date <= ?",
+        (user_id, account_id, after, as_of),
+    ).fetchone()[0]
+    return base + ledger + delta
+
+
+def get_balance_history(
+    account_id: int,
+    user_id: int,
+    conn: Connection,
+    date_from: str | None = None,
+    date_to: str | None = None,
+) -> AccountHistory | None:
+    """
+    Month-end balances from date_from's month through date_to (default: the
+    last 12 months up to today); the final point is the balance on date_to.
+    Returns None if the account does not exist. Raises ValueError on a range
+    that is reversed or longer than MAX_HISTORY_MONTHS.
+    """
+    account = conn.execute(
+        "SELECT opening_balance + adjustments AS base FROM accounts WHERE id = ? AND user_id = ?",
+        (account_id, user_id),
+    ).fetchone()
+    if account is None:
+        return None
+    date_to = date_to or Date.today().isoformat()
+    first = date_from[:7] if date_from else _shift_month(date_to[:7], -11)
+    if first > date_to[:7]:
+        raise ValueError("date_from must not be after date_to")
+    points = []
+    month = first
+    while month <= date_to[:7]:
+        if len(points) == MAX_HISTORY_MONTHS:
+            raise ValueError(f"History is limited to {MAX_HISTORY_MONTHS} months")
+        as_of = min(_month_end(month), date_to)
+        points.append(BalancePoint(
+            date=as_of,
+            balance=balance_as_of(account_id, as_of, account["base"], user_id, conn),
+        ))
+        month = _shift_month(month, 1)
+    return AccountHistory(account_id=account_id, points=points)
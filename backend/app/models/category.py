@@ -4,7 +4,11 @@ Use parameterized queries only.
 """
 import sqlite3
 
+from ..cache import commit
+from ..fastjson import records
 from ..schemas.category import CategoryRead, CategoryCreate
+from .search import rename_category
+from .version import bump_version, log_changes
 
 
 def get_all_categories(user_id: int, conn: sqlite3.Connection) -> list[CategoryRead]:
@@ -15,6 +19,13 @@ def get_all_categories(user_id: int, conn: sqlite3.Connection) -> list[CategoryR
     return [CategoryRead(id=row["id"], name=row["name"], type=row["type"], icon=row["icon"], color=row["color"]) for row in rows]
 
 
+def get_category_records(user_id: int, conn: sqlite3.Connection) -> list[dict]:
+    """get_all_categories as plain dicts in CategoryRead field order, for fastjson.dumps."""
+    fields = tuple(CategoryRead.model_fields)
+    cursor = conn.execute(f"SELECT {', '.join(fields)} FROM categories WHERE user_id = ?", (user_id,))
+    return records(cursor.fetchall(), fields)
+
+
 def get_category_by_id(category_id: int, user_id: int, conn: sqlite3.Connection) -> CategoryRead | None:
     """Return a single category by id scoped to the user, or None if not found."""
     cursor = conn.cursor()
@@ -32,8 +43,9 @@ def create_category(category: CategoryCreate, user_id: int, conn: sqlite3.Connec
         "INSERT INTO categories (name, type, icon, color, user_id) VALUES (?, ?, ?, ?, ?)",
         (category.name, category.type, category.icon, category.color, user_id)
     )
-    conn.commit()
     category_id = cursor.lastrowid
+    log_changes(user_id, bump_version(user_id, conn), "categories", [category_id], conn)
+    commit(conn, user_id, "categories")
     return CategoryRead(id=category_id, name=category.name, type=category.type, icon=category.icon, color=category.color)
 
 
@@ -41,8 +53,15 @@ def delete_category(category_id: int, user_id: int, conn: sqlite3.Connection) ->
     """Delete a category by id, only if it belongs to the given user."""
     cursor = conn.cursor()
     cursor.execute("DELETE FROM categories WHERE id = ? AND user_id = ?", (category_id, user_id))
-    conn.commit()
-    return cursor.rowcount > 0
+    deleted = cursor.rowcount > 0
+    if deleted:
+        rename_category(category_id, "", user_id, conn)
+        log_changes(user_id, bump_version(user_id, conn), "categories", [category_id], conn, deleted=True)
+    if deleted:
+        commit(conn, user_id, "categories")
+    else:
+        conn.commit()
+    return deleted
 
 
 def update_category(
@@ -61,5 +80,8 @@ def update_category(
         "UPDATE categories SET name = ?, type = ?, icon = ?, color = ? WHERE id = ? AND user_id = ?",
         (update.name, update.type, update.icon, update.color, category_id, user_id)
     )
-    conn.commit()
+    if row["name"] != update.name:
+        rename_category(category_id, update.name, user_id, conn)
+    log_changes(user_id, bump_version(user_id, conn), "categories", [category_id], conn)
+    commit(conn, user_id, "categories")
     return CategoryRead(id=category_id, name=update.name, type=update.type, icon=update.icon, color=update.color)
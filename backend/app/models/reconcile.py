@@ -0,0 +1,100 @@
+"""
+Balance reconciliation.
+
+accounts.balance is maintained by incremental deltas; the balance implied by
+the ledger is opening_balance (fixed when the account is created) plus the
+signed sum of the account's transactions. find_balance_drift() compares the
+two for every account in one set-based aggregate pass (safe on a read-only
+connection next to a live writer under WAL); fix_balance_drift() resets
+drifted balances to the implied value in a single UPDATE.
+
+Direct balance edits through update_account are not backed by transactions,
+so they show up as drift too. Their net is kept in accounts.adjustments, which
+splits each difference into the part set by hand and the part nothing
+explains.
+"""
+import time
+from dataclasses import dataclass, field
+from sqlite3 import Connection
+
+from .version import bump_version, log_changes
+
+_LEDGER = (
+    "SELECT user_id, account_id, "
+    "SUM(CASE WHEN type = 'income' THEN amount_cents ELSE -amount_cents END) AS total, "
+    "COUNT(*) AS count "
+    "FROM transactions WHERE account_id IS NOT NULL{where} GROUP BY user_id, account_id"
+)
+
+_IMPLIED = (
+    "opening_balance + COALESCE((SELECT SUM(CASE WHEN t.type = 'income' THEN t.amount_cents "
+    "ELSE -t.amount_cents END) FROM transactions t "
+    "WHERE t.user_id = accounts.user_id AND t.account_id = accounts.id), 0)"
+)
+
+
+@dataclass
+class ReconcileReport:
+    accounts: int = 0
+    transactions: int = 0
+    seconds: float = 0.0
+    drift: list[dict] = field(default_factory=list)
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.transactions / self.seconds if self.seconds else 0.0
+
+
+def find_balance_drift(conn: Connection, user_id: int | None = None, batch_size: int = 1000) -> ReconcileReport:
+    """Compare every account's stored balance with its ledger-implied balance."""
+    where, params = ("", ()) if user_id is None else (" AND user_id = ?", (user_id,))
+    started = time.monotonic()
+    cursor = conn.execute(
+        "SELECT a.id, a.user_id, a.name, a.balance, a.opening_balance, a.adjustments, "
+        "COALESCE(l.total, 0) AS ledger, COALESCE(l.count, 0) AS count "
+        f"FROM accounts a LEFT JOIN ({_LEDGER.format(where=where)}) l "
+        "ON l.user_id = a.user_id AND l.account_id = a.id"
+        + ("" if user_id is None else " WHERE a.user_id = ?"),
+        params * 2,
+    )
+    report = ReconcileReport()
+    while rows := cursor.fetchmany(batch_size):
+        for row in rows:
+            report.accounts += 1
+            report.transactions += row["count"]
+            implied = row["opening_balance"] + row["ledger"]
+            if row["balance"] != implied:
+                report.drift.append({
+                    "account_id": row["id"],
+                    "user_id": row["user_id"],
+                    "name": row["name"],
+                    "balance": row["balance"],
+                    "implied": implied,
+                    "difference": row["balance"] - implied,
+                    "adjustments": row["adjustments"],
+                    "unexplained": row["balance"] - implied - row["adjustments"],
+                })
+    report.seconds = time.monotonic() - started
+    return report
+
+
+def fix_balance_drift(conn: Connection, account_ids: list[int]) -> int:
+    """
+    Set the given accounts' balance to the ledger-implied value (dropping
+    their adjustments) in one UPDATE, recomputed under the write lock so
+    concurrent writes are not overwritten with stale numbers. Returns the
+    number of accounts changed.
+    """
+    if not account_ids:
+        return 0
+    placeholders = ", ".join("?" * len(account_ids))
+    fixed: dict[int, list[int]] = {}
+    for row in conn.execute(
+        f"UPDATE accounts SET balance = {_IMPLIED}, adjustments = 0 WHERE id IN ({placeholders}) AND balance != {_IMPLIED} "
+        "RETURNING id, user_id",
+        account_ids,
+    ).fetchall():
+        fixed.setdefault(row["user_id"], []).append(row["id"])
+    for user_id, ids in fixed.items():
+        log_changes(user_id, bump_version(user_id, conn), "accounts", ids, conn)
+    return sum(len(ids) for ids in fixed.values())
@@ -0,0 +1,52 @@
+"""
+Report model: dashboard aggregates computed in SQL.
+Amounts in cents (integer).
+"""
+from sqlite3 import Connection
+
+from ..schemas.report import CategoryTotal, MonthTotal, ReportSummary
+from .rollup import shift_month as _shift_month
+from .transaction import _row_to_read
+
+RECENT_LIMIT = 7
+
+
+def get_summary(month: str, trend: int, user_id: int, conn: Connection) -> ReportSummary:
+    """
+    Month totals, per-category totals and a `trend`-month income/expense
+    series ending at `month`, read from the monthly_totals rollup (O(months)
+    rows), plus the month's latest transactions.
+    """
+    first = _shift_month(month, -(trend - 1))
+    rows = conn.execute(
+        "SELECT month, type, NULLIF(category_id, 0) AS category_id, "
+        "SUM(total) AS total, SUM(count) AS count "
+        "FROM monthly_totals WHERE user_id = ? AND month BETWEEN ? AND ? "
+        "GROUP BY month, type, category_id",
+        (user_id, first, month),
+    ).fetchall()
+
+    series = {_shift_month(first, i): MonthTotal(month=_shift_month(first, i)) for i in range(trend)}
+    summary = ReportSummary(month=month, trend=list(series.values()))
+    for row in rows:
+        bucket = series.get(row["month"])
+        if bucket is None:
+            continue
+        setattr(bucket, row["type"], getattr(bucket, row["type"]) + row["total"])
+        if row["month"] != month:
+            continue
+        setattr(summary, row["type"], getattr(summary, row["type"]) + row["total"])
+        setattr(summary, f"{row['type']}_count", getattr(summary, f"{row['type']}_count") + row["count"])
+        summary.categories.append(
+            CategoryTotal(type=row["type"], category_id=row["category_id"], total=row["total"], count=row["count"])
+        )
+    summary.balance = summary.income - summary.expense
+    summary.categories.sort(key=lambda c: (c.type, -c.total))
+
+    recent = conn.execute(
+        "SELECT * FROM transactions WHERE user_id = ? AND date >= ? AND date < ? "
+        "ORDER BY date DESC, id DESC LIMIT ?",
+        (user_id, f"{month}-01", f"{_shift_month(month, 1)}-01", RECENT_LIMIT),
+    ).fetchall()
+    summary.recent = [_row_to_read(row) for row in recent]
+    return summary
@@ -0,0 +1,121 @@
+"""
+Monthly rollup: per-user totals keyed by (month, type, category, account).
+
+`monthly_totals` mirrors the ledger so reports read O(months) rows instead of
+every transaction. The transaction writers apply their deltas here inside
+their own DB transaction; rebuild_rollup() and verify_rollup() recompute it
+from scratch for repair and auditing (see `python -m backend.app.cli`).
+
+Month-end balance snapshots (models/balance.py) are derived from this table,
+so update_rollup() also drops each touched account's snapshots from the
+earliest changed month onward.
+"""
+from sqlite3 import Connection
+from typing import Iterable, Optional
+
+# (date, type, category_id, account_id, amount_cents) of one transaction.
+LedgerRow = tuple[str, str, Optional[int], Optional[int], int]
+
+_UPSERT = (
+    "INSERT INTO monthly_totals (user_id, month, type, category_id, account_id, total, count) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT (user_id, month, type, category_id, account_id) "
+    "DO UPDATE SET total = total + excluded.total, count = count + excluded.count"
+)
+
+_FROM_LEDGER = (
+    "SELECT user_id, substr(date, 1, 7) AS month, type, COALESCE(category_id, 0) AS category_id, "
+    "COALESCE(account_id, 0) AS account_id, SUM(amount_cents) AS total, COUNT(*) AS count "
+    "FROM transactions WHERE user_id IS NOT NULL{where} "
+    "GROUP BY user_id, substr(date, 1, 7), type, COALESCE(category_id, 0), COALESCE(account_id, 0)"
+)
+
+
+def shift_month(month: str, delta: int) -> str:
+    """Move a YYYY-MM month by `delta` months."""
+    year, mon = (int(part) for part in month.split("-"))
+    index = year * 12 + mon - 1 + delta
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
+def ledger_row(row) -> LedgerRow:
+    """Rollup key and amount of a transaction row or TransactionCreate-like object."""
+    if hasattr(row, "keys"):
+        return row["date"], row["type"], row["category_id"], row["account_id"], row["amount_cents"]
+    return row.date, row.type, row.category_id, row.account_id, row.amount_cents
+
+
+def update_rollup(
+    user_id: int,
+    conn: Connection,
+    added: Iterable[LedgerRow] = (),
+    removed: Iterable[LedgerRow] = (),
+) -> None:
+    """Apply inserted and removed transactions to the rollup; one upsert per touched key."""
+    deltas: dict[tuple, list[int]] = {}
+    for sign, rows in ((1, added), (-1, removed)):
+        for date, type_, category_id, account_id, amount in rows:
+            key = (date[:7], str(getattr(type_, "value", type_)), category_id or 0, account_id or 0)
+            delta = deltas.setdefault(key, [0, 0])
+            delta[0] += sign * amount
+            delta[1] += sign
+    changed = [(user_id, *key, total, count) for key, (total, count) in deltas.items() if total or count]
+    if not changed:
+        return
+    conn.executemany(_UPSERT, changed)
+    since: dict[int, str] = {}
+    for month, _, _, account_id in deltas:
+        if account_id and (account_id not in since or month < since[account_id]):
+            since[account_id] = month
+    conn.executemany(
+        "DELETE FROM balance_snapshots WHERE user_id = ? AND account_id = ? AND month >= ?",
+        [(user_id, account_id, month) for account_id, month in since.items()],
+    )
+    conn.executemany(
+        "DELETE FROM monthly_totals WHERE user_id = ? AND month = ? AND type = ? "
+        "AND category_id = ? AND account_id = ? AND count = 0",
+        [row[:5] for row in changed if row[6] < 0],
+    )
+
+
+def rebuild_rollup(conn: Connection, user_id: int | None = None) -> int:
+    """
+    Recompute the rollup from the ledger (one user or everyone) and return the
+    rows written. Balance snapshots built from the old rollup are dropped too.
+    """
+    where, params = ("", ()) if user_id is None else (" AND user_id = ?", (user_id,))
+    conn.execute(f"DELETE FROM monthly_totals WHERE 1 = 1{where}", params)
+    conn.execute(f"DELETE FROM balance_snapshots WHERE 1 = 1{where}", params)
+    cursor = conn.execute(
+        "INSERT INTO monthly_totals (user_id, month, type, category_id, account_id, total, count) "
+        + _FROM_LEDGER.format(where=where),
+        params,
+    )
+    return cursor.rowcount
+
+
+def verify_rollup(conn: Connection, user_id: int | None = None) -> list[dict]:
+    """
+    Compare the rollup against a fresh aggregate of the ledger. Returns one
+    entry per differing key with the expected and stored total/count.
+    """
+    where, params = ("", ()) if user_id is None else (" AND user_id = ?", (user_id,))
+    columns = ("user_id", "month", "type", "category_id", "account_id")
+    expected = {
+        tuple(row[c] for c in columns): (row["total"], row["count"])
+        for row in conn.execute(_FROM_LEDGER.format(where=where), params)
+    }
+    stored = {
+        tuple(row[c] for c in columns): (row["total"], row["count"])
+        for row in conn.execute(f"SELECT * FROM monthly_totals WHERE 1 = 1{where}", params)
+    }
+    mismatches = []
+    for key in sorted(expected.keys() | stored.keys()):
+        want, have = expected.get(key, (0, 0)), stored.get(key, (0, 0))
+        if want != have:
+            mismatches.append({
+                **dict(zip(columns, key)),
+                "expected_total": want[0], "expected_count": want[1],
+                "stored_total": have[0], "stored_count": have[1],
+            })
+    return mismatches
@@ -0,0 +1,84 @@
+"""
+Full-text search over transactions.
+
+`transactions_fts` is an FTS5 index keyed by transaction id (rowid) holding the
+note plus the current category and account names. The writers in the
+transaction, category and account models keep it in sync inside their own
+DB transaction, so a search only touches matching rows instead of the ledger.
+
+The owner's id is an indexed column too: build_match_query() ANDs the user's
+token into the MATCH expression, so FTS5 intersects with that user's rows
+before ranking and other users' matches are never scored.
+"""
+import re
+from sqlite3 import Connection
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+# Column weights for bm25(): a hit in the note outranks a category/account hit;
+# the user_id token is in every match and does not affect the order.
+RANK = "bm25(transactions_fts, 1.0, 0.5, 0.5, 0.0)"
+
+
+_INDEX_ROWS = (
+    "INSERT INTO transactions_fts (rowid, note, category, account, user_id) "
+    "SELECT t.id, COALESCE(t.note, ''), COALESCE(c.name, ''), COALESCE(a.name, ''), t.user_id "
+    "FROM transactions t "
+    "LEFT JOIN categories c ON c.id = t.category_id AND c.user_id = t.user_id "
+    "LEFT JOIN accounts a ON a.id = t.account_id AND a.user_id = t.user_id "
+)
+
+
+def index_transaction(transaction_id: int, conn: Connection) -> None:
+    """(Re)index one transaction with its current note, category and account names."""
+    conn.execute("DELETE FROM transactions_fts WHERE rowid = ?", (transaction_id,))
+    conn.execute(_INDEX_ROWS + "WHERE t.id = ?", (transaction_id,))
+
+
+def index_new_transactions(first_id: int, last_id: int, conn: Connection) -> None:
+    """Index a freshly inserted, contiguous id range in one statement."""
+    conn.execute(_INDEX_ROWS + "WHERE t.id BETWEEN ? AND ?", (first_id, last_id))
+
+
+def reindex_user_transactions(user_id: int, conn: Connection) -> None:
+    """Rebuild every index row of one user's transactions (after bulk SQL outside the models)."""
+    conn.execute(
+        "DELETE FROM transactions_fts WHERE rowid IN (SELECT id FROM transactions WHERE user_id = ?)",
+        (user_id,),
+    )
+    conn.execute(_INDEX_ROWS + "WHERE t.user_id = ?", (user_id,))
+
+
+def unindex_transaction(transaction_id: int, conn: Connection) -> None:
+    conn.execute("DELETE FROM transactions_fts WHERE rowid = ?", (transaction_id,))
+
+
+def rename_category(category_id: int, name: str, user_id: int, conn: Connection) -> None:
+    """Point every indexed transaction in the category at its new name ('' once deleted)."""
+    conn.execute(
+        "UPDATE transactions_fts SET category = ? WHERE rowid IN "
+        "(SELECT id FROM transactions WHERE user_id = ? AND category_id = ?)",
+        (name, user_id, category_id),
+    )
+
+
+def rename_account(account_id: int, name: str, user_id: int, conn: Connection) -> None:
+    """Point every indexed transaction on the account at its new name ('' once deleted)."""
+    conn.execute(
+        "UPDATE transactions_fts SET account = ? WHERE rowid IN "
+        "(SELECT id FROM transactions WHERE user_id = ? AND account_id = ?)",
+        (name, user_id, account_id),
+    )
+
+
+def build_match_query(text: str, user_id: int) -> str | None:
+    """
+    Turn free text into an FTS5 query over the user's rows: every word must
+    match the note, category or account name as a prefix.
+    """
+    tokens = _TOKEN.findall(text)
+    if not tokens:
+        return None
+    words = " ".join(f'"{token}"*' for token in tokens)
+    return f'user_id : "{int(user_id)}" AND {{note category account}} : ({words})'
+
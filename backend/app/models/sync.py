@@ -0,0 +1,64 @@
+"""
+Delta sync: rows changed since a client-held data version.
+
+Writers log every touched row in `change_log` at the version they bumped to
+(see version.log_changes), keeping only the latest change per row, so the
+cost of a sync is proportional to the rows changed since `since`, not to the
+size of the ledger. Deletes leave tombstones. A client with no version, or
+one older than the user's sync floor (data rewritten outside the model
+layer), gets a full snapshot instead and must replace its local copy.
+"""
+from sqlite3 import Connection
+
+from ..schemas.account import AccountRead
+from ..schemas.category import CategoryRead
+from ..schemas.sync import SyncResult
+from .transaction import _row_to_read
+
+# entity -> (table, row converter)
+_ENTITIES = {
+    "transactions": ("transactions", _row_to_read),
+    "accounts": ("accounts", AccountRead.model_validate),
+    "categories": ("categories", CategoryRead.model_validate),
+}
+
+
+def _changed(entity: str, since: int, user_id: int, conn: Connection) -> tuple[list, list[int]]:
+    table, convert = _ENTITIES[entity]
+    rows = conn.execute(
+        f"SELECT l.entity_id, l.deleted, r.* FROM change_log l "
+        f"LEFT JOIN {table} r ON r.id = l.entity_id AND r.user_id = l.user_id "
+        "WHERE l.user_id = ? AND l.entity = ? AND l.version > ? ORDER BY l.version, l.entity_id",
+        (user_id, entity, since),
+    ).fetchall()
+    upserted, deleted = [], []
+    for row in rows:
+        if row["deleted"] or row["id"] is None:
+            deleted.append(row["entity_id"])
+        else:
+            upserted.append(convert(dict(row)))
+    return upserted, deleted
+
+
+def get_changes(since: int, user_id: int, conn: Connection) -> SyncResult:
+    """Rows inserted, updated or deleted after version `since`, read in one snapshot."""
+    conn.execute("BEGIN")
+    try:
+        row = conn.execute(
+            "SELECT version, sync_floor FROM user_versions WHERE user_id = ?", (user_id,)
+        ).fetchone()
+        version, floor = (row["version"], row["sync_floor"]) if row else (0, 0)
+        if since == 0 or since < floor or since > version:
+            result = SyncResult(version=version, full=True)
+            for entity, (table, convert) in _ENTITIES.items():
+                rows = conn.execute(f"SELECT * FROM {table} WHERE user_id = ? ORDER BY id", (user_id,))
+                setattr(result, entity, [convert(dict(r)) for r in rows])
+            return result
+        result = SyncResult(version=version)
+        for entity in _ENTITIES:
+            upserted, deleted = _changed(entity, since, user_id, conn)
+            setattr(result, entity, upserted)
+            setattr(result.deleted, entity, deleted)
+        return result
+    finally:
+        conn.rollback()
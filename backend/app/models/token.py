@@ -0,0 +1,23 @@
+import sqlite3
+import time
+
+from ..revocation import get_denylist
+
+
+def get_revoked_tokens(conn: sqlite3.Connection) -> list[tuple[str, int]]:
+    rows = conn.execute(
+        "SELECT jti, expires_at FROM revoked_tokens WHERE expires_at > ?",
+        (int(time.time()),),
+    ).fetchall()
+    return [(row[0], row[1]) for row in rows]
+
+
+def revoke_token(jti: str, user_id: int, expires_at: int, conn: sqlite3.Connection) -> None:
+    """Record a logged-out token and drop rows for tokens that have expired since."""
+    conn.execute(
+        "INSERT OR IGNORE INTO revoked_tokens (jti, user_id, expires_at) VALUES (?, ?, ?)",
+        (jti, user_id, expires_at),
+    )
+    conn.execute("DELETE FROM revoked_tokens WHERE expires_at <= ?", (int(time.time()),))
+    conn.commit()
+    get_denylist().add(jti, expires_at)
@@ -2,9 +2,26 @@
 Transaction model: all DB operations for transactions.
 Use parameterized queries only. Amounts in cents (integer).
 """
-from sqlite3 import Connection
+import base64
+import json
+from sqlite3 import Connection, Cursor, Row
 
-from ..schemas.transaction import TransactionCreate, TransactionRead
+from ..cache import commit
+from ..export import EXPORT_COLUMNS, columns
+from ..fastjson import records
+from ..importer import ImportRow
+from ..schemas.transaction import TransactionCreate, TransactionFilter, TransactionRead
+from .rollup import ledger_row, update_rollup
+from .search import RANK, build_match_query, index_new_transactions, index_transaction, unindex_transaction
+from .version import bump_version, log_changes
+
+
+def _commit(conn: Connection, user_id: int, touches_accounts: bool) -> None:
+    """Commit a transaction write, invalidating the cached responses it makes stale."""
+    if touches_accounts:
+        commit(conn, user_id, "transactions", "reports", "accounts")
+    else:
+        commit(conn, user_id, "transactions", "reports")
 
 
 def _row_to_read(row) -> TransactionRead:
@@ -19,11 +36,214 @@ def _row_to_read(row) -> TransactionRead:
     )
 
 
-def get_all_transactions(user_id: int, conn: Connection) -> list[TransactionRead]:
-    """Return all transactions belonging to the given user."""
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM transactions WHERE user_id = ?", (user_id,))
-    return [_row_to_read(row) for row in cursor.fetchall()]
+# Keyset columns per sort key. Every tuple ends in id so positions are unique,
+# and each matches the column order of a (user_id, ...) index plus its rowid.
+_SORT_COLUMNS = {
+    "date": ("date", "id"),
+    "amount": ("amount_cents", "id"),
+    "type": ("type", "date", "id"),
+    "id": ("id",),
+}
+# Python type a cursor value must have for each keyset column.
+_SORT_COLUMN_TYPES = {"date": str, "type": str, "amount_cents": int, "id": int}
+
+
+def _next_month(month: str) -> str:
+    year, mon = (int(part) for part in month.split("-"))
+    return f"{year + mon // 12:04d}-{mon % 12 + 1:02d}"
+
+
+def _filter_sql(filters: TransactionFilter | None) -> tuple[str, list]:
+    """Translate filters into AND-ed parameterized clauses after `user_id = ?`."""
+    if filters is None:
+        return "", []
+    clauses, params = [], []
+    if filters.type is not None:
+        clauses.append("type = ?")
+        params.append(filters.type.value)
+    if filters.month is not None:
+        clauses.append("date >= ? AND date < ?")
+        params += [f"{filters.month}-01", f"{_next_month(filters.month)}-01"]
+    if filters.date_from is not None:
+        clauses.append("date >= ?")
+        params.append(filters.date_from)
+    if filters.date_to is not None:
+        clauses.append("date <= ?")
+        params.append(filters.date_to)
+    if filters.category_id is not None:
+        clauses.append("category_id = ?")
+        params.append(filters.category_id)
+    if filters.account_id is not None:
+        clauses.append("account_id = ?")
+        params.append(filters.account_id)
+    if filters.min_amount is not None:
+        clauses.append("amount_cents >= ?")
+        params.append(filters.min_amount)
+    if filters.max_amount is not None:
+        clauses.append("amount_cents <= ?")
+        params.append(filters.max_amount)
+    return "".join(f" AND {clause}" for clause in clauses), params
+
+
+def _order_sql(filters: TransactionFilter) -> str:
+    direction = "DESC" if filters.order == "desc" else "ASC"
+    return ", ".join(f"{column} {direction}" for column in _SORT_COLUMNS[filters.sort])
+
+
+_COLUMNS = ", ".join(EXPORT_COLUMNS)
+
+
+def _select_all(user_id: int, conn: Connection, filters: TransactionFilter | None) -> list[Row]:
+    if filters is None:
+        return conn.execute(f"SELECT {_COLUMNS} FROM transactions WHERE user_id = ?", (user_id,)).fetchall()
+    where, params = _filter_sql(filters)
+    return conn.execute(
+        f"SELECT {_COLUMNS} FROM transactions WHERE user_id = ?{where} ORDER BY {_order_sql(filters)}",
+        [user_id, *params],
+    ).fetchall()
+
+
+def get_all_transactions(
+    user_id: int,
+    conn: Connection,
+    filters: TransactionFilter | None = None,
+) -> list[TransactionRead]:
+    """Return all transactions belonging to the given user, optionally filtered and sorted."""
+    return [_row_to_read(row) for row in _select_all(user_id, conn, filters)]
+
+
+def open_transaction_export(user_id: int, conn: Connection, filters: TransactionFilter) -> Cursor:
+    """
+    Run the filtered export query and return its cursor unread. The caller
+    drains it with fetchmany(), so rows are never materialised all at once.
+    """
+    where, params = _filter_sql(filters)
+    return conn.execute(
+        f"SELECT {', '.join(EXPORT_COLUMNS)} FROM transactions WHERE user_id = ?{where} "
+        f"ORDER BY {_order_sql(filters)}",
+        [user_id, *params],
+    )
+
+
+def encode_cursor(values: list, sort: str = "date", order: str = "desc") -> str:
+    """Opaque page token for a keyset position under the given sort."""
+    raw = json.dumps([sort, order, list(values)], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str = "date", order: str = "desc") -> list:
+    """Inverse of encode_cursor; raises ValueError on a malformed or mismatched token."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_sort, cursor_order, values = json.loads(raw)
+    except (ValueError, TypeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+    if (cursor_sort, cursor_order) != (sort, order):
+        raise ValueError("Cursor does not match the requested sort order")
+    columns = _SORT_COLUMNS[sort]
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise ValueError("Invalid cursor")
+    for column, value in zip(columns, values):
+        # bool is an int subclass but never a valid keyset value.
+        if isinstance(value, bool) or not isinstance(value, _SORT_COLUMN_TYPES[column]):
+            raise ValueError("Invalid cursor")
+    return values
+
+
+def _select_page(
+    user_id: int,
+    conn: Connection,
+    limit: int,
+    cursor: str | None,
+    filters: TransactionFilter | None,
+) -> tuple[list[Row], str | None]:
+    filters = filters or TransactionFilter()
+    columns = _SORT_COLUMNS[filters.sort]
+    where, params = _filter_sql(filters)
+    sql = f"SELECT {_COLUMNS} FROM transactions WHERE user_id = ?{where}"
+    params = [user_id, *params]
+    if cursor is not None:
+        values = decode_cursor(cursor, filters.sort, filters.order)
+        op = "<" if filters.order == "desc" else ">"
+        if len(columns) == 1:
+            sql += f" AND {columns[0]} {op} ?"
+        else:
+            sql += f" AND ({', '.join(columns)}) {op} ({', '.join('?' * len(columns))})"
+        params += values
+    sql += f" ORDER BY {_order_sql(filters)} LIMIT ?"
+    params.append(limit + 1)
+    rows = conn.execute(sql, params).fetchall()
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = encode_cursor([last[column] for column in columns], filters.sort, filters.order)
+    return rows[:limit], next_cursor
+
+
+def get_transactions_page(
+    user_id: int,
+    conn: Connection,
+    limit: int,
+    cursor: str | None = None,
+    filters: TransactionFilter | None = None,
+) -> tuple[list[TransactionRead], str | None]:
+    """
+    Return one page of the user's transactions plus the cursor for the next
+    page (None on the last page). Default order is newest first. Each page is
+    a range scan of a (user_id, ...) index starting after the cursor position.
+    """
+    rows, next_cursor = _select_page(user_id, conn, limit, cursor, filters)
+    return [_row_to_read(row) for row in rows], next_cursor
+
+
+def get_transaction_columns(
+    user_id: int,
+    conn: Connection,
+    filters: TransactionFilter | None = None,
+    limit: int | None = None,
+    cursor: str | None = None,
+) -> dict:
+    """
+    Columnar variant of get_all_transactions (limit is None) or
+    get_transactions_page, built from the row tuples without per-row models.
+    Paged payloads carry `next_cursor`.
+    """
+    if limit is None:
+        return columns(_select_all(user_id, conn, filters))
+    rows, next_cursor = _select_page(user_id, conn, limit, cursor, filters)
+    return {**columns(rows), "next_cursor": next_cursor}
+
+
+def get_transaction_records(
+    user_id: int,
+    conn: Connection,
+    filters: TransactionFilter | None = None,
+    limit: int | None = None,
+    cursor: str | None = None,
+) -> list[dict] | dict:
+    """
+    get_all_transactions (limit is None) or a TransactionPage-shaped dict, as
+    plain dicts in TransactionRead field order for fastjson.dumps.
+    """
+    if limit is None:
+        return records(_select_all(user_id, conn, filters), EXPORT_COLUMNS)
+    rows, next_cursor = _select_page(user_id, conn, limit, cursor, filters)
+    return {"items": records(rows, EXPORT_COLUMNS), "next_cursor": next_cursor}
+
+
+def search_transactions(text: str, user_id: int, conn: Connection, limit: int = 20) -> list[TransactionRead]:
+    """Full-text search over note, category and account names; best match first."""
+    match = build_match_query(text, user_id)
+    if match is None:
+        return []
+    rows = conn.execute(
+        "SELECT t.* FROM transactions_fts "
+        "JOIN transactions t ON t.id = transactions_fts.rowid "
+        "WHERE transactions_fts MATCH ? AND t.user_id = ? "
+        f"ORDER BY {RANK}, t.date DESC, t.id DESC LIMIT ?",
+        (match, user_id, limit),
+    ).fetchall()
+    return [_row_to_read(row) for row in rows]
 
 
 def get_transactions_by_name(transaction_name: str, user_id: int, conn: Connection) -> list[TransactionRead] | None:
@@ -50,7 +270,13 @@ def create_transaction(new: TransactionCreate, user_id: int, conn: Connection) -
             "UPDATE accounts SET balance = balance + ? WHERE id = ? AND user_id = ?",
             (delta, new.account_id, user_id)
         )
-    conn.commit()
+    update_rollup(user_id, conn, added=[ledger_row(new)])
+    index_transaction(cursor.lastrowid, conn)
+    version = bump_version(user_id, conn)
+    log_changes(user_id, version, "transactions", [cursor.lastrowid], conn)
+    if new.account_id is not None:
+        log_changes(user_id, version, "accounts", [new.account_id], conn)
+    _commit(conn, user_id, new.account_id is not None)
     return TransactionRead(
         id=cursor.lastrowid,
         type=new.type,
@@ -62,6 +288,101 @@ def create_transaction(new: TransactionCreate, user_id: int, conn: Connection) -
     )
 
 
+def create_transactions(items: list[TransactionCreate], user_id: int, conn: Connection) -> list[int]:
+    """
+    Insert many transactions in one DB transaction and return their ids.
+
+    Rows go in with a single executemany, each affected account gets one net
+    balance update, and everything commits once — or not at all.
+    """
+    if not items:
+        return []
+    conn.executemany(
+        "INSERT INTO transactions (type, amount_cents, date, note, category_id, account_id, user_id) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        [(t.type, t.amount_cents, t.date, t.note, t.category_id, t.account_id, user_id) for t in items],
+    )
+    # AUTOINCREMENT ids from one writer inside one transaction are contiguous.
+    last_id = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'transactions'").fetchone()[0]
+    first_id = last_id - len(items) + 1
+
+    deltas: dict[int, int] = {}
+    for t in items:
+        if t.account_id is not None:
+            delta = t.amount_cents if t.type == "income" else -t.amount_cents
+            deltas[t.account_id] = deltas.get(t.account_id, 0) + delta
+    conn.executemany(
+        "UPDATE accounts SET balance = balance + ? WHERE id = ? AND user_id = ?",
+        [(delta, account_id, user_id) for account_id, delta in deltas.items() if delta],
+    )
+    update_rollup(user_id, conn, added=[ledger_row(t) for t in items])
+    index_new_transactions(first_id, last_id, conn)
+    version = bump_version(user_id, conn)
+    log_changes(user_id, version, "transactions", range(first_id, last_id + 1), conn)
+    log_changes(user_id, version, "accounts", deltas, conn)
+    _commit(conn, user_id, bool(deltas))
+    return list(range(first_id, last_id + 1))
+
+
+def get_import_name_maps(user_id: int, conn: Connection) -> tuple[dict[str, int], dict[str, int]]:
+    """Lower-cased category and account name→id maps, loaded once per import."""
+    categories = {
+        row["name"].lower(): row["id"]
+        for row in conn.execute("SELECT id, name FROM categories WHERE user_id = ?", (user_id,))
+    }
+    accounts = {
+        row["name"].lower(): row["id"]
+        for row in conn.execute("SELECT id, name FROM accounts WHERE user_id = ?", (user_id,))
+    }
+    return categories, accounts
+
+
+def import_transactions(rows: list[ImportRow], user_id: int, conn: Connection) -> list[int]:
+    """
+    Insert one chunk of imported rows in one DB transaction and return the
+    statement lines that were skipped as duplicates.
+
+    A row whose import_hash the user already has is ignored by the unique
+    index; balances and the search index only see the rows that went in.
+    """
+    duplicates: list[int] = []
+    inserted: list[ImportRow] = []
+    deltas: dict[int, int] = {}
+    ids: list[int] = []
+    for row in rows:
+        cursor = conn.execute(
+            "INSERT OR IGNORE INTO transactions "
+            "(type, amount_cents, date, note, category_id, account_id, user_id, import_hash) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (row.type, row.amount_cents, row.date, row.note, row.category_id, row.account_id,
+             user_id, row.import_hash),
+        )
+        if not cursor.rowcount:
+            duplicates.append(row.line)
+            continue
+        ids.append(cursor.lastrowid)
+        inserted.append(row)
+        if row.account_id is not None:
+            delta = row.amount_cents if row.type == "income" else -row.amount_cents
+            deltas[row.account_id] = deltas.get(row.account_id, 0) + delta
+    conn.executemany(
+        "UPDATE accounts SET balance = balance + ? WHERE id = ? AND user_id = ?",
+        [(delta, account_id, user_id) for account_id, delta in deltas.items() if delta],
+    )
+    update_rollup(user_id, conn, added=[ledger_row(row) for row in inserted])
+    if ids:
+        # Ignored rows consume no id, so the inserted ones are contiguous.
+        index_new_transactions(ids[0], ids[-1], conn)
+        version = bump_version(user_id, conn)
+        log_changes(user_id, version, "transactions", ids, conn)
+        log_changes(user_id, version, "accounts", deltas, conn)
+    if inserted:
+        _commit(conn, user_id, bool(deltas))
+    else:
+        conn.commit()
+    return duplicates
+
+
 def delete_transaction(transaction_id: int, user_id: int, conn: Connection) -> bool:
     """Delete a transaction scoped to the user and reverse its effect on the account balance."""
     cursor = conn.cursor()
@@ -77,7 +398,13 @@ def delete_transaction(transaction_id: int, user_id: int, conn: Connection) -> b
             "UPDATE accounts SET balance = balance + ? WHERE id = ? AND user_id = ?",
             (delta, old["account_id"], user_id)
         )
-    conn.commit()
+    update_rollup(user_id, conn, removed=[ledger_row(old)])
+    unindex_transaction(transaction_id, conn)
+    version = bump_version(user_id, conn)
+    log_changes(user_id, version, "transactions", [transaction_id], conn, deleted=True)
+    if old["account_id"] is not None:
+        log_changes(user_id, version, "accounts", [old["account_id"]], conn)
+    _commit(conn, user_id, old["account_id"] is not None)
     return True
 
 
@@ -112,6 +439,11 @@ def update_transaction(
             "UPDATE accounts SET balance = balance + ? WHERE id = ? AND user_id = ?",
             (new_delta, update.account_id, user_id)
         )
-    conn.commit()
+    update_rollup(user_id, conn, added=[ledger_row(update)], removed=[ledger_row(old)])
+    index_transaction(transaction_id, conn)
+    version = bump_version(user_id, conn)
+    log_changes(user_id, version, "transactions", [transaction_id], conn)
+    log_changes(user_id, version, "accounts", {old["account_id"], update.account_id} - {None}, conn)
+    _commit(conn, user_id, old["account_id"] is not None or update.account_id is not None)
     row = cursor.execute("SELECT * FROM transactions WHERE id = ?", (transaction_id,)).fetchone()
     return _row_to_read(row)
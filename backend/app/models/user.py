@@ -1,5 +1,7 @@
 import sqlite3
 
+from ..usercache import invalidate_user
+
 def get_user_by_username(username: str, conn: sqlite3.Connection):
     row = conn.execute(
         "SELECT id, username, hashed_password FROM users WHERE username = ?",
@@ -13,4 +15,13 @@ def create_user(username: str, hashed_password: str, conn: sqlite3.Connection ):
         (username, hashed_password),
     )
     conn.commit()
-    return {"id": cursor.lastrowid, "username": username}
\ No newline at end of file
+    invalidate_user(username)
+    return {"id": cursor.lastrowid, "username": username}
+
+def update_password_hash(username: str, hashed_password: str, conn: sqlite3.Connection) -> None:
+    conn.execute(
+        "UPDATE users SET hashed_password = ? WHERE username = ?",
+        (hashed_password, username),
+    )
+    conn.commit()
+    invalidate_user(username)
@@ -0,0 +1,51 @@
+"""
+Per-user data version.
+
+Every model-layer write that changes a user's accounts, categories or
+transactions calls bump_version() inside its own DB transaction, so the
+version moves forward exactly when something visible changed. Readers use it
+as a cheap "has anything changed?" check (ETags on the list endpoints).
+
+Writers also record which rows they touched in `change_log` at the new
+version (log_changes), one row per entity kept at its latest change, so
+GET /sync can return just the rows changed since a client's version.
+"""
+from sqlite3 import Connection
+from typing import Iterable
+
+
+def bump_version(user_id: int, conn: Connection) -> int:
+    """Increment the user's data version and return the new value."""
+    return conn.execute(
+        "INSERT INTO user_versions (user_id, version) VALUES (?, 1) "
+        "ON CONFLICT (user_id) DO UPDATE SET version = version + 1 RETURNING version",
+        (user_id,),
+    ).fetchone()[0]
+
+
+def get_version(user_id: int, conn: Connection) -> int:
+    """Current data version of the user (0 before their first write)."""
+    row = conn.execute("SELECT version FROM user_versions WHERE user_id = ?", (user_id,)).fetchone()
+    return row[0] if row else 0
+
+
+def log_changes(
+    user_id: int, version: int, entity: str, entity_ids: Iterable[int], conn: Connection, deleted: bool = False
+) -> None:
+    """Record that the given rows changed (or were deleted) at `version`."""
+    conn.executemany(
+        "INSERT INTO change_log (user_id, entity, entity_id, version, deleted) VALUES (?, ?, ?, ?, ?) "
+        "ON CONFLICT (user_id, entity, entity_id) DO UPDATE SET version = excluded.version, deleted = excluded.deleted",
+        [(user_id, entity, entity_id, version, int(deleted)) for entity_id in entity_ids],
+    )
+
+
+def reset_sync(user_id: int, conn: Connection) -> int:
+    """
+    Bump the version and make it the user's sync floor after data was rewritten
+    outside the model layer, so every client falls back to a full resync.
+    """
+    version = bump_version(user_id, conn)
+    conn.execute("UPDATE user_versions SET sync_floor = ? WHERE user_id = ?", (version, user_id))
+    conn.execute("DELETE FROM change_log WHERE user_id = ?", (user_id,))
+    return version
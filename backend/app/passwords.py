@@ -0,0 +1,132 @@
+"""
+bcrypt off the event loop and off the GIL.
+
+Hashing or checking a password costs tens to hundreds of milliseconds of CPU
+by design. Routes hand that work to a dedicated process pool of
+FT_PASSWORD_WORKERS processes, so a burst of logins neither blocks the event
+loop nor holds the threads other endpoints use. At most FT_PASSWORD_QUEUE_SIZE
+further jobs may wait; past that PasswordPoolFull is raised straight away and
+the request gets a 503 instead of queueing behind the burst.
+
+Only bcrypt's own functions are sent to the workers, so a worker process
+imports bcrypt and nothing from the app.
+
+FT_BCRYPT_ROUNDS is the cost factor for new hashes. needs_rehash() tells the
+login route when a stored hash was made with a different cost, so it can be
+re-hashed while the plain password is at hand.
+"""
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Callable
+
+import bcrypt
+
+from . import config
+
+
+class PasswordPoolFull(Exception):
+    """Raised when every worker is busy and the wait queue is full."""
+
+
+def _process_pool(workers: int) -> Executor:
+    # forkserver avoids forking a process that already runs threads.
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(method))
+
+
+def hash_rounds(hashed: str) -> int | None:
+    """Cost factor of a bcrypt hash ("$2b$12$..." -> 12), or None if it is not one."""
+    parts = hashed.split("$")
+    try:
+        return int(parts[2])
+    except (IndexError, ValueError):
+        return None
+
+
+def needs_rehash(hashed: str, rounds: int = config.BCRYPT_ROUNDS) -> bool:
+    return hash_rounds(hashed) != rounds
+
+
+class PasswordPool:
+    def __init__(
+        self,
+        workers: int = config.PASSWORD_WORKERS,
+        queue_size: int = config.PASSWORD_QUEUE_SIZE,
+        rounds: int = config.BCRYPT_ROUNDS,
+        executor_factory: Callable[[int], Executor] = _process_pool,
+    ) -> None:
+        self.workers = workers
+        self.queue_size = queue_size
+        self.rounds = rounds
+        self._executor_factory = executor_factory
+        self._executor: Executor | None = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._stats = {"completed": 0, "failed": 0, "rejected": 0, "max_pending": 0}
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = self._executor_factory(self.workers)
+        return self._executor
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run `fn(*args)` on a worker; PasswordPoolFull if workers and queue are all taken."""
+        with self._lock:
+            if self._pending >= self.workers + self.queue_size:
+                self._stats["rejected"] += 1
+                raise PasswordPoolFull("Password workers are saturated")
+            self._pending += 1
+            self._stats["max_pending"] = max(self._stats["max_pending"], self._pending)
+            executor = self._get_executor()
+        failed = True
+        try:
+            result = await asyncio.wrap_future(executor.submit(fn, *args))
+            failed = False
+            return result
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self._stats["failed" if failed else "completed"] += 1
+
+    async def hash(self, plain: str) -> str:
+        hashed = await self.run(bcrypt.hashpw, plain.encode(), bcrypt.gensalt(self.rounds))
+        return hashed.decode()
+
+    async def verify(self, plain: str, hashed: str) -> bool:
+        return await self.run(bcrypt.checkpw, plain.encode(), hashed.encode())
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update(pending=self._pending, workers=self.workers, queue_size=self.queue_size, rounds=self.rounds)
+        return stats
+
+    def close(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+_pool: PasswordPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_password_pool() -> PasswordPool:
+    """Return the process-wide password pool (also used as a route dependency)."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = PasswordPool()
+    return _pool
+
+
+def close_password_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
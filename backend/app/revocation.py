@@ -0,0 +1,84 @@
+"""
+In-memory mirror of the revoked_tokens table.
+
+Logging out records the token's `jti` in revoked_tokens (models/token.py)
+and adds it here after the commit, so get_current_user checks revocation
+with one dict lookup instead of a query. The set is filled from the table on
+first use. An id is only kept until its token's `exp`, after which the
+signature check rejects the token anyway: a heap ordered by expiry prunes
+stale ids as they lapse, so memory is bounded by the number of revoked
+tokens still alive.
+
+Like the response cache, the mirror lives in this process; a token revoked
+by another process is only seen here after a restart.
+"""
+import heapq
+import threading
+import time
+from typing import Iterable
+
+
+class Denylist:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._expires: dict[str, float] = {}
+        self._heap: list[tuple[float, str]] = []
+        self.loaded = False
+
+    def load(self, rows: Iterable[tuple[str, float]]) -> None:
+        """Merge (jti, expires_at) rows read from the table and mark the mirror loaded."""
+        with self._lock:
+            for jti, expires_at in rows:
+                self._add(jti, expires_at)
+            self.loaded = True
+
+    def add(self, jti: str, expires_at: float) -> None:
+        with self._lock:
+            self._prune(time.time())
+            self._add(jti, expires_at)
+
+    def is_revoked(self, jti: str | None) -> bool:
+        if jti is None:
+            return False
+        now = time.time()
+        if self._heap and self._heap[0][0] <= now:
+            with self._lock:
+                self._prune(now)
+        expires_at = self._expires.get(jti)
+        return expires_at is not None and expires_at > now
+
+    def _add(self, jti: str, expires_at: float) -> None:
+        if expires_at <= time.time() or self._expires.get(jti, 0) >= expires_at:
+            return
+        self._expires[jti] = expires_at
+        heapq.heappush(self._heap, (expires_at, jti))
+
+    def _prune(self, now: float) -> None:
+        while self._heap and self._heap[0][0] <= now:
+            expires_at, jti = heapq.heappop(self._heap)
+            if self._expires.get(jti) == expires_at:
+                del self._expires[jti]
+
+    def clear(self) -> None:
+        """Forget everything; the next check reloads from the table."""
+        with self._lock:
+            self._expires.clear()
+            self._heap.clear()
+            self.loaded = False
+
+    def __len__(self) -> int:
+        return len(self._expires)
+
+
+_denylist: Denylist | None = None
+_denylist_lock = threading.Lock()
+
+
+def get_denylist() -> Denylist:
+    """Return the process-wide denylist."""
+    global _denylist
+    if _denylist is None:
+        with _denylist_lock:
+            if _denylist is None:
+                _denylist = Denylist()
+    return _denylist
@@ -2,5 +2,8 @@ from .transaction import transaction_router
 from .category import category_router
 from .account import account_router
 from .auth import auth_router
+from .metrics import metrics_router
+from .report import report_router
+from .sync import sync_router
 
-__all__ = ["transaction_router", "category_router", "account_router", "auth_router"]
\ No newline at end of file
+__all__ = ["transaction_router", "category_router", "account_router", "auth_router", "metrics_router", "report_router", "sync_router"]
\ No newline at end of file
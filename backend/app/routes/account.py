@@ -1,59 +1,93 @@
 from sqlite3 import Connection, IntegrityError
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
-from ..db import get_connection
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from typing import List, Optional
+from ..cache import read_through
+from ..fastjson import dumps
+from ..db import get_connection, run_db
 from ..models.account import (
-    get_all_accounts, get_accounts_by_name, create_account,
+    get_account_records, get_accounts_by_name, create_account,
     delete_account, update_account
 )
-from ..schemas.account import AccountRead, AccountCreate
+from ..models.balance import get_balance_history, refresh_snapshots, snapshots_stale
+from ..schemas.account import AccountRead, AccountCreate, AccountHistory
+from ..schemas.transaction import DATE_PATTERN
 from ..auth import get_current_user
+from ..etag import list_etag
+from ..writer import WriteQueue, get_writer
 
 account_router = APIRouter(prefix="/accounts", tags=["Accounts"])
 
 
-@account_router.get("/", response_model=List[AccountRead])
-def account_list(conn: Connection = Depends(get_connection), current_user=Depends(get_current_user)):
-    return get_all_accounts(current_user["id"], conn)
+@account_router.get("/", response_model=List[AccountRead], dependencies=[Depends(list_etag)])
+async def account_list(
+    response: Response,
+    conn: Connection = Depends(get_connection),
+    current_user=Depends(get_current_user)
+    ):
+    return await read_through(
+        response, current_user["id"], "accounts", "list",
+        lambda: run_db(get_account_records, current_user["id"], conn), dumps,
+    )
+
+@account_router.get("/{account_id}/history", response_model=AccountHistory)
+async def account_history(
+    account_id: int,
+    date_from: Optional[str] = Query(None, pattern=DATE_PATTERN),
+    date_to: Optional[str] = Query(None, pattern=DATE_PATTERN),
+    conn: Connection = Depends(get_connection),
+    writer: WriteQueue = Depends(get_writer),
+    current_user=Depends(get_current_user),
+    ) -> AccountHistory:
+    # Month-end snapshots are filled on the writer the first time a completed
+    # month is asked for; after that every point is a snapshot plus one month.
+    if await run_db(snapshots_stale, account_id, current_user["id"], conn):
+        await writer.run(refresh_snapshots, account_id, current_user["id"])
+    try:
+        history = await run_db(get_balance_history, account_id, current_user["id"], conn, date_from, date_to)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    if history is None:
+        raise HTTPException(status_code=404, detail="Account doesn't exist")
+    return history
 
 @account_router.get("/{account_name}", response_model=List[AccountRead])
-def account_details(
+async def account_details(
     account_name: str,
     conn: Connection = Depends(get_connection),
     current_user=Depends(get_current_user),
     ) -> list[AccountRead] | None:
-    return get_accounts_by_name(account_name, current_user["id"], conn)
+    return await run_db(get_accounts_by_name, account_name, current_user["id"], conn)
 
 @account_router.post("/", response_model=AccountRead)
-def account_create(
+async def account_create(
     new: AccountCreate,
-    conn: Connection = Depends(get_connection),
+    writer: WriteQueue = Depends(get_writer),
     current_user=Depends(get_current_user)
     ) -> AccountRead:
     try:
-        account = create_account(new, current_user["id"], conn)
+        account = await writer.run(create_account, new, current_user["id"])
     except IntegrityError as exc:
         raise HTTPException(status_code=400, detail="Account already exists") from exc
     return account
 
 @account_router.delete("/{account_id}", status_code=204)
-def remove_account(
+async def remove_account(
     account_id: int,
-    conn: Connection = Depends(get_connection),
+    writer: WriteQueue = Depends(get_writer),
     current_user=Depends(get_current_user)
 ):
-    if delete_account(account_id, current_user["id"], conn):
+    if await writer.run(delete_account, account_id, current_user["id"]):
         return None
     raise HTTPException(status_code=404, detail="Account doesn't exist")
 
 @account_router.patch("/{account_id}", response_model=AccountRead)
-def edit_account(
+async def edit_account(
     account_id: int,
     updated_account: AccountCreate,
-    conn: Connection = Depends(get_connection),
+    writer: WriteQueue = Depends(get_writer),
     current_user=Depends(get_current_user)
 ):
-    updated = update_account(account_id, updated_account, current_user["id"], conn)
+    updated = await writer.run(update_account, account_id, updated_account, current_user["id"])
     if updated is None:
         raise HTTPException(status_code=404, detail="Account not found")
     return updated
@@ -1,34 +1,60 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
+from jose import jwt
 from sqlite3 import Connection, IntegrityError
 
-from ..db import get_connection
-from ..models.user import get_user_by_username, create_user
+from ..db import get_connection, run_db
+from ..models.token import revoke_token
+from ..models.user import get_user_by_username, create_user, update_password_hash
 from ..schemas.user import UserCreate, UserRead, Token
-from ..auth import hash_password, verify_password, create_access_token, get_current_user
+from ..auth import create_access_token, get_current_user, oauth2_scheme, SECRET_KEY, ALGORITHM
+from ..passwords import PasswordPool, get_password_pool, needs_rehash
+from ..usercache import get_user_cache
+from ..writer import WriteQueue, get_writer
 
 auth_router = APIRouter(prefix="/auth", tags=["Auth"])
 
 @auth_router.post("/register", response_model=UserRead, status_code=201)
-def register(new: UserCreate, conn: Connection = Depends(get_connection)):
+async def register(
+    new: UserCreate,
+    writer: WriteQueue = Depends(get_writer),
+    passwords: PasswordPool = Depends(get_password_pool),
+):
+    hashed = await passwords.hash(new.password)
     try:
-        user = create_user(new.username, hash_password(new.password), conn)
+        user = await writer.run(create_user, new.username, hashed)
     except IntegrityError:
         raise HTTPException(status_code=400, detail="Username already taken")
     return user
 
 @auth_router.post("/token", response_model=Token)
-def login(form: OAuth2PasswordRequestForm = Depends(), conn: Connection = Depends(get_connection)):
-    user = get_user_by_username(form.username, conn)
-    if not user or not verify_password(form.password, user["hashed_password"]):
+async def login(
+    form: OAuth2PasswordRequestForm = Depends(),
+    conn: Connection = Depends(get_connection),
+    writer: WriteQueue = Depends(get_writer),
+    passwords: PasswordPool = Depends(get_password_pool),
+):
+    user = await run_db(get_user_by_username, form.username, conn)
+    if not user or not await passwords.verify(form.password, user["hashed_password"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    if needs_rehash(user["hashed_password"], passwords.rounds):
+        await writer.run(update_password_hash, user["username"], await passwords.hash(form.password))
     token = create_access_token({"sub": user["username"]})
     return {"access_token": token, "token_type": "bearer"}
 
 @auth_router.post("/logout", status_code=200)
-def logout(current_user=Depends(get_current_user)):
+async def logout(
+    token: str = Depends(oauth2_scheme),
+    current_user=Depends(get_current_user),
+    writer: WriteQueue = Depends(get_writer),
+):
+    # get_current_user has already verified the token; it may have expired since.
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM], options={"verify_exp": False})
+    if payload.get("jti") is not None:
+        await writer.run(revoke_token, payload["jti"], current_user["id"], payload["exp"])
+    get_user_cache().discard(token)
     return {"detail": "Logged out successfully"}
@@ -1,46 +1,57 @@
 from sqlite3 import Connection, IntegrityError
-from fastapi import APIRouter, Depends, HTTPException
-from ..db import get_connection
-from ..models.category import get_all_categories, create_category, delete_category, update_category
+from fastapi import APIRouter, Depends, HTTPException, Response
+from ..cache import read_through
+from ..fastjson import dumps
+from ..db import get_connection, run_db
+from ..models.category import get_category_records, create_category, delete_category, update_category
 from ..schemas.category import CategoryRead, CategoryCreate
 from ..auth import get_current_user
+from ..etag import list_etag
+from ..writer import WriteQueue, get_writer
 
 category_router = APIRouter(prefix="/categories", tags=["Category"])
 
-@category_router.get("/", response_model=list[CategoryRead])
-def category_list(conn: Connection = Depends(get_connection), current_user=Depends(get_current_user)):
-    return get_all_categories(current_user["id"], conn)
+@category_router.get("/", response_model=list[CategoryRead], dependencies=[Depends(list_etag)])
+async def category_list(
+    response: Response,
+    conn: Connection = Depends(get_connection),
+    current_user=Depends(get_current_user)
+    ):
+    return await read_through(
+        response, current_user["id"], "categories", "list",
+        lambda: run_db(get_category_records, current_user["id"], conn), dumps,
+    )
 
 @category_router.post("/", response_model=CategoryRead)
-def add_category(
+async def add_category(
     new_category: CategoryCreate,
-    conn: Connection = Depends(get_connection),
+    writer: WriteQueue = Depends(get_writer),
     current_user=Depends(get_current_user)
     ) -> CategoryRead:
     try:
-        category = create_category(new_category, current_user["id"], conn)
+        category = await writer.run(create_category, new_category, current_user["id"])
     except IntegrityError as exc:
         raise HTTPException(status_code=400, detail="Category already exists") from exc
     return category
 
 @category_router.delete("/{category_id}", status_code=204)
-def remove_category(
+async def remove_category(
     category_id: int,
-    conn: Connection = Depends(get_connection),
+    writer: WriteQueue = Depends(get_writer),
     current_user=Depends(get_current_user)
     ):
-    if delete_category(category_id, current_user["id"], conn):
+    if await writer.run(delete_category, category_id, current_user["id"]):
         return None
     raise HTTPException(status_code=404, detail="Category doesn't exist")
 
 @category_router.patch("/{category_id}", response_model=CategoryRead)
-def edit_category(
+async def edit_category(
     category_id: int,
     updated_category: CategoryCreate,
-    conn: Connection = Depends(get_connection),
+    writer: WriteQueue = Depends(get_writer),
     current_user=Depends(get_current_user)
     ) -> CategoryRead:
-    updated = update_category(category_id, updated_category, current_user["id"], conn)
+    updated = await writer.run(update_category, category_id, updated_category, current_user["id"])
     if updated is None:
         raise HTTPException(status_code=404, detail="Category not found")
     return updated
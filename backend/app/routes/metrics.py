@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends
+
+from ..cache import get_cache
+from ..db import get_pool
+from ..passwords import get_password_pool
+from ..usercache import get_user_cache
+from ..writer import WriteQueue, get_writer
+
+metrics_router = APIRouter(prefix="/metrics", tags=["Metrics"])
+
+@metrics_router.get("/db")
+async def db_pool_stats() -> dict:
+    return get_pool().stats()
+
+@metrics_router.get("/writer")
+async def writer_stats(writer: WriteQueue = Depends(get_writer)) -> dict:
+    return writer.stats()
+
+@metrics_router.get("/cache")
+async def cache_stats() -> dict:
+    return get_cache().stats()
+
+@metrics_router.get("/auth")
+async def auth_cache_stats() -> dict:
+    return get_user_cache().stats()
+
+@metrics_router.get("/passwords")
+async def password_pool_stats() -> dict:
+    return get_password_pool().stats()
@@ -0,0 +1,29 @@
+from datetime import date
+from sqlite3 import Connection
+from typing import Optional
+from fastapi import APIRouter, Depends, Query, Response
+from pydantic import TypeAdapter
+from ..cache import read_through
+from ..db import get_connection, run_db
+from ..models.report import get_summary
+from ..schemas.report import ReportSummary
+from ..auth import get_current_user
+
+report_router = APIRouter(prefix="/reports", tags=["Reports"])
+
+_SUMMARY = TypeAdapter(ReportSummary)
+
+
+@report_router.get("/summary", response_model=ReportSummary)
+async def report_summary(
+    response: Response,
+    month: Optional[str] = Query(None, pattern=r"^\d{4}-(0[1-9]|1[0-2])$"),
+    trend: int = Query(6, ge=1, le=36),
+    conn: Connection = Depends(get_connection),
+    current_user=Depends(get_current_user)
+    ):
+    month = month or date.today().strftime("%Y-%m")
+    return await read_through(
+        response, current_user["id"], "reports", ("summary", month, trend),
+        lambda: run_db(get_summary, month, trend, current_user["id"], conn), _SUMMARY.dump_json,
+    )
@@ -0,0 +1,18 @@
+from sqlite3 import Connection
+from fastapi import APIRouter, Depends, Query
+from ..db import get_connection, run_db
+from ..models.sync import get_changes
+from ..schemas.sync import SyncResult
+from ..auth import get_current_user
+from ..etag import list_etag
+
+sync_router = APIRouter(tags=["Sync"])
+
+
+@sync_router.get("/sync", response_model=SyncResult, dependencies=[Depends(list_etag)])
+async def sync(
+    since: int = Query(0, ge=0),
+    conn: Connection = Depends(get_connection),
+    current_user=Depends(get_current_user)
+    ) -> SyncResult:
+    return await run_db(get_changes, since, current_user["id"], conn)
@@ -1,60 +1,220 @@
+from itertools import islice
 from sqlite3 import Connection, IntegrityError
-from fastapi import APIRouter, Depends, HTTPException
-from ..db import get_connection
+from typing import Annotated, Literal, Optional
+from fastapi import APIRouter, Body, Depends, File, Form, HTTPException, Query, Response, UploadFile
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from .. import config
+from ..cache import read_through
+from ..db import get_connection, run_db
+from ..export import MEDIA_TYPES, columnar_batch, csv_batch, csv_header, ndjson_batch
+from ..fastjson import dumps
+from ..formats import COLUMNAR, JSON, MSGPACK, encode, response_format
+from ..importer import CsvMapping, RowError, parse_csv, parse_ofx, resolve
 from ..models.transaction import (
-    get_all_transactions, get_transactions_by_name, create_transaction,
+    get_transaction_records, get_transaction_columns, get_transactions_by_name, search_transactions,
+    open_transaction_export,
+    create_transaction, create_transactions, get_import_name_maps, import_transactions,
     delete_transaction, update_transaction
 )
-from ..schemas.transaction import TransactionRead, TransactionCreate
+from ..schemas.transaction import (
+    TransactionRead, TransactionCreate, TransactionPage, TransactionListQuery, TransactionExportQuery,
+    TransactionBulkResult,
+    TransactionImportResult, ImportRowError
+)
 from ..auth import get_current_user
+from ..etag import format_etag
+from ..writer import WriteQueue, get_writer
 
 transaction_router = APIRouter(prefix="/transactions", tags=["Transaction"])
 
-@transaction_router.get("/", response_model=list[TransactionRead])
-def transaction_list(conn: Connection = Depends(get_connection), current_user=Depends(get_current_user)):
-    return get_all_transactions(current_user["id"], conn)
+DEFAULT_PAGE_SIZE = 50
+MAX_BULK_ITEMS = 5000
+MAX_IMPORT_ERRORS = 1000
+EXPORT_BATCH_SIZE = 1000
+
+
+@transaction_router.get(
+    "/",
+    response_model=list[TransactionRead] | TransactionPage,
+    dependencies=[Depends(format_etag)],
+    responses={200: {"content": {COLUMNAR: {}, MSGPACK: {}}}},
+)
+async def transaction_list(
+    response: Response,
+    query: Annotated[TransactionListQuery, Query()],
+    media_type: str = Depends(response_format),
+    conn: Connection = Depends(get_connection),
+    current_user=Depends(get_current_user)
+    ):
+    filters = query if query.is_filtered else None
+    # Without limit/cursor the full list is returned for backward compatibility.
+    paged = query.limit is not None or query.cursor is not None
+    limit = (query.limit or DEFAULT_PAGE_SIZE) if paged else None
+
+    if media_type == JSON:
+        fetch, serialize = get_transaction_records, dumps
+    else:
+        fetch, serialize = get_transaction_columns, lambda payload: encode(payload, media_type)
+    try:
+        return await read_through(
+            response, current_user["id"], "transactions", (media_type, query.model_dump_json(exclude_unset=True)),
+            lambda: run_db(fetch, current_user["id"], conn, query if paged else filters, limit, query.cursor),
+            serialize, media_type,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+@transaction_router.get("/search", response_model=list[TransactionRead])
+async def transaction_search(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    conn: Connection = Depends(get_connection),
+    current_user=Depends(get_current_user)
+    ) -> list[TransactionRead]:
+    return await run_db(search_transactions, q, current_user["id"], conn, limit)
+
+@transaction_router.get("/export", response_class=StreamingResponse)
+async def transaction_export(
+    query: Annotated[TransactionExportQuery, Query()],
+    conn: Connection = Depends(get_connection),
+    current_user=Depends(get_current_user)
+    ):
+    # The pooled connection is released only after the response has been
+    # sent, so the cursor stays valid while the body streams.
+    cursor = await run_db(open_transaction_export, current_user["id"], conn, query)
+    encode_batch = {"csv": csv_batch, "ndjson": ndjson_batch, "columnar": columnar_batch}[query.format]
+
+    async def body():
+        try:
+            if query.format == "csv":
+                yield csv_header()
+            while rows := await run_db(cursor.fetchmany, EXPORT_BATCH_SIZE):
+                yield encode_batch(rows)
+        finally:
+            cursor.close()
+
+    return StreamingResponse(
+        body(),
+        media_type=MEDIA_TYPES[query.format],
+        headers={"Content-Disposition": f'attachment; filename="transactions.{query.format}"'},
+    )
 
 @transaction_router.get("/{transaction_name}", response_model=list[TransactionRead])
-def transaction_details(
+async def transaction_details(
     transaction_name: str,
     conn: Connection = Depends(get_connection),
     current_user=Depends(get_current_user)
     ) -> list[TransactionRead] | None:
-    transaction = get_transactions_by_name(transaction_name, current_user["id"], conn)
+    transaction = await run_db(get_transactions_by_name, transaction_name, current_user["id"], conn)
     if transaction is None:
         raise HTTPException(status_code=404, detail="Transaction doesn't exist")
     return transaction
 
 @transaction_router.post("/", response_model=TransactionRead)
-def add_transaction(
+async def add_transaction(
     new: TransactionCreate,
-    conn: Connection = Depends(get_connection),
+    writer: WriteQueue = Depends(get_writer),
     current_user=Depends(get_current_user)
 ):
     try:
-        transaction = create_transaction(new, current_user["id"], conn)
+        transaction = await writer.run(create_transaction, new, current_user["id"])
     except IntegrityError as exc:
         raise HTTPException(status_code=400, detail="Transaction already exists") from exc
     return transaction
 
+@transaction_router.post("/bulk", response_model=TransactionBulkResult)
+async def add_transactions_bulk(
+    items: Annotated[list[TransactionCreate], Body(min_length=1, max_length=MAX_BULK_ITEMS)],
+    writer: WriteQueue = Depends(get_writer),
+    current_user=Depends(get_current_user)
+):
+    try:
+        ids = await writer.run(create_transactions, items, current_user["id"])
+    except IntegrityError as exc:
+        raise HTTPException(status_code=400, detail="Bulk insert rejected; nothing was saved") from exc
+    return TransactionBulkResult(ids=ids)
+
+@transaction_router.post("/import", response_model=TransactionImportResult)
+async def import_statement(
+    file: UploadFile = File(...),
+    format: Literal["csv", "ofx"] = Form("csv"),
+    account_id: Optional[int] = Form(None),
+    date_column: str = Form("date"),
+    amount_column: str = Form("amount"),
+    note_column: Optional[str] = Form("note"),
+    type_column: Optional[str] = Form(None),
+    category_column: Optional[str] = Form(None),
+    account_column: Optional[str] = Form(None),
+    date_format: str = Form("%Y-%m-%d"),
+    amount_scale: int = Form(1, ge=1),
+    delimiter: str = Form(",", min_length=1, max_length=1),
+    conn: Connection = Depends(get_connection),
+    writer: WriteQueue = Depends(get_writer),
+    current_user=Depends(get_current_user)
+):
+    # Parsing is lazy: each round reads one chunk of the upload in a worker
+    # thread and commits it through the writer, so memory is bounded by the
+    # chunk size rather than the file size.
+    categories, accounts = await run_db(get_import_name_maps, current_user["id"], conn)
+    if account_id is not None and account_id not in accounts.values():
+        raise HTTPException(status_code=400, detail="Account doesn't exist")
+    if format == "ofx":
+        parsed = parse_ofx(file.file)
+    else:
+        parsed = parse_csv(file.file, CsvMapping(
+            date_column=date_column, amount_column=amount_column, note_column=note_column or None,
+            type_column=type_column or None, category_column=category_column or None,
+            account_column=account_column or None, date_format=date_format,
+            amount_scale=amount_scale, delimiter=delimiter,
+        ))
+    rows = resolve(parsed, categories, accounts, account_id)
+    result = TransactionImportResult()
+
+    def report(line: int, error: str) -> None:
+        result.failed += 1
+        if len(result.errors) < MAX_IMPORT_ERRORS:
+            result.errors.append(ImportRowError(line=line, error=error))
+        else:
+            result.errors_truncated = True
+
+    while batch := await run_in_threadpool(list, islice(rows, config.IMPORT_CHUNK_SIZE)):
+        chunk = []
+        for row in batch:
+            if isinstance(row, RowError):
+                report(row.line, row.error)
+            else:
+                chunk.append(row)
+        if not chunk:
+            continue
+        try:
+            duplicates = await writer.run(import_transactions, chunk, current_user["id"])
+        except IntegrityError as exc:
+            for row in chunk:
+                report(row.line, f"rejected by the database: {exc}")
+            continue
+        result.duplicates += len(duplicates)
+        result.imported += len(chunk) - len(duplicates)
+    return result
+
 @transaction_router.delete("/{transaction_id}", status_code=204)
-def remove_transaction(
+async def remove_transaction(
     transaction_id: int,
-    conn: Connection = Depends(get_connection),
+    writer: WriteQueue = Depends(get_writer),
     current_user=Depends(get_current_user)
 ):
-    if delete_transaction(transaction_id, current_user["id"], conn):
+    if await writer.run(delete_transaction, transaction_id, current_user["id"]):
         return None
     raise HTTPException(status_code=404, detail="Transaction doesn't exist")
 
 @transaction_router.patch("/{transaction_id}", response_model=TransactionRead)
-def edit_transaction(
+async def edit_transaction(
     transaction_id: int,
     updated_transaction: TransactionCreate,
-    conn: Connection = Depends(get_connection),
+    writer: WriteQueue = Depends(get_writer),
     current_user=Depends(get_current_user)
     ) -> TransactionRead:
-    updated = update_transaction(transaction_id, updated_transaction, current_user["id"], conn)
+    updated = await writer.run(update_transaction, transaction_id, updated_transaction, current_user["id"])
     if updated is None:
         raise HTTPException(status_code=404, detail="Transaction not found")
     return updated
@@ -1,5 +1,7 @@
-from .transaction import TransactionCreate, TransactionRead
+from .transaction import TransactionCreate, TransactionRead, TransactionPage, TransactionFilter, TransactionListQuery, TransactionExportQuery, TransactionBulkResult, TransactionImportResult, ImportRowError
 from .category import CategoryCreate, CategoryRead
-from .account import AccountCreate, AccountRead
+from .account import AccountCreate, AccountRead, AccountHistory, BalancePoint
+from .report import CategoryTotal, MonthTotal, ReportSummary
+from .sync import SyncDeleted, SyncResult
 
-__all__ = ["TransactionCreate", "TransactionRead", "CategoryCreate", "CategoryRead", "AccountCreate", "AccountRead"]
\ No newline at end of file
+__all__ = ["TransactionCreate", "TransactionRead", "TransactionPage", "TransactionFilter", "TransactionListQuery", "TransactionExportQuery", "TransactionBulkResult", "TransactionImportResult", "ImportRowError", "CategoryCreate", "CategoryRead", "AccountCreate", "AccountRead", "AccountHistory", "BalancePoint", "CategoryTotal", "MonthTotal", "ReportSummary", "SyncDeleted", "SyncResult"]
\ No newline at end of file
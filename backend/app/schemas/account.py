@@ -20,3 +20,11 @@ class AccountCreate(BaseModel):
     icon: str = ''
     currency: str = 'IDR'
 
+
+class BalancePoint(BaseModel):
+    date: str
+    balance: int
+
+class AccountHistory(BaseModel):
+    account_id: int
+    points: list[BalancePoint]
@@ -0,0 +1,25 @@
+from typing import Literal, Optional
+from pydantic import BaseModel
+from .transaction import TransactionRead
+
+class CategoryTotal(BaseModel):
+    type: Literal['income', 'expense']
+    category_id: Optional[int] = None
+    total: int
+    count: int
+
+class MonthTotal(BaseModel):
+    month: str
+    income: int = 0
+    expense: int = 0
+
+class ReportSummary(BaseModel):
+    month: str
+    income: int = 0
+    expense: int = 0
+    balance: int = 0
+    income_count: int = 0
+    expense_count: int = 0
+    categories: list[CategoryTotal] = []
+    trend: list[MonthTotal] = []
+    recent: list[TransactionRead] = []
@@ -0,0 +1,17 @@
+from pydantic import BaseModel, Field
+from .account import AccountRead
+from .category import CategoryRead
+from .transaction import TransactionRead
+
+class SyncDeleted(BaseModel):
+    transactions: list[int] = []
+    accounts: list[int] = []
+    categories: list[int] = []
+
+class SyncResult(BaseModel):
+    version: int
+    full: bool = False
+    transactions: list[TransactionRead] = []
+    accounts: list[AccountRead] = []
+    categories: list[CategoryRead] = []
+    deleted: SyncDeleted = Field(default_factory=SyncDeleted)
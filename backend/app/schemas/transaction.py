@@ -1,6 +1,9 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from enum import Enum
-from typing import Optional
+from typing import Literal, Optional
+
+# YYYY-MM-DD; dates are stored as ISO strings and compared as text.
+DATE_PATTERN = r"^\d{4}-(0[1-9]|1[0-2])-(0[1-9]|[12]\d|3[01])$"
 
 class TransactionType(str, Enum):
     INCOME = "income"
@@ -21,4 +24,47 @@ class TransactionRead(BaseModel):
     date: str
     note: Optional[str] = None
     category_id: Optional[int] = None
-    account_id: Optional[int] = None
\ No newline at end of file
+    account_id: Optional[int] = None
+
+class TransactionPage(BaseModel):
+    items: list[TransactionRead]
+    next_cursor: Optional[str] = None
+
+class TransactionBulkResult(BaseModel):
+    ids: list[int]
+
+class ImportRowError(BaseModel):
+    line: int
+    error: str
+
+class TransactionImportResult(BaseModel):
+    imported: int = 0
+    duplicates: int = 0
+    failed: int = 0
+    errors: list[ImportRowError] = []
+    errors_truncated: bool = False
+
+class TransactionFilter(BaseModel):
+    type: Optional[TransactionType] = None
+    month: Optional[str] = Field(None, pattern=r"^\d{4}-(0[1-9]|1[0-2])$")
+    date_from: Optional[str] = Field(None, pattern=DATE_PATTERN)
+    date_to: Optional[str] = Field(None, pattern=DATE_PATTERN)
+    category_id: Optional[int] = None
+    account_id: Optional[int] = None
+    min_amount: Optional[int] = None
+    max_amount: Optional[int] = None
+    sort: Literal['date', 'amount', 'type', 'id'] = 'date'
+    order: Literal['asc', 'desc'] = 'desc'
+
+
+class TransactionListQuery(TransactionFilter):
+    limit: Optional[int] = Field(None, ge=1, le=500)
+    cursor: Optional[str] = None
+
+    @property
+    def is_filtered(self) -> bool:
+        return bool(self.model_fields_set - {"limit", "cursor"})
+
+
+class TransactionExportQuery(TransactionFilter):
+    format: Literal['csv', 'ndjson', 'columnar'] = 'csv'
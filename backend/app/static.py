@@ -0,0 +1,185 @@
+"""
+Serving the built frontend.
+
+The dist tree is read into memory once at startup (StaticIndex): every file's
+bytes, content type, ETag and headers are computed up front, so a request is
+a dict lookup with no stat, open or read. `kill -HUP` reloads the index after
+a deploy; the new map is built off to the side and swapped in whole, so
+requests see either the old build or the new one, never a mix.
+
+Vite content-hashes every file it emits under /assets, so those are cached
+for a year as immutable; index.html and the other unhashed files are sent
+with `no-cache` so a deploy is picked up on the next visit (revalidation is
+a cheap 304). The build writes `.br` and `.gz` siblings next to compressible
+files (frontend/vite.config.js); when the client accepts one of them it is
+sent as-is with Content-Encoding set, so nothing is compressed per request.
+"""
+import asyncio
+import hashlib
+import logging
+import mimetypes
+import signal
+from dataclasses import dataclass
+from pathlib import Path
+from types import MappingProxyType
+from typing import Callable, Mapping
+
+from fastapi import FastAPI, HTTPException, Request, Response
+
+logger = logging.getLogger(__name__)
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+# Preferred first.
+_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+_SUFFIXES = tuple(suffix for _, suffix in _ENCODINGS)
+
+
+def accepted_encodings(accept_encoding: str | None) -> set[str]:
+    """Content codings the client accepts (q > 0); "*" stands for any."""
+    accepted = set()
+    for part in (accept_encoding or "").split(","):
+        coding, *params = (piece.strip() for piece in part.split(";"))
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding and q > 0:
+            accepted.add(coding.lower())
+    return accepted
+
+
+def _etag(body: bytes) -> str:
+    return f'"{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+@dataclass(frozen=True, slots=True)
+class Variant:
+    """One representation of a file: its bytes and the headers sent with them."""
+
+    body: bytes
+    headers: Mapping[str, str]
+
+
+@dataclass(frozen=True, slots=True)
+class StaticFile:
+    media_type: str
+    identity: Variant
+    # Content coding -> precompressed variant, in _ENCODINGS order.
+    encoded: Mapping[str, Variant]
+
+    def select(self, accept_encoding: str | None) -> Variant:
+        if self.encoded:
+            accepted = accepted_encodings(accept_encoding)
+            for encoding, variant in self.encoded.items():
+                if encoding in accepted or "*" in accepted:
+                    return variant
+        return self.identity
+
+    def respond(self, request: Request) -> Response:
+        variant = self.select(request.headers.get("accept-encoding"))
+        if _etag_matches(request.headers.get("if-none-match"), variant.headers["ETag"]):
+            return Response(status_code=304, headers={
+                k: v for k, v in variant.headers.items() if k != "Content-Encoding"
+            })
+        return Response(variant.body, media_type=self.media_type, headers=dict(variant.headers))
+
+
+def _load_file(path: Path, cache_control: str) -> StaticFile:
+    mtime = path.stat().st_mtime
+    body = path.read_bytes()
+    base = {"Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+    encoded = {}
+    for encoding, suffix in _ENCODINGS:
+        sibling = path.with_name(path.name + suffix)
+        try:
+            # A sibling older than its source is left over from a previous build.
+            if sibling.stat().st_mtime < mtime:
+                continue
+            data = sibling.read_bytes()
+        except OSError:
+            continue
+        encoded[encoding] = Variant(data, MappingProxyType({**base, "ETag": _etag(data), "Content-Encoding": encoding}))
+    return StaticFile(
+        media_type=mimetypes.guess_type(path.name)[0] or "text/plain",
+        identity=Variant(body, MappingProxyType({**base, "ETag": _etag(body)})),
+        encoded=MappingProxyType(encoded),
+    )
+
+
+class StaticIndex:
+    """URL path (relative, "/"-separated) -> StaticFile for everything under `directory`."""
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = Path(directory)
+        self._files: Mapping[str, StaticFile] = MappingProxyType({})
+        self.reload()
+
+    def reload(self) -> int:
+        """Re-read the directory and swap the new map in; returns the number of files."""
+        files = {}
+        for path in sorted(self.directory.rglob("*")):
+            if not path.is_file() or path.name.endswith(_SUFFIXES):
+                continue
+            key = path.relative_to(self.directory).as_posix()
+            files[key] = _load_file(path, IMMUTABLE if key.startswith("assets/") else REVALIDATE)
+        self._files = MappingProxyType(files)
+        return len(files)
+
+    def get(self, path: str) -> StaticFile | None:
+        return self._files.get(path)
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+
+def mount_spa(app: FastAPI, directory: Path) -> StaticIndex:
+    """Serve the build from memory, falling back to index.html for unmatched non-asset paths."""
+    index = StaticIndex(directory)
+
+    @app.get("/{full_path:path}", include_in_schema=False)
+    async def serve_spa(full_path: str, request: Request) -> Response:
+        file = index.get(full_path)
+        if file is None:
+            file = None if full_path.startswith("assets/") else index.get("index.html")
+            if file is None:
+                raise HTTPException(status_code=404, detail="Not Found")
+        return file.respond(request)
+
+    return index
+
+
+def _reload(index: StaticIndex) -> None:
+    try:
+        count = index.reload()
+    except OSError:
+        logger.exception("Static reload from %s failed; still serving the previous build", index.directory)
+        return
+    logger.info("Reloaded %d static files from %s", count, index.directory)
+
+
+def reload_on_sighup(index: StaticIndex) -> Callable[[], None]:
+    """
+    Reload `index` (in a worker thread) whenever the process gets SIGHUP.
+    Must be called from the running event loop; returns a function that
+    removes the handler. A no-op where the platform or thread has no signals.
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        loop.add_signal_handler(signal.SIGHUP, lambda: loop.run_in_executor(None, _reload, index))
+    except (AttributeError, NotImplementedError, RuntimeError, ValueError):
+        return lambda: None
+    return lambda: loop.remove_signal_handler(signal.SIGHUP)
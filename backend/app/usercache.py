@@ -0,0 +1,124 @@
+"""
+Short-lived cache of authenticated users, keyed by bearer token.
+
+FastAPI already resolves get_current_user once per request (the router-level
+and route-level Depends share the request's dependency cache); this cache
+removes the JWT decode, the users lookup and the connection checkout across
+requests. An entry lives
+for FT_AUTH_CACHE_TTL seconds and never past the token's own `exp`; the
+cache is LRU-bounded by FT_AUTH_CACHE_MAX_ENTRIES.
+
+Writes to the users table call invalidate(username) after they commit. As in
+cache.py, a generation number taken before the lookup keeps a slow reader
+from re-caching a user that was changed while it was querying.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from . import config
+
+_COUNTERS = ("hits", "misses", "stores", "skipped", "evictions", "invalidations")
+
+
+class UserCache:
+    def __init__(self, ttl: float = config.AUTH_CACHE_TTL, max_entries: int = config.AUTH_CACHE_MAX_ENTRIES) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # token -> (deadline on the monotonic clock, username, user)
+        self._entries: OrderedDict[str, tuple[float, str, dict]] = OrderedDict()
+        self._tokens: dict[str, set[str]] = {}
+        self._generation = 0
+        self._stats = dict.fromkeys(_COUNTERS, 0)
+
+    def generation(self) -> int:
+        with self._lock:
+            return self._generation
+
+    def get(self, token: str) -> dict | None:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    self._discard(token)
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(token)
+            self._stats["hits"] += 1
+            return entry[2]
+
+    def put(self, token: str, user: dict, expires_at: float, generation: int) -> bool:
+        """Cache `user` for `token` until the TTL or the token's `exp` (epoch seconds), whichever is first."""
+        lifetime = min(self.ttl, expires_at - time.time())
+        with self._lock:
+            if self._generation != generation or lifetime <= 0 or self.max_entries <= 0:
+                self._stats["skipped"] += 1
+                return False
+            self._discard(token)
+            self._entries[token] = (time.monotonic() + lifetime, user["username"], user)
+            self._tokens.setdefault(user["username"], set()).add(token)
+            self._stats["stores"] += 1
+            while len(self._entries) > self.max_entries:
+                self._discard(next(iter(self._entries)))
+                self._stats["evictions"] += 1
+            return True
+
+    def invalidate(self, username: str) -> None:
+        """Forget every cached token for `username`."""
+        with self._lock:
+            self._generation += 1
+            for token in list(self._tokens.get(username, ())):
+                self._discard(token)
+            self._stats["invalidations"] += 1
+
+    def discard(self, token: str) -> None:
+        """Forget one token, e.g. after it is revoked."""
+        with self._lock:
+            self._generation += 1
+            self._discard(token)
+
+    def _discard(self, token: str) -> None:
+        entry = self._entries.pop(token, None)
+        if entry is None:
+            return
+        tokens = self._tokens.get(entry[1])
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens[entry[1]]
+
+    def clear(self) -> None:
+        """Drop every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._tokens.clear()
+            self._generation += 1
+            self._stats = dict.fromkeys(_COUNTERS, 0)
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update(entries=len(self._entries), ttl=self.ttl, max_entries=self.max_entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+
+_cache: UserCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_user_cache() -> UserCache:
+    """Return the process-wide user cache."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = UserCache()
+    return _cache
+
+
+def invalidate_user(username: str) -> None:
+    """Drop cached sessions for `username`; called after a write to users commits."""
+    get_user_cache().invalidate(username)
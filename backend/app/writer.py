@@ -0,0 +1,173 @@
+"""
+Single-writer queue.
+
+SQLite allows one writer at a time, so every mutating model function runs on
+one dedicated thread that owns the only write connection. Routes submit a unit
+of work — a model function plus its arguments, without the connection — and
+wait for the result; reads keep using pooled connections from db.get_pool().
+"""
+import asyncio
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable
+
+from . import config
+from .db import DB_PATH, PoolTimeout, connect
+
+
+class WriteQueueFull(PoolTimeout):
+    """Raised when the write queue stays full for longer than the submit timeout."""
+
+
+_STOP = object()
+
+
+class WriteQueue:
+    """
+    Runs submitted units of work one at a time on a dedicated writer thread.
+
+    A unit is called as `fn(*args, conn)`, matching the model functions'
+    signatures. If it raises, any open transaction is rolled back and the
+    exception is re-raised to the submitter.
+    """
+
+    def __init__(
+        self,
+        connection_factory: Callable[[], sqlite3.Connection] | None = None,
+        maxsize: int = config.DB_WRITE_QUEUE_SIZE,
+        timeout: float = config.DB_POOL_TIMEOUT,
+        owns_connection: bool = True,
+    ) -> None:
+        self._connection_factory = connection_factory or (lambda: connect(DB_PATH))
+        self._owns_connection = owns_connection
+        self.timeout = timeout
+        self._queue: queue.Queue = queue.Queue(maxsize=maxsize)
+        self._thread: threading.Thread | None = None
+        self._start_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._stats = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "rejected": 0,
+            "max_depth": 0,
+            "wait_seconds_total": 0.0,
+            "wait_seconds_max": 0.0,
+            "run_seconds_total": 0.0,
+            "run_seconds_max": 0.0,
+        }
+
+    def start(self) -> None:
+        with self._start_lock:
+            if self._thread is None:
+                conn = self._connection_factory()
+                self._thread = threading.Thread(target=self._run, args=(conn,), name="db-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self, conn: sqlite3.Connection) -> None:
+        try:
+            while True:
+                item = self._queue.get()
+                if item is _STOP:
+                    break
+                future, fn, args, kwargs, enqueued_at = item
+                if not future.set_running_or_notify_cancel():
+                    continue
+                started = time.monotonic()
+                try:
+                    result = fn(*args, conn, **kwargs)
+                    if conn.in_transaction:
+                        conn.commit()
+                except BaseException as exc:
+                    if conn.in_transaction:
+                        conn.rollback()
+                    self._record(enqueued_at, started, failed=True)
+                    future.set_exception(exc)
+                else:
+                    self._record(enqueued_at, started, failed=False)
+                    future.set_result(result)
+        finally:
+            if self._owns_connection:
+                conn.close()
+
+    def _record(self, enqueued_at: float, started: float, failed: bool) -> None:
+        waited = started - enqueued_at
+        ran = time.monotonic() - started
+        with self._lock:
+            self._stats["failed" if failed else "completed"] += 1
+            self._stats["wait_seconds_total"] += waited
+            self._stats["wait_seconds_max"] = max(self._stats["wait_seconds_max"], waited)
+            self._stats["run_seconds_total"] += ran
+            self._stats["run_seconds_max"] = max(self._stats["run_seconds_max"], ran)
+
+    def submit(self, fn: Callable[..., Any], *args: Any, block: bool = True, **kwargs: Any) -> Future:
+        """
+        Queue `fn(*args, conn, **kwargs)` for the writer thread and return its Future.
+
+        With block=False a full queue is rejected immediately instead of
+        waiting up to `timeout` seconds for a slot.
+        """
+        self.start()
+        future: Future = Future()
+        try:
+            self._queue.put((future, fn, args, kwargs, time.monotonic()), block=block, timeout=self.timeout)
+        except queue.Full:
+            with self._lock:
+                self._stats["rejected"] += 1
+            raise WriteQueueFull("Write queue is full") from None
+        depth = self._queue.qsize()
+        with self._lock:
+            self._stats["submitted"] += 1
+            self._stats["max_depth"] = max(self._stats["max_depth"], depth)
+        return future
+
+    def execute(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Submit a unit of work and block until the writer thread has run it."""
+        return self.submit(fn, *args, **kwargs).result()
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Submit a unit of work and await its result without holding a thread."""
+        return await asyncio.wrap_future(self.submit(fn, *args, block=False, **kwargs))
+
+    def stats(self) -> dict:
+        """Queue depth plus wait (queued) and run time metrics for sizing."""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["depth"] = self._queue.qsize()
+        done = stats["completed"] + stats["failed"]
+        stats["wait_seconds_avg"] = stats["wait_seconds_total"] / done if done else 0.0
+        stats["run_seconds_avg"] = stats["run_seconds_total"] / done if done else 0.0
+        return stats
+
+    def close(self, timeout: float | None = None) -> None:
+        """Drain queued work, then stop the writer thread."""
+        with self._start_lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join(timeout)
+
+
+_writer: WriteQueue | None = None
+_writer_lock = threading.Lock()
+
+
+def get_writer() -> WriteQueue:
+    """Return the process-wide write queue (FastAPI dependency)."""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = WriteQueue()
+    return _writer
+
+
+def close_writer() -> None:
+    global _writer
+    with _writer_lock:
+        if _writer is not None:
+            _writer.close()
+            _writer = None
@@ -26,6 +26,9 @@ sys.path.insert(0, str(ROOT))
 
 from backend.app.db import DB_PATH, init_db
 from backend.app.auth import hash_password
+from backend.app.models.rollup import rebuild_rollup
+from backend.app.models.search import reindex_user_transactions
+from backend.app.models.version import reset_sync
 
 # ── helpers ──────────────────────────────────────────────────────────────────
 
@@ -53,6 +56,10 @@ def _get_or_create_user(conn: sqlite3.Connection, username: str, password: str)
 
 def _clear_user_data(conn: sqlite3.Connection, user_id: int):
     """Remove all existing data for this user so re-seeding is clean."""
+    conn.execute(
+        "DELETE FROM transactions_fts WHERE rowid IN (SELECT id FROM transactions WHERE user_id = ?)",
+        (user_id,),
+    )
     conn.execute("DELETE FROM transactions WHERE user_id = ?", (user_id,))
     conn.execute("DELETE FROM accounts    WHERE user_id = ?", (user_id,))
     conn.execute("DELETE FROM categories  WHERE user_id = ?", (user_id,))
@@ -248,6 +255,20 @@ def _seed_transactions(
     print(f"  ✓ Inserted {total} transactions across 6 months")
 
 
+def _seed_user_data(conn: sqlite3.Connection, user_id: int) -> None:
+    """Replace the user's categories, accounts and transactions with fresh demo data."""
+    _clear_user_data(conn, user_id)
+    cat_ids = _seed_categories(conn, user_id)
+    acc_map = _seed_accounts(conn, user_id)
+    _seed_transactions(conn, user_id, cat_ids, acc_map)
+    # Rows were inserted directly, so recompute the user's monthly rollup
+    # and search index.
+    rebuild_rollup(conn, user_id)
+    reindex_user_transactions(user_id, conn)
+    reset_sync(user_id, conn)
+    conn.commit()
+
+
 # ── main ─────────────────────────────────────────────────────────────────────
 
 def main():
@@ -262,10 +283,7 @@ def main():
 
     try:
         user_id = _get_or_create_user(conn, username="admin", password="admin")
-        _clear_user_data(conn, user_id)
-        cat_ids = _seed_categories(conn, user_id)
-        acc_map = _seed_accounts(conn, user_id)
-        _seed_transactions(conn, user_id, cat_ids, acc_map)
+        _seed_user_data(conn, user_id)
 
         # Print final account balances
         print("\n  Final account balances:")
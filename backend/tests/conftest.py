@@ -1,5 +1,6 @@
 import sqlite3
 import sys
+from contextlib import asynccontextmanager
 from pathlib import Path
 import pytest
 from fastapi.testclient import TestClient
@@ -10,49 +11,26 @@ ROOT = Path(__file__).resolve().parents[2]
 sys.path.insert(0, str(ROOT))
 
 from backend.app.__main__ import app
-from backend.app.db import get_connection
-
-_SCHEMA = """
-CREATE TABLE IF NOT EXISTS users (
-    id              INTEGER PRIMARY KEY AUTOINCREMENT,
-    username        TEXT NOT NULL UNIQUE,
-    hashed_password TEXT NOT NULL
-);
-CREATE TABLE IF NOT EXISTS categories (
-    id    INTEGER PRIMARY KEY AUTOINCREMENT,
-    name  TEXT NOT NULL UNIQUE,
-    type  TEXT NOT NULL DEFAULT 'expense',
-    icon  TEXT NOT NULL DEFAULT '',
-    color TEXT NOT NULL DEFAULT 'amber',
-    user_id INTEGER REFERENCES users(id)
-);
-CREATE TABLE IF NOT EXISTS accounts (
-    id      INTEGER PRIMARY KEY AUTOINCREMENT,
-    type    TEXT NOT NULL CHECK (type IN ('ewallet', 'bank')),
-    name    TEXT NOT NULL,
-    balance INTEGER NOT NULL DEFAULT 0,
-    icon    TEXT NOT NULL DEFAULT '',
-    currency TEXT NOT NULL DEFAULT 'IDR',
-    user_id INTEGER REFERENCES users(id)
-);
-CREATE TABLE IF NOT EXISTS transactions (
-    id           INTEGER PRIMARY KEY AUTOINCREMENT,
-    type         TEXT NOT NULL CHECK (type IN ('income', 'expense')),
-    amount_cents INTEGER NOT NULL,
-    date         TEXT NOT NULL,
-    note         TEXT,
-    category_id  INTEGER REFERENCES categories(id),
-    account_id   INTEGER REFERENCES accounts(id),
-    user_id      INTEGER REFERENCES users(id)
-);
-"""
+from backend.app.cache import get_cache
+from backend.app.db import get_checkout, get_connection
+from backend.app.migrations import migrate
+from backend.app.revocation import get_denylist
+from backend.app.usercache import get_user_cache
+from backend.app.writer import WriteQueue, get_writer
 
 
 @pytest.fixture()
-def client():
+def db_conn():
     conn = sqlite3.connect(":memory:", check_same_thread=False)
     conn.row_factory = sqlite3.Row
-    conn.executescript(_SCHEMA)
+    migrate(conn)
+    yield conn
+    conn.close()
+
+
+@pytest.fixture()
+def client(db_conn):
+    conn = db_conn
 
     def _override():
         try:
@@ -60,7 +38,19 @@ def client():
         finally:
             pass
 
+    @asynccontextmanager
+    async def _checkout():
+        yield conn
+
+    writer = WriteQueue(connection_factory=lambda: conn, owns_connection=False)
+    # Every test database reuses user id 1; start from an empty cache.
+    get_cache().clear()
+    get_user_cache().clear()
+    get_denylist().clear()
+
     app.dependency_overrides[get_connection] = _override
+    app.dependency_overrides[get_checkout] = lambda: _checkout
+    app.dependency_overrides[get_writer] = lambda: writer
 
     with TestClient(app) as c:
         # Register + login a test user so all protected routes work
@@ -76,4 +66,4 @@ def client():
         yield c
 
     app.dependency_overrides.clear()
-    conn.close()
+    writer.close()
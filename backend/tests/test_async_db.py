@@ -0,0 +1,85 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.app import config, db
+from backend.app.db import ConnectionPool, get_connection, run_db
+
+
+def test_run_db_runs_off_the_event_loop():
+    async def main():
+        loop_thread = threading.current_thread().name
+        worker_thread = await run_db(lambda: threading.current_thread().name)
+        return loop_thread, worker_thread
+
+    loop_thread, worker_thread = asyncio.run(main())
+    assert worker_thread != loop_thread
+    assert worker_thread.startswith("db")
+
+
+def test_run_db_concurrency_is_bounded():
+    lock = threading.Lock()
+    active = peak = 0
+
+    def work():
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.01)
+        with lock:
+            active -= 1
+
+    async def main():
+        await asyncio.gather(*(run_db(work) for _ in range(config.DB_THREADS * 4)))
+
+    asyncio.run(main())
+    assert 1 <= peak <= config.DB_THREADS
+
+
+def test_get_connection_returns_connection_to_pool(tmp_path, monkeypatch):
+    pool = ConnectionPool(str(tmp_path / "async.db"), size=1)
+    monkeypatch.setattr(db, "_pool", pool)
+
+    async def main():
+        for _ in range(3):
+            dependency = get_connection()
+            conn = await dependency.__anext__()
+            assert (await run_db(lambda: conn.execute("SELECT 1").fetchone()[0])) == 1
+            await dependency.aclose()
+
+    asyncio.run(main())
+    stats = pool.stats()
+    assert stats["opened"] == 1
+    assert stats["in_use"] == 0
+    pool.close()
+
+
+def test_waiting_for_a_connection_does_not_starve_queries(tmp_path, monkeypatch):
+    # More than twice the pool size in concurrent requests, with no more db
+    # threads than connections: waiters must not occupy the threads that the
+    # requests holding connections need for their queries.
+    pool = ConnectionPool(str(tmp_path / "gate.db"), size=2, timeout=2.0)
+    executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="db")
+    monkeypatch.setattr(db, "_pool", pool)
+    monkeypatch.setattr(db, "_executor", executor)
+
+    async def request():
+        dependency = get_connection()
+        conn = await dependency.__anext__()
+        try:
+            await run_db(lambda: (time.sleep(0.01), conn.execute("SELECT 1").fetchone()))
+        finally:
+            await dependency.aclose()
+
+    async def main():
+        await asyncio.gather(*(request() for _ in range(pool.size * 3)))
+
+    started = time.monotonic()
+    asyncio.run(main())
+    assert time.monotonic() - started < 1.0
+    stats = pool.stats()
+    assert stats["timeouts"] == 0 and stats["checkouts"] == 6 and stats["in_use"] == 0
+    executor.shutdown()
+    pool.close()
@@ -0,0 +1,85 @@
+import sqlite3
+from datetime import date
+
+from backend.app.migrations import MIGRATIONS, migrate
+
+
+def _account(client, balance=1000):
+    return client.post("/accounts/", json={"type": "bank", "name": "Main", "balance": balance}).json()
+
+
+def _tx(client, acc, type_, amount, day):
+    r = client.post("/transactions/", json={"type": type_, "amount_cents": amount, "date": day, "account_id": acc["id"]})
+    assert r.status_code == 200
+    return r.json()
+
+
+def _history(client, acc, **params):
+    r = client.get(f"/accounts/{acc['id']}/history", params=params)
+    assert r.status_code == 200, r.text
+    return [(p["date"], p["balance"]) for p in r.json()["points"]]
+
+
+def _snapshot_months(db_conn):
+    return [row[0] for row in db_conn.execute("SELECT month FROM balance_snapshots ORDER BY month")]
+
+
+def test_history_month_end_balances(client):
+    acc = _account(client)
+    _tx(client, acc, "income", 500, "2024-01-10")
+    _tx(client, acc, "expense", 200, "2024-02-05")
+    _tx(client, acc, "expense", 100, "2024-03-20")
+    assert _history(client, acc, date_from="2023-12-01", date_to="2024-03-15") == [
+        ("2023-12-31", 1000),
+        ("2024-01-31", 1500),
+        ("2024-02-29", 1300),
+        ("2024-03-15", 1300),
+    ]
+    today = date.today().isoformat()
+    assert _history(client, acc, date_from=today)[-1] == (today, 1200)
+
+
+def test_backdated_write_invalidates_later_snapshots_only(client, db_conn):
+    acc = _account(client, balance=0)
+    _tx(client, acc, "income", 100, "2024-01-10")
+    _history(client, acc, date_from="2024-01-01", date_to="2024-03-31")
+    months = _snapshot_months(db_conn)
+    assert months[0] == "2024-01" and len(months) > 3
+
+    _tx(client, acc, "expense", 30, "2024-02-10")
+    assert _snapshot_months(db_conn) == ["2024-01"]
+    assert _history(client, acc, date_from="2024-01-01", date_to="2024-03-31") == [
+        ("2024-01-31", 100), ("2024-02-29", 70), ("2024-03-31", 70),
+    ]
+    assert _snapshot_months(db_conn) == months
+
+
+def test_setting_balance_shifts_history(client, db_conn):
+    acc = _account(client, balance=1000)
+    _tx(client, acc, "expense", 300, "2024-01-10")
+    client.patch(f"/accounts/{acc['id']}", json={"type": "bank", "name": "Main", "balance": 5000})
+    points = _history(client, acc, date_from="2023-12-01", date_to="2024-01-31")
+    assert points == [("2023-12-31", 5300), ("2024-01-31", 5000)]
+    row = db_conn.execute("SELECT opening_balance, adjustments FROM accounts").fetchone()
+    assert (row["opening_balance"], row["adjustments"]) == (1000, 4300)
+
+
+def test_history_errors(client):
+    acc = _account(client)
+    assert client.get("/accounts/999/history").status_code == 404
+    r = client.get(f"/accounts/{acc['id']}/history", params={"date_from": "2024-05-01", "date_to": "2024-01-01"})
+    assert r.status_code == 400
+    assert client.get(f"/accounts/{acc['id']}/history", params={"date_to": "2024-13-01"}).status_code == 422
+
+
+def test_migration_backfills_opening_balance():
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    migrate(conn, MIGRATIONS[:6])
+    conn.execute("INSERT INTO accounts (type, name, balance, user_id) VALUES ('bank', 'A', 700, 1)")
+    conn.execute("INSERT INTO transactions (type, amount_cents, date, account_id, user_id) VALUES ('income', 1000, '2024-01-01', 1, 1)")
+    conn.execute("INSERT INTO transactions (type, amount_cents, date, account_id, user_id) VALUES ('expense', 400, '2024-01-02', 1, 1)")
+    conn.commit()
+    migrate(conn)
+    assert conn.execute("SELECT opening_balance FROM accounts").fetchone()[0] == 100
+    conn.close()
@@ -0,0 +1,118 @@
+import pytest
+
+from backend.app.cache import ResponseCache, commit, get_cache
+
+_TX = {"type": "expense", "amount_cents": 100, "date": "2024-01-15"}
+
+
+def _stats(client):
+    return client.get("/metrics/cache").json()
+
+
+def test_repeat_reads_are_served_from_cache(client):
+    first = client.get("/transactions/", params={"month": "2024-01"})
+    again = client.get("/transactions/", params={"month": "2024-01"})
+    assert again.content == first.content
+    assert again.headers["etag"] == first.headers["etag"]
+    assert again.headers["content-type"] == "application/json"
+    stats = _stats(client)
+    assert stats["misses"] == 1 and stats["hits"] == 1 and stats["entries"] == 1
+
+
+def test_params_are_part_of_the_key(client):
+    client.post("/transactions/", json=_TX)
+    assert len(client.get("/transactions/", params={"month": "2024-01"}).json()) == 1
+    assert client.get("/transactions/", params={"month": "2024-02"}).json() == []
+    assert client.get("/transactions/", params={"limit": 1}).json()["items"][0]["amount_cents"] == 100
+    assert _stats(client)["hits"] == 0
+
+
+def test_writes_invalidate_only_affected_resources(client):
+    acc = client.post("/accounts/", json={"type": "bank", "name": "Main", "balance": 0}).json()
+    for path in ("/transactions/", "/categories/", "/accounts/", "/reports/summary?month=2024-01"):
+        client.get(path)
+
+    assert _stats(client)["entries"] == 4
+
+    client.post("/categories/", json={"name": "Food"})
+    assert _stats(client)["entries"] == 3
+    assert [c["name"] for c in client.get("/categories/").json()] == ["Food"]
+    client.get("/accounts/")
+    assert _stats(client)["hits"] == 1
+
+    # A transaction write leaves the cached categories in place (and served).
+    client.post("/transactions/", json={**_TX, "account_id": acc["id"]})
+    assert _stats(client)["entries"] == 1
+    assert len(client.get("/transactions/").json()) == 1
+    assert client.get("/accounts/").json()[0]["balance"] == -100
+    assert client.get("/reports/summary?month=2024-01").json()["expense"] == 100
+    assert [c["name"] for c in client.get("/categories/").json()] == ["Food"]
+    assert _stats(client)["hits"] == 2
+
+
+def test_cache_is_per_user(client):
+    client.post("/categories/", json={"name": "Food"})
+    assert len(client.get("/categories/").json()) == 1
+    client.post("/auth/register", json={"username": "other", "password": "otherpass"})
+    token = client.post("/auth/token", data={"username": "other", "password": "otherpass"}).json()["access_token"]
+    r = client.get("/categories/", headers={"Authorization": f"Bearer {token}"})
+    assert r.json() == []
+
+
+def test_bad_cursor_is_still_a_400(client):
+    assert client.get("/transactions/", params={"limit": 5, "cursor": "garbage"}).status_code == 400
+    assert get_cache().stats()["entries"] == 0
+
+
+def test_lru_eviction_by_size_and_count():
+    cache = ResponseCache(max_bytes=40, max_entries=3)
+    for key in "abc":
+        assert cache.put(1, "accounts", key, b"x" * 10, 0)
+    assert cache.get(1, "accounts", "a") is not None
+    cache.put(1, "accounts", "d", b"x" * 10, 0)
+    assert cache.get(1, "accounts", "b") is None
+    cache.put(1, "accounts", "e", b"x" * 10, 0)
+    assert cache.get(1, "accounts", "c") is None
+    assert not cache.put(1, "accounts", "big", b"x" * 11, 0)
+    stats = cache.stats()
+    assert stats["entries"] == 3 and stats["bytes"] == 30 and stats["evictions"] == 2
+
+
+def test_put_after_invalidation_is_refused():
+    cache = ResponseCache(max_bytes=1000, max_entries=10)
+    generation = cache.generation(1, "transactions")
+    cache.invalidate(1, "transactions")
+    assert not cache.put(1, "transactions", "list", b"[]", generation)
+    assert cache.get(1, "transactions", "list") is None
+    cache.put(2, "transactions", "list", b"[]", cache.generation(2, "transactions"))
+    cache.invalidate(1, "transactions", "reports")
+    assert cache.get(2, "transactions", "list") == b"[]"
+
+
+def test_nothing_is_cached_while_a_write_commits():
+    # Readers around a commit may see the new version (and ETag) while their
+    # body was loaded before it: nothing stored in that window may survive.
+    cache = ResponseCache(max_bytes=1000, max_entries=10)
+    cache.put(1, "categories", "list", b"old", 0)
+    cache.put(1, "accounts", "list", b"[]", 0)
+    cache.begin_write(1, "categories")
+    assert cache.get(1, "categories", "list") is None
+    generation = cache.generation(1, "categories")
+    assert not cache.put(1, "categories", "list", b"old", generation)
+    cache.end_write(1, "categories")
+    assert not cache.put(1, "categories", "list", b"old", generation)
+    assert cache.put(1, "categories", "list", b"new", cache.generation(1, "categories"))
+    assert cache.get(1, "accounts", "list") == b"[]"
+
+
+class _FailingConnection:
+    def commit(self):
+        raise RuntimeError("disk full")
+
+
+def test_failed_commit_reopens_the_cache(client):
+    with pytest.raises(RuntimeError):
+        commit(_FailingConnection(), 1, "categories")
+    client.get("/categories/")
+    client.get("/categories/")
+    assert _stats(client)["hits"] == 1
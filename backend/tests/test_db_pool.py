@@ -0,0 +1,89 @@
+import threading
+
+import pytest
+
+from backend.app.db import ConnectionPool, PoolTimeout
+
+
+@pytest.fixture()
+def pool(tmp_path):
+    p = ConnectionPool(str(tmp_path / "pool.db"), size=2, timeout=0.1)
+    yield p
+    p.close()
+
+
+def test_connections_are_configured_once(pool):
+    conn = pool.acquire()
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("PRAGMA busy_timeout").fetchone()[0] > 0
+    assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2  # MEMORY
+    pool.release(conn)
+
+
+def test_connections_are_reused(pool):
+    first = pool.acquire()
+    pool.release(first)
+    second = pool.acquire()
+    assert second is first
+    pool.release(second)
+    assert pool.stats()["opened"] == 1
+
+
+def test_checkout_times_out_when_exhausted(pool):
+    a, b = pool.acquire(), pool.acquire()
+    with pytest.raises(PoolTimeout):
+        pool.acquire()
+    assert pool.stats()["timeouts"] == 1
+    pool.release(a)
+    pool.release(b)
+
+
+def test_waiter_gets_released_connection(pool):
+    a, b = pool.acquire(), pool.acquire()
+    got = []
+    t = threading.Thread(target=lambda: got.append(pool.acquire(timeout=2)))
+    t.start()
+    pool.release(a)
+    t.join()
+    assert got == [a]
+    pool.release(got[0])
+    pool.release(b)
+
+
+def test_release_rolls_back_open_transaction(pool):
+    conn = pool.acquire()
+    conn.execute("CREATE TABLE t (x INTEGER)")
+    conn.execute("INSERT INTO t VALUES (1)")
+    assert conn.in_transaction
+    pool.release(conn)
+    conn = pool.acquire()
+    assert not conn.in_transaction
+    assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+    pool.release(conn)
+
+
+def test_broken_connection_is_replaced(pool):
+    conn = pool.acquire()
+    pool.release(conn)
+    conn.close()
+    fresh = pool.acquire()
+    assert fresh is not conn
+    assert fresh.execute("SELECT 1").fetchone()[0] == 1
+    pool.release(fresh)
+    assert pool.stats()["discarded"] == 1
+
+
+def test_stats_report_usage(pool):
+    conn = pool.acquire()
+    stats = pool.stats()
+    assert stats["size"] == 2
+    assert stats["in_use"] == 1
+    assert stats["checkouts"] == 1
+    pool.release(conn)
+    assert pool.stats()["idle"] == 1
+
+
+def test_metrics_endpoint(client):
+    r = client.get("/metrics/db")
+    assert r.status_code == 200
+    assert {"size", "in_use", "idle", "checkouts", "timeouts"} <= r.json().keys()
@@ -0,0 +1,50 @@
+import pytest
+
+_TX = {"type": "expense", "amount_cents": 100, "date": "2024-01-15"}
+
+
+@pytest.mark.parametrize("path", ["/transactions/", "/categories/", "/accounts/"])
+def test_list_returns_304_when_unchanged(client, path):
+    first = client.get(path)
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == "private, no-cache"
+    again = client.get(path, headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["etag"] == etag
+
+
+def test_writes_change_the_etag(client):
+    etag = client.get("/transactions/").headers["etag"]
+    tx = client.post("/transactions/", json=_TX).json()
+    r = client.get("/transactions/", headers={"If-None-Match": etag})
+    assert r.status_code == 200 and len(r.json()) == 1
+    etag = r.headers["etag"]
+
+    client.patch(f"/transactions/{tx['id']}", json={**_TX, "amount_cents": 5})
+    assert client.get("/transactions/", headers={"If-None-Match": etag}).status_code == 200
+    etag = client.get("/transactions/").headers["etag"]
+    client.post("/categories/", json={"name": "Food"})
+    assert client.get("/transactions/", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_noop_write_keeps_the_etag(client):
+    etag = client.get("/accounts/").headers["etag"]
+    assert client.delete("/accounts/999").status_code == 404
+    assert client.get("/accounts/", headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_if_none_match_list_and_weak_tags(client):
+    etag = client.get("/categories/").headers["etag"]
+    assert client.get("/categories/", headers={"If-None-Match": f'"other", W/{etag}'}).status_code == 304
+    assert client.get("/categories/", headers={"If-None-Match": '"stale"'}).status_code == 200
+
+
+def test_304_skips_the_list_query(client, db_conn):
+    client.post("/transactions/", json=_TX)
+    etag = client.get("/transactions/").headers["etag"]
+    statements = []
+    db_conn.set_trace_callback(statements.append)
+    assert client.get("/transactions/", headers={"If-None-Match": etag}).status_code == 304
+    db_conn.set_trace_callback(None)
+    assert not any("FROM transactions" in sql for sql in statements)
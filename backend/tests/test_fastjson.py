@@ -0,0 +1,77 @@
+"""
+The fast read path must be byte-for-byte what the Pydantic response models
+produce, with orjson and with the stdlib fallback.
+"""
+import pytest
+from pydantic import TypeAdapter
+
+from backend.app import fastjson
+from backend.app.export import EXPORT_COLUMNS
+from backend.app.models.account import get_all_accounts
+from backend.app.models.category import get_all_categories
+from backend.app.models.transaction import encode_cursor, get_all_transactions, get_transactions_page
+from backend.app.schemas import AccountRead, CategoryRead, TransactionFilter, TransactionPage, TransactionRead
+
+_NOTES = ["lunch", None, "café ☕", 'quote " and \\ backslash', "tab\tnew\nline\x01\x1f", "", "😀 / <b>", " "]
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def encoder(request, monkeypatch):
+    if request.param == "stdlib":
+        monkeypatch.setattr(fastjson, "orjson", None)
+    elif fastjson.orjson is None:
+        pytest.skip("orjson not installed")
+    return request.param
+
+
+def _seed(client):
+    acc = client.post("/accounts/", json={"type": "ewallet", "name": "Dompét \"1\"", "balance": -2**40}).json()
+    client.post("/accounts/", json={"type": "bank", "name": "Main", "balance": 0, "icon": "🏦", "currency": "EUR"})
+    cat = client.post("/categories/", json={"name": "Makan ✓", "type": "expense", "icon": "\n"}).json()
+    client.post("/categories/", json={"name": "Salary", "type": "income", "color": ""})
+    for i, note in enumerate(_NOTES):
+        client.post("/transactions/", json={
+            "type": "income" if i % 3 == 0 else "expense", "amount_cents": i * 1234567, "date": f"2024-0{i % 9 + 1}-1{i}",
+            "note": note, "category_id": cat["id"] if i % 2 else None, "account_id": acc["id"] if i % 4 else None,
+        })
+
+
+def test_transaction_fields_match_select_order():
+    assert tuple(TransactionRead.model_fields) == EXPORT_COLUMNS
+
+
+def test_lists_are_byte_identical(client, db_conn, encoder):
+    _seed(client)
+    expected = {
+        "/accounts/": TypeAdapter(list[AccountRead]).dump_json(get_all_accounts(1, db_conn)),
+        "/categories/": TypeAdapter(list[CategoryRead]).dump_json(get_all_categories(1, db_conn)),
+        "/transactions/": TypeAdapter(list[TransactionRead]).dump_json(
+            get_all_transactions(1, db_conn, TransactionFilter())
+        ),
+    }
+    for path, body in expected.items():
+        r = client.get(path)
+        assert r.headers["content-type"] == "application/json"
+        assert r.content == body, path
+
+
+@pytest.mark.parametrize("params", [
+    {"type": "expense", "sort": "amount", "order": "asc"},
+    {"month": "2024-02"},
+    {"min_amount": 10**9},
+])
+def test_filtered_lists_are_byte_identical(client, db_conn, encoder, params):
+    _seed(client)
+    expected = TypeAdapter(list[TransactionRead]).dump_json(
+        get_all_transactions(1, db_conn, TransactionFilter(**params))
+    )
+    assert client.get("/transactions/", params=params).content == expected
+
+
+def test_pages_are_byte_identical(client, db_conn, encoder):
+    _seed(client)
+    cursor = encode_cursor(["2024-05-14", 99])
+    for params in ({"limit": 3}, {"limit": 3, "cursor": cursor}, {"limit": 500}):
+        items, next_cursor = get_transactions_page(1, db_conn, params["limit"], params.get("cursor"))
+        expected = TypeAdapter(TransactionPage).dump_json(TransactionPage(items=items, next_cursor=next_cursor))
+        assert client.get("/transactions/", params=params).content == expected
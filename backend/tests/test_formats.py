@@ -0,0 +1,103 @@
+import json
+
+import msgpack
+import pytest
+
+from backend.app import formats
+from backend.app.export import columns
+from backend.app.formats import COLUMNAR, JSON, MSGPACK, negotiate
+
+_TXS = [
+    {"type": "expense", "amount_cents": 100, "date": "2024-01-15", "note": "lunch"},
+    {"type": "income", "amount_cents": 5000, "date": "2024-01-20"},
+    {"type": "expense", "amount_cents": 250, "date": "2024-02-01", "note": "café"},
+]
+
+
+def _rows(payload):
+    """Turn a columnar payload back into TransactionRead-shaped dicts."""
+    names = ["id", "type", "amount_cents", "date", "note", "category_id", "account_id"]
+    values = [payload[name] for name in names]
+    values[1] = [payload["type"]["dictionary"][code] for code in payload["type"]["codes"]]
+    return [dict(zip(names, row)) for row in zip(*values)]
+
+
+@pytest.fixture()
+def no_msgpack(monkeypatch):
+    monkeypatch.setattr(formats, "msgpack", None)
+
+
+def test_negotiate(no_msgpack):
+    assert negotiate(None) == JSON
+    assert negotiate("*/*") == JSON
+    assert negotiate(f"{COLUMNAR}, {JSON};q=0.5") == COLUMNAR
+    assert negotiate(f"{COLUMNAR};q=0.2, application/*;q=0.8") == JSON
+    assert negotiate(f"{MSGPACK}, {COLUMNAR};q=0.9") == COLUMNAR
+    assert negotiate(MSGPACK) is None
+    assert negotiate("text/html") is None
+
+
+def test_columns_dictionary_encodes_type():
+    payload = columns([(1, "expense", 100, "2024-01-15", None, None, 2), (2, "income", 5, "2024-01-16", "x", 3, None)])
+    assert payload["count"] == 2
+    assert payload["type"] == {"dictionary": ["income", "expense"], "codes": [1, 0]}
+    assert payload["account_id"] == [2, None]
+    assert columns([])["id"] == []
+
+
+@pytest.mark.parametrize("params", [{}, {"month": "2024-01", "sort": "amount"}])
+def test_columnar_list_matches_json(client, params):
+    for tx in _TXS:
+        client.post("/transactions/", json=tx)
+    plain = client.get("/transactions/", params=params)
+    r = client.get("/transactions/", params=params, headers={"Accept": COLUMNAR})
+    assert r.status_code == 200
+    assert r.headers["content-type"] == COLUMNAR
+    assert _rows(r.json()) == plain.json()
+    assert len(r.content) < len(plain.content)
+
+
+def test_columnar_pages(client):
+    for tx in _TXS:
+        client.post("/transactions/", json=tx)
+    first = client.get("/transactions/", params={"limit": 2}, headers={"Accept": COLUMNAR}).json()
+    assert first["count"] == 2 and first["next_cursor"]
+    rest = client.get(
+        "/transactions/", params={"limit": 2, "cursor": first["next_cursor"]}, headers={"Accept": COLUMNAR}
+    ).json()
+    assert rest["next_cursor"] is None
+    assert _rows(first) + _rows(rest) == client.get("/transactions/", params={"sort": "date"}).json()
+
+
+def test_etag_varies_by_format(client):
+    plain = client.get("/transactions/")
+    packed = client.get("/transactions/", headers={"Accept": COLUMNAR})
+    assert "Accept" in plain.headers["vary"] and "Accept" in packed.headers["vary"]
+    assert plain.headers["etag"] != packed.headers["etag"]
+    r = client.get("/transactions/", headers={"Accept": COLUMNAR, "If-None-Match": plain.headers["etag"]})
+    assert r.status_code == 200
+    r = client.get("/transactions/", headers={"Accept": COLUMNAR, "If-None-Match": packed.headers["etag"]})
+    assert r.status_code == 304 and "Accept" in r.headers["vary"]
+
+
+def test_msgpack_without_the_package_is_406(client, no_msgpack):
+    r = client.get("/transactions/", headers={"Accept": MSGPACK})
+    assert r.status_code == 406
+    assert MSGPACK not in r.json()["detail"]
+
+
+def test_msgpack(client):
+    client.post("/transactions/", json=_TXS[0])
+    r = client.get("/transactions/", headers={"Accept": "application/x-msgpack"})
+    assert r.headers["content-type"] == MSGPACK
+    assert _rows(msgpack.unpackb(r.content)) == client.get("/transactions/").json()
+
+
+def test_export_columnar(client, monkeypatch):
+    monkeypatch.setattr("backend.app.routes.transaction.EXPORT_BATCH_SIZE", 2)
+    for tx in _TXS:
+        client.post("/transactions/", json=tx)
+    r = client.get("/transactions/export", params={"format": "columnar", "order": "asc"})
+    batches = [json.loads(line) for line in r.text.splitlines()]
+    assert [b["count"] for b in batches] == [2, 1]
+    assert [row["note"] for b in batches for row in _rows(b)] == ["lunch", None, "café"]
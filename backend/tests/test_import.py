@@ -0,0 +1,129 @@
+import io
+
+from backend.app import config, importer
+from backend.app.importer import CsvMapping, ParsedRow, RowError, parse_csv, parse_ofx
+
+_CSV = (
+    "Date,Amount,Description,Category,Account\n"
+    "15/01/2024,-12.50,Lunch,Food,Main\n"
+    "16/01/2024,1000.00,Salary,,Main\n"
+    "17/01/2024,abc,Broken,,Main\n"
+    "18/01/2024,-3.00,Snack,Nope,Main\n"
+)
+
+_MAPPING = {
+    "date_column": "Date", "amount_column": "Amount", "note_column": "Description",
+    "category_column": "Category", "account_column": "Account",
+    "date_format": "%d/%m/%Y", "amount_scale": "100",
+}
+
+_OFX = """OFXHEADER:100
+DATA:OFXSGML
+
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20240115120000[-5:EST]<TRNAMT>-25<NAME>Coffee<MEMO>Card 1234</STMTTRN>
+<STMTTRN>
+<TRNTYPE>CREDIT
+<DTPOSTED>20240120
+<TRNAMT>500
+<NAME>Refund
+</STMTTRN>
+<STMTTRN><DTPOSTED>nope<TRNAMT>1</STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+"""
+
+
+def _seed(client):
+    acc = client.post("/accounts/", json={"type": "bank", "name": "Main", "balance": 0}).json()
+    cat = client.post("/categories/", json={"name": "Food", "type": "expense"}).json()
+    return acc, cat
+
+
+def _upload(client, content, **form):
+    r = client.post(
+        "/transactions/import",
+        files={"file": ("statement", content.encode(), "application/octet-stream")},
+        data=form,
+    )
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+def test_parse_csv_yields_rows_and_errors():
+    rows = list(parse_csv(io.BytesIO(_CSV.encode()), CsvMapping(**{**_MAPPING, "amount_scale": 100})))
+    assert rows[0] == ParsedRow(2, "expense", 1250, "2024-01-15", "Lunch", "Food", "Main")
+    assert rows[1].type == "income" and rows[1].amount_cents == 100000
+    assert isinstance(rows[2], RowError) and rows[2].line == 4
+
+
+def test_parse_csv_reports_missing_columns():
+    rows = list(parse_csv(io.BytesIO(b"when,how much\n2024-01-01,5\n"), CsvMapping()))
+    assert rows == [RowError(1, "missing column(s): date, amount")]
+
+
+def test_parse_ofx_handles_tags_split_across_reads(monkeypatch):
+    monkeypatch.setattr(importer, "_CHUNK", 7)
+    rows = list(parse_ofx(io.BytesIO(_OFX.encode())))
+    assert rows[0] == ParsedRow(1, "expense", 25, "2024-01-15", "Coffee - Card 1234")
+    assert rows[1] == ParsedRow(2, "income", 500, "2024-01-20", "Refund")
+    assert isinstance(rows[2], RowError) and rows[2].line == 3
+
+
+def test_import_csv(client):
+    acc, cat = _seed(client)
+    result = _upload(client, _CSV, **_MAPPING)
+    assert result["imported"] == 2
+    assert result["duplicates"] == 0
+    assert result["failed"] == 2
+    assert [e["line"] for e in result["errors"]] == [4, 5]
+    assert "unknown category" in result["errors"][1]["error"]
+
+    txs = {t["note"]: t for t in client.get("/transactions/").json()}
+    assert txs["Lunch"]["category_id"] == cat["id"]
+    assert txs["Lunch"]["account_id"] == acc["id"]
+    assert txs["Salary"]["amount_cents"] == 100000
+    assert client.get("/accounts/").json()[0]["balance"] == 100000 - 1250
+    assert [t["note"] for t in client.get("/transactions/search", params={"q": "sal"}).json()] == ["Salary"]
+
+
+def test_reimport_skips_duplicates(client):
+    _seed(client)
+    _upload(client, _CSV, **_MAPPING)
+    result = _upload(client, _CSV, **_MAPPING)
+    assert result["imported"] == 0
+    assert result["duplicates"] == 2
+    assert len(client.get("/transactions/").json()) == 2
+    assert client.get("/accounts/").json()[0]["balance"] == 100000 - 1250
+
+
+def test_import_commits_in_chunks(client, monkeypatch):
+    monkeypatch.setattr(config, "IMPORT_CHUNK_SIZE", 3)
+    lines = "".join(f"2024-02-{day:02d},{day},day {day}\n" for day in range(1, 11))
+    result = _upload(client, "date,amount,note\n" + lines)
+    assert result["imported"] == 10
+    assert len(client.get("/transactions/").json()) == 10
+
+
+def test_import_ofx_into_account(client):
+    acc, _ = _seed(client)
+    result = _upload(client, _OFX, format="ofx", account_id=str(acc["id"]))
+    assert result["imported"] == 2
+    assert result["failed"] == 1
+    assert client.get("/accounts/").json()[0]["balance"] == 500 - 25
+
+
+def test_import_unknown_account(client):
+    r = client.post(
+        "/transactions/import",
+        files={"file": ("s.ofx", _OFX.encode())},
+        data={"format": "ofx", "account_id": "999"},
+    )
+    assert r.status_code == 400
+
+
+def test_import_caps_error_report(client, monkeypatch):
+    monkeypatch.setattr("backend.app.routes.transaction.MAX_IMPORT_ERRORS", 2)
+    result = _upload(client, "date,amount\n" + "bad,1\n" * 5)
+    assert result["failed"] == 5
+    assert len(result["errors"]) == 2
+    assert result["errors_truncated"] is True
@@ -0,0 +1,89 @@
+import sqlite3
+
+import pytest
+
+from backend.app.migrations import MIGRATIONS, Migration, MigrationError, migrate, schema_version
+
+_LATEST = MIGRATIONS[-1].version
+
+# Schema as created by the pre-migration-engine init_db(), before any ALTERs ran.
+_LEGACY_SCHEMA = """
+CREATE TABLE categories (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL UNIQUE);
+CREATE TABLE transactions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    type TEXT NOT NULL CHECK (type IN ('income', 'expense')),
+    amount_cents INTEGER NOT NULL,
+    date TEXT NOT NULL,
+    note TEXT,
+    category_id INTEGER REFERENCES categories(id)
+);
+CREATE TABLE accounts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    type TEXT NOT NULL CHECK (type IN ('ewallet', 'bank')),
+    name TEXT NOT NULL,
+    balance INTEGER NOT NULL
+);
+CREATE TABLE users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username TEXT NOT NULL UNIQUE,
+    hashed_password TEXT NOT NULL
+);
+ALTER TABLE categories ADD COLUMN user_id INTEGER REFERENCES users(id);
+INSERT INTO categories (name, user_id) VALUES ('Food', 1);
+"""
+
+
+def _columns(conn, table):
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+@pytest.fixture()
+def conn():
+    c = sqlite3.connect(":memory:")
+    yield c
+    c.close()
+
+
+def test_fresh_database_reaches_latest_version(conn):
+    assert migrate(conn) == _LATEST
+    assert schema_version(conn) == _LATEST
+    assert {"user_id", "account_id"} <= _columns(conn, "transactions")
+
+
+def test_legacy_database_is_adopted(conn):
+    conn.executescript(_LEGACY_SCHEMA)
+    migrate(conn)
+    assert {"user_id", "type", "icon", "color"} <= _columns(conn, "categories")
+    assert {"user_id", "icon", "currency"} <= _columns(conn, "accounts")
+    row = conn.execute("SELECT name, user_id, color FROM categories").fetchone()
+    assert row == ("Food", 1, "amber")
+
+
+def test_up_to_date_boot_is_a_single_read(conn):
+    migrate(conn)
+    statements = []
+    conn.set_trace_callback(statements.append)
+    migrate(conn)
+    conn.set_trace_callback(None)
+    assert len(statements) == 1
+    assert statements[0].startswith("SELECT")
+
+
+def test_edited_migration_is_rejected(conn):
+    migrate(conn)
+    conn.execute("UPDATE schema_version SET checksum = 'tampered' WHERE version = 1")
+    conn.commit()
+    with pytest.raises(MigrationError):
+        migrate(conn)
+
+
+def test_failed_migration_rolls_back_everything(conn):
+    migrate(conn)
+    broken = MIGRATIONS + (
+        Migration(version=_LATEST + 1, name="ok", statements=("CREATE TABLE extra (id INTEGER)",)),
+        Migration(version=_LATEST + 2, name="broken", statements=("CREATE TABLE oops (",)),
+    )
+    with pytest.raises(sqlite3.Error):
+        migrate(conn, broken)
+    assert schema_version(conn) == _LATEST
+    assert conn.execute("SELECT name FROM sqlite_master WHERE name = 'extra'").fetchone() is None
@@ -0,0 +1,75 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from backend.app.__main__ import app
+from backend.app.passwords import PasswordPool, get_password_pool, hash_rounds, needs_rehash
+
+_LOGIN = {"username": "testuser", "password": "testpass"}
+
+
+def _threads(workers):
+    return ThreadPoolExecutor(max_workers=workers)
+
+
+@pytest.fixture()
+def use_pool():
+    def install(pool):
+        app.dependency_overrides[get_password_pool] = lambda: pool
+        return pool
+    yield install
+    app.dependency_overrides.pop(get_password_pool, None)
+
+
+def test_hash_rounds():
+    assert hash_rounds("$2b$04$" + "a" * 53) == 4
+    assert hash_rounds("plain") is None
+    assert needs_rehash("$2b$04$" + "a" * 53, rounds=12)
+
+
+def test_process_pool_hashes_and_verifies():
+    pool = PasswordPool(workers=1, queue_size=0, rounds=4)
+    try:
+        hashed = asyncio.run(pool.hash("secret"))
+        assert hash_rounds(hashed) == 4
+        assert asyncio.run(pool.verify("secret", hashed))
+        assert not asyncio.run(pool.verify("wrong", hashed))
+    finally:
+        pool.close()
+    assert pool.stats()["completed"] == 3
+
+
+def test_saturated_pool_is_503(client, use_pool):
+    pool = use_pool(PasswordPool(workers=1, queue_size=0, executor_factory=_threads))
+    release = threading.Event()
+    blocker = threading.Thread(target=asyncio.run, args=(pool.run(release.wait),))
+    blocker.start()
+    try:
+        while pool.stats()["pending"] == 0:
+            time.sleep(0.001)
+        r = client.post("/auth/token", data=_LOGIN)
+        assert r.status_code == 503 and r.headers["retry-after"] == "1"
+        assert client.post("/auth/register", json={"username": "x", "password": "password"}).status_code == 503
+    finally:
+        release.set()
+        blocker.join()
+    assert pool.stats()["rejected"] == 2
+    assert client.post("/auth/token", data=_LOGIN).status_code == 200
+
+
+def test_login_rehashes_when_rounds_change(client, db_conn, use_pool):
+    def stored():
+        return db_conn.execute("SELECT hashed_password FROM users WHERE username = 'testuser'").fetchone()[0]
+
+    before = stored()
+    pool = use_pool(PasswordPool(workers=1, queue_size=0, rounds=4, executor_factory=_threads))
+    assert client.post("/auth/token", data=_LOGIN).status_code == 200
+    assert hash_rounds(stored()) == 4 and stored() != before
+    rehashed = stored()
+    assert client.post("/auth/token", data=_LOGIN).status_code == 200
+    assert stored() == rehashed
+    assert client.post("/auth/token", data={**_LOGIN, "password": "nope"}).status_code == 401
+    assert pool.stats()["completed"] == 4
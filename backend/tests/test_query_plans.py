@@ -0,0 +1,138 @@
+"""
+Query plan regression tests.
+
+Every statement the model layer issues while serving the API is captured with
+a trace callback and run through EXPLAIN QUERY PLAN. Any SCAN step fails the
+test, whatever name or alias the table goes by, so a query that stops using
+its index (or a new query without one) is caught in CI. The only scans
+allowed are of FTS5 virtual tables, which SQLite reports as a SCAN even when
+the MATCH is answered from the full-text index.
+"""
+import re
+
+import pytest
+
+from backend.app.models.reconcile import find_balance_drift, fix_balance_drift
+from backend.app.models.transaction import encode_cursor, get_transactions_page
+from backend.app.schemas.transaction import TransactionFilter
+
+_FULL_SCAN = re.compile(r"^SCAN (?!\S+ VIRTUAL TABLE INDEX )")
+
+
+def _trace(db_conn):
+    statements = []
+    db_conn.set_trace_callback(statements.append)
+    return statements
+
+
+def _assert_indexed(db_conn, statements):
+    db_conn.set_trace_callback(None)
+    checked = 0
+    for sql in statements:
+        verb = sql.lstrip().split(None, 1)[0].upper()
+        if verb not in ("SELECT", "UPDATE", "DELETE", "INSERT", "WITH"):
+            continue
+        plan = [row[3] for row in db_conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+        scans = [detail for detail in plan if _FULL_SCAN.match(detail)]
+        assert not scans, f"full table scan in {sql!r}: {plan}"
+        checked += 1
+    assert checked, "no statements were captured"
+
+
+def _seed(client):
+    acc = client.post("/accounts/", json={"type": "bank", "name": "Main", "balance": 1000}).json()
+    cat = client.post("/categories/", json={"name": "Food", "type": "expense"}).json()
+    tx = client.post("/transactions/", json={
+        "type": "expense", "amount_cents": 100, "date": "2024-01-15", "note": "lunch",
+        "category_id": cat["id"], "account_id": acc["id"],
+    }).json()
+    return acc, cat, tx
+
+
+_FLOWS = {
+    "list_transactions": lambda c, acc, cat, tx: c.get("/transactions/"),
+    "page_transactions": lambda c, acc, cat, tx: c.get("/transactions/", params={
+        "limit": 1, "cursor": encode_cursor([tx["date"], tx["id"] + 1])}),
+    "filter_transactions": lambda c, acc, cat, tx: c.get("/transactions/", params={
+        "type": "expense", "month": "2024-01", "min_amount": 10, "max_amount": 1000, "limit": 10}),
+    "filter_transactions_by_account": lambda c, acc, cat, tx: c.get("/transactions/", params={
+        "account_id": acc["id"], "date_from": "2024-01-01"}),
+    "filter_transactions_by_category": lambda c, acc, cat, tx: c.get("/transactions/", params={
+        "category_id": cat["id"], "sort": "amount"}),
+    "export_transactions": lambda c, acc, cat, tx: c.get("/transactions/export", params={
+        "format": "ndjson", "account_id": acc["id"], "date_from": "2024-01-01"}),
+    "search_transactions": lambda c, acc, cat, tx: c.get("/transactions/search", params={"q": "lun"}),
+    "transactions_by_note": lambda c, acc, cat, tx: c.get("/transactions/lunch"),
+    "create_transaction": lambda c, acc, cat, tx: c.post("/transactions/", json={
+        "type": "income", "amount_cents": 50, "date": "2024-02-01", "account_id": acc["id"]}),
+    "import_transactions": lambda c, acc, cat, tx: c.post("/transactions/import", files={
+        "file": ("s.csv", b"date,amount,note,category\n2024-03-01,-5,tea,Food\n")}),
+    "update_transaction": lambda c, acc, cat, tx: c.patch(f"/transactions/{tx['id']}", json={
+        "type": "expense", "amount_cents": 200, "date": "2024-01-16", "account_id": acc["id"]}),
+    "delete_transaction": lambda c, acc, cat, tx: c.delete(f"/transactions/{tx['id']}"),
+    "report_summary": lambda c, acc, cat, tx: c.get("/reports/summary", params={"month": "2024-01"}),
+    "list_accounts": lambda c, acc, cat, tx: c.get("/accounts/"),
+    "accounts_by_name": lambda c, acc, cat, tx: c.get("/accounts/Main"),
+    "account_history": lambda c, acc, cat, tx: c.get(f"/accounts/{acc['id']}/history", params={
+        "date_from": "2023-11-01", "date_to": "2024-02-10"}),
+    "update_account": lambda c, acc, cat, tx: c.patch(f"/accounts/{acc['id']}", json={
+        "type": "bank", "name": "Primary", "balance": 5}),
+    "delete_account": lambda c, acc, cat, tx: c.delete(f"/accounts/{acc['id']}"),
+    "list_categories": lambda c, acc, cat, tx: c.get("/categories/"),
+    "update_category": lambda c, acc, cat, tx: c.patch(f"/categories/{cat['id']}", json={"name": "Meals"}),
+    "delete_category": lambda c, acc, cat, tx: c.delete(f"/categories/{cat['id']}"),
+    "sync_full": lambda c, acc, cat, tx: c.get("/sync"),
+    "sync_delta": lambda c, acc, cat, tx: c.get("/sync", params={"since": 1}),
+    "logout": lambda c, acc, cat, tx: c.post("/auth/logout"),
+}
+
+
+@pytest.mark.parametrize("flow", sorted(_FLOWS))
+def test_model_queries_use_indexes(client, db_conn, flow):
+    acc, cat, tx = _seed(client)
+    statements = _trace(db_conn)
+    r = _FLOWS[flow](client, acc, cat, tx)
+    assert r.status_code < 400
+    _assert_indexed(db_conn, statements)
+
+
+def test_user_reconcile_uses_indexes(client, db_conn):
+    acc, cat, tx = _seed(client)
+    statements = _trace(db_conn)
+    find_balance_drift(db_conn, user_id=1)
+    fix_balance_drift(db_conn, [acc["id"]])
+    _assert_indexed(db_conn, statements)
+
+
+def test_detects_full_scan(db_conn):
+    with pytest.raises(AssertionError):
+        _assert_indexed(db_conn, ["SELECT * FROM transactions WHERE amount_cents = 5"])
+
+
+def test_detects_full_scan_through_alias(db_conn):
+    with pytest.raises(AssertionError):
+        _assert_indexed(db_conn, ["SELECT * FROM transactions t WHERE t.amount_cents = 5"])
+
+
+def test_allows_fts_virtual_table_scan(db_conn):
+    _assert_indexed(db_conn, ["SELECT rowid FROM transactions_fts WHERE transactions_fts MATCH 'lunch'"])
+
+
+_PAGE_CURSORS = {
+    "date": ["2024-01-01", 5],
+    "amount": [500, 5],
+    "type": ["expense", "2024-01-01", 5],
+    "id": [5],
+}
+
+
+@pytest.mark.parametrize("order", ["asc", "desc"])
+@pytest.mark.parametrize("sort", sorted(_PAGE_CURSORS))
+def test_transaction_page_needs_no_sort(db_conn, sort, order):
+    filters = TransactionFilter(sort=sort, order=order)
+    statements = _trace(db_conn)
+    get_transactions_page(1, db_conn, 10, encode_cursor(_PAGE_CURSORS[sort], sort, order), filters)
+    db_conn.set_trace_callback(None)
+    plan = [row[3] for row in db_conn.execute(f"EXPLAIN QUERY PLAN {statements[-1]}")]
+    assert not any("TEMP B-TREE" in detail for detail in plan), plan
+    _assert_indexed(db_conn, statements)
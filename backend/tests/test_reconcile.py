@@ -0,0 +1,79 @@
+import sqlite3
+
+import pytest
+
+from backend.app import cli
+from backend.app.db import connect
+from backend.app.migrations import migrate
+from backend.app.models.reconcile import find_balance_drift, fix_balance_drift
+
+_TX = {"type": "expense", "amount_cents": 300, "date": "2024-01-15"}
+
+
+def test_api_writes_leave_no_drift(client, db_conn):
+    acc = client.post("/accounts/", json={"type": "bank", "name": "Main", "balance": 1000}).json()
+    tx = client.post("/transactions/", json={**_TX, "account_id": acc["id"]}).json()
+    client.post("/transactions/bulk", json=[{**_TX, "type": "income", "account_id": acc["id"]}] * 2)
+    client.patch(f"/transactions/{tx['id']}", json={**_TX, "amount_cents": 50, "account_id": acc["id"]})
+    client.patch(f"/accounts/{acc['id']}", json={"type": "bank", "name": "Primary", "balance": 1550})
+    report = find_balance_drift(db_conn)
+    assert (report.accounts, report.transactions, report.drift) == (1, 3, [])
+
+
+def test_balance_edit_shows_as_drift(client, db_conn):
+    acc = client.post("/accounts/", json={"type": "bank", "name": "Main", "balance": 1000}).json()
+    client.post("/transactions/", json={**_TX, "account_id": acc["id"]})
+    client.patch(f"/accounts/{acc['id']}", json={"type": "bank", "name": "Main", "balance": 42})
+    assert db_conn.execute("SELECT opening_balance FROM accounts").fetchone()[0] == 1000
+
+    db_conn.execute("UPDATE accounts SET balance = balance + 8 WHERE id = ?", (acc["id"],))
+    drift = find_balance_drift(db_conn).drift
+    assert [(d["balance"], d["implied"], d["difference"], d["adjustments"], d["unexplained"]) for d in drift] == [
+        (50, 700, -650, -658, 8)
+    ]
+    assert fix_balance_drift(db_conn, [acc["id"]]) == 1
+    assert find_balance_drift(db_conn).drift == []
+    assert db_conn.execute("SELECT adjustments FROM accounts").fetchone()[0] == 0
+
+
+def test_detects_and_fixes_drift(client, db_conn):
+    a = client.post("/accounts/", json={"type": "bank", "name": "A", "balance": 100}).json()
+    b = client.post("/accounts/", json={"type": "bank", "name": "B", "balance": 0}).json()
+    client.post("/transactions/", json={**_TX, "account_id": a["id"]})
+    db_conn.execute("UPDATE accounts SET balance = 999 WHERE id = ?", (a["id"],))
+
+    drift = find_balance_drift(db_conn).drift
+    assert [(d["account_id"], d["balance"], d["implied"], d["difference"]) for d in drift] == [
+        (a["id"], 999, -200, 1199)
+    ]
+    assert fix_balance_drift(db_conn, [a["id"], b["id"]]) == 1
+    assert find_balance_drift(db_conn).drift == []
+    assert client.get("/accounts/A").json()[0]["balance"] == -200
+
+
+def test_cli_reconcile(tmp_path, capsys):
+    path = str(tmp_path / "rec.db")
+    conn = connect(path)
+    migrate(conn)
+    conn.execute("INSERT INTO accounts (type, name, balance, opening_balance, user_id) VALUES ('bank', 'A', 10, 0, 1)")
+    conn.execute("INSERT INTO transactions (type, amount_cents, date, account_id, user_id) VALUES ('income', 7, '2024-01-01', 1, 1)")
+    conn.commit()
+    conn.close()
+
+    assert cli.main(["--db", path, "reconcile"]) == 1
+    out = capsys.readouterr().out
+    assert "ledger implies 7 (+3)" in out and "rows/s" in out
+    assert cli.main(["--db", path, "reconcile", "--fix"]) == 0
+    assert "fixed 1 account(s)" in capsys.readouterr().out
+    assert cli.main(["--db", path, "reconcile", "--user", "1"]) == 0
+
+
+def test_readonly_connection_rejects_writes(tmp_path):
+    path = str(tmp_path / "ro.db")
+    conn = connect(path)
+    migrate(conn)
+    conn.close()
+    reader = connect(path, readonly=True)
+    with pytest.raises(sqlite3.OperationalError):
+        reader.execute("DELETE FROM accounts")
+    reader.close()
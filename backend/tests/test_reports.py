@@ -0,0 +1,54 @@
+def _tx(client, type_, amount, date, **extra):
+    r = client.post("/transactions/", json={"type": type_, "amount_cents": amount, "date": date, **extra})
+    assert r.status_code == 200
+    return r.json()
+
+
+def _summary(client, **params):
+    r = client.get("/reports/summary", params=params)
+    assert r.status_code == 200
+    return r.json()
+
+
+def test_summary_empty_month(client):
+    data = _summary(client, month="2024-03", trend=3)
+    assert data["income"] == data["expense"] == data["balance"] == 0
+    assert data["categories"] == [] and data["recent"] == []
+    assert [m["month"] for m in data["trend"]] == ["2024-01", "2024-02", "2024-03"]
+
+
+def test_summary_totals_and_categories(client):
+    food = client.post("/categories/", json={"name": "Food"}).json()
+    rent = client.post("/categories/", json={"name": "Rent"}).json()
+    _tx(client, "income", 10000, "2024-03-01")
+    _tx(client, "expense", 300, "2024-03-02", category_id=food["id"])
+    _tx(client, "expense", 200, "2024-03-05", category_id=food["id"])
+    _tx(client, "expense", 4000, "2024-03-10", category_id=rent["id"])
+    _tx(client, "expense", 999, "2024-04-01", category_id=food["id"])
+
+    data = _summary(client, month="2024-03")
+    assert (data["income"], data["expense"], data["balance"]) == (10000, 4500, 5500)
+    assert (data["income_count"], data["expense_count"]) == (1, 3)
+    assert [(c["type"], c["category_id"], c["total"], c["count"]) for c in data["categories"]] == [
+        ("expense", rent["id"], 4000, 1),
+        ("expense", food["id"], 500, 2),
+        ("income", None, 10000, 1),
+    ]
+    assert [t["date"] for t in data["recent"]] == ["2024-03-10", "2024-03-05", "2024-03-02", "2024-03-01"]
+
+
+def test_summary_trend_crosses_years(client):
+    _tx(client, "income", 100, "2023-11-20")
+    _tx(client, "expense", 40, "2024-01-03")
+    _tx(client, "expense", 7, "2023-09-30")
+    data = _summary(client, month="2024-01", trend=3)
+    assert data["trend"] == [
+        {"month": "2023-11", "income": 100, "expense": 0},
+        {"month": "2023-12", "income": 0, "expense": 0},
+        {"month": "2024-01", "income": 0, "expense": 40},
+    ]
+
+
+def test_summary_validates_params(client):
+    assert client.get("/reports/summary", params={"month": "2024-13"}).status_code == 422
+    assert client.get("/reports/summary", params={"trend": 0}).status_code == 422
@@ -0,0 +1,52 @@
+import time
+
+from backend.app.models.token import get_revoked_tokens
+from backend.app.revocation import Denylist, get_denylist
+from backend.app.usercache import get_user_cache
+
+_LOGIN = {"username": "testuser", "password": "testpass"}
+
+
+def _bearer(client):
+    token = client.post("/auth/token", data=_LOGIN).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_logout_revokes_only_that_token(client):
+    other = _bearer(client)
+    assert client.get("/accounts/").status_code == 200
+    assert client.post("/auth/logout").status_code == 200
+    assert client.get("/accounts/").status_code == 401
+    assert client.post("/auth/logout").status_code == 401
+    assert client.get("/accounts/", headers=other).status_code == 200
+
+
+def test_revocation_is_persisted_and_reloaded(client, db_conn):
+    assert client.post("/auth/logout").status_code == 200
+    rows = get_revoked_tokens(db_conn)
+    assert len(rows) == 1 and rows[0][1] > time.time()
+    # A fresh process starts with an empty mirror and loads it from the table.
+    get_denylist().clear()
+    get_user_cache().clear()
+    assert client.get("/accounts/").status_code == 401
+    assert len(get_denylist()) == 1
+
+
+def test_expired_rows_are_pruned_on_logout(client, db_conn):
+    db_conn.execute("INSERT INTO revoked_tokens (jti, user_id, expires_at) VALUES ('old', 1, 1)")
+    db_conn.commit()
+    client.post("/auth/logout")
+    assert db_conn.execute("SELECT COUNT(*) FROM revoked_tokens WHERE jti = 'old'").fetchone()[0] == 0
+
+
+def test_denylist_forgets_expired_ids():
+    denylist = Denylist()
+    now = time.time()
+    denylist.load([("live", now + 60), ("dead", now - 1)])
+    assert denylist.is_revoked("live") and not denylist.is_revoked("dead")
+    denylist.add("soon", now + 0.05)
+    assert len(denylist) == 2
+    time.sleep(0.06)
+    assert not denylist.is_revoked("soon")
+    assert len(denylist) == 1
+    assert not denylist.is_revoked(None)
@@ -0,0 +1,70 @@
+from backend.app import cli
+from backend.app.db import connect
+from backend.app.migrations import migrate
+from backend.app.models.rollup import rebuild_rollup, verify_rollup
+
+_TX = {"type": "expense", "amount_cents": 500, "date": "2024-01-15"}
+
+
+def _totals(db_conn):
+    return [
+        tuple(row) for row in db_conn.execute(
+            "SELECT month, type, category_id, account_id, total, count FROM monthly_totals ORDER BY 1, 2, 3, 4"
+        )
+    ]
+
+
+def test_writes_keep_rollup_in_sync(client, db_conn):
+    acc = client.post("/accounts/", json={"type": "bank", "name": "Main", "balance": 0}).json()
+    cat = client.post("/categories/", json={"name": "Food"}).json()
+    a = client.post("/transactions/", json={**_TX, "category_id": cat["id"]}).json()
+    client.post("/transactions/", json={**_TX, "amount_cents": 250, "category_id": cat["id"]})
+    b = client.post("/transactions/", json={**_TX, "type": "income", "date": "2024-02-01"}).json()
+    client.post("/transactions/bulk", json=[{**_TX, "account_id": acc["id"]}] * 3)
+    client.post("/transactions/import", files={"file": ("s.csv", b"date,amount\n2024-03-01,-40\n")})
+    assert _totals(db_conn) == [
+        ("2024-01", "expense", 0, acc["id"], 1500, 3),
+        ("2024-01", "expense", cat["id"], 0, 750, 2),
+        ("2024-02", "income", 0, 0, 500, 1),
+        ("2024-03", "expense", 0, 0, 40, 1),
+    ]
+
+    client.patch(f"/transactions/{a['id']}", json={**_TX, "date": "2024-02-20", "account_id": acc["id"]})
+    client.delete(f"/transactions/{b['id']}")
+    assert _totals(db_conn) == [
+        ("2024-01", "expense", 0, acc["id"], 1500, 3),
+        ("2024-01", "expense", cat["id"], 0, 250, 1),
+        ("2024-02", "expense", 0, acc["id"], 500, 1),
+        ("2024-03", "expense", 0, 0, 40, 1),
+    ]
+    assert verify_rollup(db_conn) == []
+
+
+def test_verify_and_rebuild_repair_drift(client, db_conn):
+    client.post("/transactions/", json=_TX)
+    user_id = db_conn.execute("SELECT id FROM users").fetchone()[0]
+    db_conn.execute(
+        "INSERT INTO transactions (type, amount_cents, date, user_id) VALUES ('income', 99, '2024-05-05', ?)",
+        (user_id,),
+    )
+    db_conn.execute("UPDATE monthly_totals SET total = 1")
+    mismatches = verify_rollup(db_conn)
+    assert {(m["month"], m["expected_total"], m["stored_total"]) for m in mismatches} == {
+        ("2024-01", 500, 1), ("2024-05", 99, 0),
+    }
+    assert rebuild_rollup(db_conn, user_id) == 2
+    assert verify_rollup(db_conn) == []
+
+
+def test_cli_rollup_rebuild_and_verify(tmp_path, capsys):
+    path = str(tmp_path / "cli.db")
+    conn = connect(path)
+    migrate(conn)
+    conn.execute("INSERT INTO users (username, hashed_password) VALUES ('u', 'x')")
+    conn.execute("INSERT INTO transactions (type, amount_cents, date, user_id) VALUES ('expense', 7, '2024-01-01', 1)")
+    conn.commit()
+    conn.close()
+
+    assert cli.main(["--db", path, "rollup", "verify"]) == 1
+    assert cli.main(["--db", path, "rollup", "rebuild", "--verify"]) == 0
+    assert "0 mismatching key(s)" in capsys.readouterr().out
@@ -0,0 +1,85 @@
+from backend.app.models.transaction import search_transactions
+from backend.seed import _clear_user_data, _seed_user_data
+
+_TX = {"type": "expense", "amount_cents": 5000, "date": "2024-01-15"}
+
+
+def _search(client, q, **params):
+    r = client.get("/transactions/search", params={"q": q, **params})
+    assert r.status_code == 200
+    return r.json()
+
+
+def test_search_by_note_prefix(client):
+    client.post("/transactions/", json={**_TX, "note": "Lunch at the cafe"})
+    client.post("/transactions/", json={**_TX, "note": "Groceries"})
+    results = _search(client, "lun")
+    assert [t["note"] for t in results] == ["Lunch at the cafe"]
+
+
+def test_search_requires_every_word(client):
+    client.post("/transactions/", json={**_TX, "note": "coffee beans"})
+    client.post("/transactions/", json={**_TX, "note": "coffee shop"})
+    assert [t["note"] for t in _search(client, "coffee sho")] == ["coffee shop"]
+
+
+def test_search_matches_category_and_account_names(client):
+    cat = client.post("/categories/", json={"name": "Groceries"}).json()
+    acc = client.post("/accounts/", json={"type": "bank", "name": "Mandiri", "balance": 0}).json()
+    client.post("/transactions/", json={**_TX, "note": "weekly shop", "category_id": cat["id"]})
+    client.post("/transactions/", json={**_TX, "note": "transfer", "account_id": acc["id"]})
+    assert [t["note"] for t in _search(client, "grocer")] == ["weekly shop"]
+    assert [t["note"] for t in _search(client, "mandiri")] == ["transfer"]
+
+
+def test_search_ranks_note_hits_first(client):
+    cat = client.post("/categories/", json={"name": "Dinner"}).json()
+    client.post("/transactions/", json={**_TX, "note": "pizza", "category_id": cat["id"]})
+    client.post("/transactions/", json={**_TX, "note": "dinner with friends"})
+    assert [t["note"] for t in _search(client, "dinner")] == ["dinner with friends", "pizza"]
+
+
+def test_search_follows_updates_and_deletes(client):
+    tx = client.post("/transactions/", json={**_TX, "note": "taxi"}).json()
+    client.patch(f"/transactions/{tx['id']}", json={**_TX, "note": "train"})
+    assert _search(client, "taxi") == []
+    assert len(_search(client, "train")) == 1
+    client.delete(f"/transactions/{tx['id']}")
+    assert _search(client, "train") == []
+
+
+def test_search_follows_category_rename(client):
+    cat = client.post("/categories/", json={"name": "Fun"}).json()
+    client.post("/transactions/", json={**_TX, "note": "cinema", "category_id": cat["id"]})
+    client.patch(f"/categories/{cat['id']}", json={"name": "Leisure"})
+    assert _search(client, "fun") == []
+    assert len(_search(client, "leisure")) == 1
+
+
+def test_search_is_scoped_to_user(client):
+    client.post("/transactions/", json={**_TX, "note": "secret"})
+    client.post("/auth/register", json={"username": "other", "password": "pw"})
+    token = client.post("/auth/token", data={"username": "other", "password": "pw"}).json()["access_token"]
+    r = client.get("/transactions/search", params={"q": "secret"}, headers={"Authorization": f"Bearer {token}"})
+    assert r.json() == []
+
+
+def test_search_ignores_fts_syntax(client):
+    client.post("/transactions/", json={**_TX, "note": "rent"})
+    assert _search(client, '"') == []
+    assert len(_search(client, 'rent"*)(:^')) == 1
+
+
+def test_search_only_matches_words_not_the_user_token(client):
+    client.post("/transactions/", json={**_TX, "note": "rent"})
+    # The owner's id is indexed alongside the text but never matched by it.
+    assert _search(client, "1") == []
+
+
+def test_seeded_ledger_is_searchable(db_conn):
+    user_id = db_conn.execute("INSERT INTO users (username, hashed_password) VALUES ('seed', 'x')").lastrowid
+    _seed_user_data(db_conn, user_id)
+    assert search_transactions("rent", user_id, db_conn)
+    assert search_transactions("gcash", user_id, db_conn)
+    _clear_user_data(db_conn, user_id)
+    assert db_conn.execute("SELECT COUNT(*) FROM transactions_fts").fetchone()[0] == 0
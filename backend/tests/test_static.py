@@ -0,0 +1,164 @@
+import asyncio
+import gzip
+import os
+import signal
+
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+from backend.app.compression import APIGZipMiddleware, api_prefixes
+from backend.app.static import IMMUTABLE, REVALIDATE, accepted_encodings, mount_spa, reload_on_sighup
+
+_JS = b"console.log('hello');" * 200
+
+
+@pytest.fixture()
+def spa(tmp_path):
+    assets = tmp_path / "assets"
+    assets.mkdir()
+    (assets / "app-1a2b.js").write_bytes(_JS)
+    (assets / "app-1a2b.js.br").write_bytes(b"brotli bytes")
+    (assets / "app-1a2b.js.gz").write_bytes(gzip.compress(_JS))
+    (assets / "app-1a2b.css").write_bytes(b"body{}")
+    (tmp_path / "index.html").write_bytes(b"<html>spa</html>")
+    (tmp_path / "index.html.gz").write_bytes(gzip.compress(b"<html>spa</html>"))
+    (tmp_path / "favicon.svg").write_bytes(b"<svg/>")
+    app = FastAPI()
+    app.state.spa = mount_spa(app, tmp_path)
+    return tmp_path, TestClient(app)
+
+
+def test_accepted_encodings():
+    assert accepted_encodings("gzip, br;q=0.5, deflate;q=0") == {"gzip", "br"}
+    assert accepted_encodings(None) == set()
+
+
+def test_hashed_assets_are_immutable_and_precompressed(spa):
+    _, client = spa
+    r = client.get("/assets/app-1a2b.js", headers={"Accept-Encoding": "gzip, br"})
+    assert r.headers["content-encoding"] == "br"
+    assert r.headers["cache-control"] == IMMUTABLE
+    assert r.headers["content-type"].startswith("text/javascript")
+    assert "Accept-Encoding" in r.headers["vary"]
+
+    r = client.get("/assets/app-1a2b.js", headers={"Accept-Encoding": "gzip"})
+    assert r.headers["content-encoding"] == "gzip" and r.content == _JS
+
+    r = client.get("/assets/app-1a2b.js", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in r.headers and r.content == _JS
+
+
+def test_stale_sibling_is_ignored(spa):
+    root, client = spa
+    source = root / "assets" / "app-1a2b.js"
+    stat = source.stat()
+    os.utime(source.with_name("app-1a2b.js.br"), (stat.st_atime, stat.st_mtime - 10))
+    client.app.state.spa.reload()
+    r = client.get("/assets/app-1a2b.js", headers={"Accept-Encoding": "br"})
+    assert "content-encoding" not in r.headers
+
+
+def test_conditional_requests(spa):
+    _, client = spa
+    etag = client.get("/assets/app-1a2b.css").headers["etag"]
+    assert client.get("/assets/app-1a2b.css", headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_spa_fallback_revalidates(spa):
+    _, client = spa
+    for path in ("/", "/dashboard/2024-01", "/../../etc/passwd"):
+        r = client.get(path, headers={"Accept-Encoding": "gzip"})
+        assert r.content == b"<html>spa</html>"
+        assert r.headers["cache-control"] == REVALIDATE
+        assert r.headers["content-encoding"] == "gzip"
+    r = client.get("/favicon.svg")
+    assert r.content == b"<svg/>" and r.headers["cache-control"] == REVALIDATE
+
+
+def test_api_json_is_gzipped_above_threshold(client):
+    client.post("/transactions/bulk", json=[{"type": "expense", "amount_cents": 1, "date": "2024-01-01"}] * 50)
+    r = client.get("/transactions/", headers={"Accept-Encoding": "gzip"})
+    assert r.headers["content-encoding"] == "gzip"
+    assert len(r.json()) == 50
+    r = client.get("/categories/", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in r.headers
+
+
+def test_gzipped_api_responses_get_a_weak_etag(client):
+    client.post("/transactions/bulk", json=[{"type": "expense", "amount_cents": 1, "date": "2024-01-01"}] * 50)
+    plain = client.get("/transactions/", headers={"Accept-Encoding": "identity"})
+    gzipped = client.get("/transactions/", headers={"Accept-Encoding": "gzip"})
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert gzipped.headers["etag"] == f"W/{plain.headers['etag']}"
+    assert gzipped.headers["vary"].count("Accept-Encoding") == 1
+    r = client.get("/transactions/", headers={"Accept-Encoding": "gzip", "If-None-Match": gzipped.headers["etag"]})
+    assert r.status_code == 304
+
+
+def test_spa_is_not_gzipped_by_the_api_middleware(tmp_path):
+    (tmp_path / "assets").mkdir()
+    (tmp_path / "assets" / "vendor-9f8e.js").write_bytes(_JS)
+    (tmp_path / "index.html").write_bytes(b"<html>spa</html>" * 100)
+    api = APIRouter(prefix="/api")
+
+    @api.get("/items")
+    def items():
+        return ["item"] * 500
+
+    app = FastAPI()
+    app.include_router(api)
+    app.add_middleware(APIGZipMiddleware, prefixes=api_prefixes(app, api), minimum_size=100, compresslevel=6)
+    mount_spa(app, tmp_path)
+    client = TestClient(app)
+
+    for path in ("/assets/vendor-9f8e.js", "/dashboard"):
+        identity = client.get(path, headers={"Accept-Encoding": "identity"})
+        r = client.get(path, headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in r.headers
+        assert r.content == identity.content
+        assert r.headers["etag"] == identity.headers["etag"]
+        assert r.headers["vary"] == "Accept-Encoding"
+    assert client.get("/api/items", headers={"Accept-Encoding": "gzip"}).headers["content-encoding"] == "gzip"
+
+
+def test_missing_asset_is_404(spa):
+    _, client = spa
+    assert client.get("/assets/app-0000.js").status_code == 404
+
+
+def test_served_from_memory_until_reload(spa):
+    root, client = spa
+    (root / "assets" / "app-1a2b.css").unlink()
+    (root / "index.html").write_bytes(b"<html>new build</html>")
+    r = client.get("/assets/app-1a2b.css")
+    assert r.status_code == 200 and r.content == b"body{}"
+    old_etag = client.get("/").headers["etag"]
+
+    index = client.app.state.spa
+    assert index.reload() == 3
+    assert client.get("/assets/app-1a2b.css").status_code == 404
+    r = client.get("/", headers={"If-None-Match": old_etag, "Accept-Encoding": "identity"})
+    assert r.status_code == 200 and r.content == b"<html>new build</html>"
+    # index.html.gz predates the new index.html, so it is no longer offered.
+    assert "content-encoding" not in client.get("/", headers={"Accept-Encoding": "gzip"}).headers
+
+
+def test_sighup_reloads(spa):
+    root, client = spa
+    index = client.app.state.spa
+    (root / "robots.txt").write_bytes(b"User-agent: *")
+
+    async def hup():
+        stop = reload_on_sighup(index)
+        try:
+            os.kill(os.getpid(), signal.SIGHUP)
+            for _ in range(100):
+                if index.get("robots.txt") is not None:
+                    return
+                await asyncio.sleep(0.01)
+        finally:
+            stop()
+
+    asyncio.run(hup())
+    assert client.get("/robots.txt").content == b"User-agent: *"
@@ -0,0 +1,70 @@
+from backend.app.models.version import reset_sync
+
+_TX = {"type": "expense", "amount_cents": 100, "date": "2024-01-15"}
+
+
+def _sync(client, since=0):
+    r = client.get("/sync", params={"since": since})
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+def test_first_sync_is_a_full_snapshot(client):
+    acc = client.post("/accounts/", json={"type": "bank", "name": "Main", "balance": 0}).json()
+    client.post("/transactions/", json={**_TX, "account_id": acc["id"]})
+    data = _sync(client)
+    assert data["full"] is True
+    assert [a["balance"] for a in data["accounts"]] == [-100]
+    assert len(data["transactions"]) == 1 and data["categories"] == []
+    assert data["version"] == 2
+
+
+def test_delta_returns_only_changes_and_tombstones(client):
+    acc = client.post("/accounts/", json={"type": "bank", "name": "Main", "balance": 0}).json()
+    cat = client.post("/categories/", json={"name": "Food"}).json()
+    kept = client.post("/transactions/", json=_TX).json()
+    gone = client.post("/transactions/", json=_TX).json()
+    since = _sync(client)["version"]
+    assert _sync(client, since) == {
+        "version": since, "full": False, "transactions": [], "accounts": [], "categories": [],
+        "deleted": {"transactions": [], "accounts": [], "categories": []},
+    }
+
+    client.patch(f"/transactions/{kept['id']}", json={**_TX, "amount_cents": 5, "account_id": acc["id"]})
+    client.delete(f"/transactions/{gone['id']}")
+    client.delete(f"/categories/{cat['id']}")
+    data = _sync(client, since)
+    assert data["full"] is False and data["version"] == since + 3
+    assert [(t["id"], t["amount_cents"]) for t in data["transactions"]] == [(kept["id"], 5)]
+    assert [(a["id"], a["balance"]) for a in data["accounts"]] == [(acc["id"], -5)]
+    assert data["deleted"] == {"transactions": [gone["id"]], "accounts": [], "categories": [cat["id"]]}
+
+    # A row changed twice since `since` is reported once, in its latest state.
+    client.patch(f"/transactions/{kept['id']}", json={**_TX, "amount_cents": 7})
+    assert [t["amount_cents"] for t in _sync(client, since)["transactions"]] == [7]
+
+
+def test_bulk_and_import_are_logged(client):
+    since = _sync(client)["version"]
+    ids = client.post("/transactions/bulk", json=[_TX, _TX]).json()["ids"]
+    client.post("/transactions/import", files={"file": ("s.csv", b"date,amount\n2024-02-01,-3\n")})
+    assert sorted(t["id"] for t in _sync(client, since)["transactions"]) == ids + [ids[-1] + 1]
+
+
+def test_sync_floor_forces_full_resync(client, db_conn):
+    client.post("/categories/", json={"name": "Food"})
+    since = _sync(client)["version"]
+    reset_sync(1, db_conn)
+    db_conn.commit()
+    data = _sync(client, since)
+    assert data["full"] is True and len(data["categories"]) == 1
+    assert _sync(client, data["version"])["full"] is False
+    assert _sync(client, data["version"] + 10)["full"] is True
+
+
+def test_sync_is_per_user(client):
+    client.post("/categories/", json={"name": "Food"})
+    client.post("/auth/register", json={"username": "other", "password": "otherpass"})
+    token = client.post("/auth/token", data={"username": "other", "password": "otherpass"}).json()["access_token"]
+    r = client.get("/sync", params={"since": 0}, headers={"Authorization": f"Bearer {token}"})
+    assert r.json()["categories"] == [] and r.json()["version"] == 0
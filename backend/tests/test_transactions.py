@@ -1,3 +1,12 @@
+import json
+import sqlite3
+
+import pytest
+
+from backend.app.models.transaction import create_transactions, encode_cursor
+from backend.app.schemas.transaction import TransactionCreate
+from backend.app.writer import WriteQueue
+
 _TX = {"type": "expense", "amount_cents": 5000, "date": "2024-01-15", "note": "lunch"}
 _TX_INCOME = {"type": "income", "amount_cents": 100000, "date": "2024-01-01", "note": "paycheck"}
 
@@ -77,3 +86,207 @@ def test_transaction_adjusts_account_balance_income(client):
     client.post("/transactions/", json=tx)
     acc_r = client.get(f"/accounts/{acc['name']}").json()
     assert acc_r[0]["balance"] == 20000
+
+
+def _create_many(client, n):
+    for i in range(n):
+        client.post("/transactions/", json={**_TX, "date": f"2024-01-{i % 28 + 1:02d}", "note": f"tx{i}"})
+
+
+def test_list_transactions_unpaginated_by_default(client):
+    _create_many(client, 3)
+    r = client.get("/transactions/")
+    assert isinstance(r.json(), list)
+    assert len(r.json()) == 3
+
+
+def test_paginate_transactions_with_cursor(client):
+    _create_many(client, 7)
+    seen = []
+    r = client.get("/transactions/", params={"limit": 3})
+    while True:
+        assert r.status_code == 200
+        page = r.json()
+        assert len(page["items"]) <= 3
+        seen.extend(page["items"])
+        if page["next_cursor"] is None:
+            break
+        r = client.get("/transactions/", params={"limit": 3, "cursor": page["next_cursor"]})
+    assert len(seen) == 7
+    assert len({t["id"] for t in seen}) == 7
+    keys = [(t["date"], t["id"]) for t in seen]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_paginate_last_page_has_no_cursor(client):
+    _create_many(client, 2)
+    page = client.get("/transactions/", params={"limit": 2}).json()
+    assert len(page["items"]) == 2
+    assert page["next_cursor"] is None
+
+
+def test_paginate_rejects_bad_cursor(client):
+    r = client.get("/transactions/", params={"limit": 2, "cursor": "not-a-cursor"})
+    assert r.status_code == 400
+
+
+@pytest.mark.parametrize("sort, values", [
+    ("date", [{"a": 1}, 2]),
+    ("date", ["2024-01-15", "7"]),
+    ("amount", ["100", 2]),
+    ("type", ["expense", "2024-01-15", True]),
+    ("id", [[1]]),
+])
+def test_paginate_rejects_tampered_cursor_values(client, sort, values):
+    client.post("/transactions/", json=_TX)
+    cursor = encode_cursor(values, sort, "desc")
+    r = client.get("/transactions/", params={"limit": 2, "sort": sort, "order": "desc", "cursor": cursor})
+    assert r.status_code == 400
+
+
+def _seed_filterable(client):
+    acc = client.post("/accounts/", json={"type": "bank", "name": "Main", "balance": 0}).json()
+    cat = client.post("/categories/", json={"name": "Food", "type": "expense"}).json()
+    rows = [
+        {"type": "expense", "amount_cents": 300, "date": "2024-01-10", "category_id": cat["id"]},
+        {"type": "expense", "amount_cents": 100, "date": "2024-02-05", "account_id": acc["id"]},
+        {"type": "income", "amount_cents": 900, "date": "2024-02-20", "account_id": acc["id"]},
+        {"type": "expense", "amount_cents": 500, "date": "2024-03-01", "category_id": cat["id"]},
+    ]
+    for row in rows:
+        client.post("/transactions/", json=row)
+    return acc, cat
+
+
+def test_filter_transactions_by_type(client):
+    _seed_filterable(client)
+    r = client.get("/transactions/", params={"type": "income"})
+    assert [t["amount_cents"] for t in r.json()] == [900]
+
+
+def test_filter_transactions_by_month_and_range(client):
+    _seed_filterable(client)
+    r = client.get("/transactions/", params={"month": "2024-02"})
+    assert {t["date"] for t in r.json()} == {"2024-02-05", "2024-02-20"}
+    r = client.get("/transactions/", params={"date_from": "2024-01-15", "date_to": "2024-03-01"})
+    assert len(r.json()) == 3
+
+
+def test_filter_transactions_by_category_account_and_amount(client):
+    acc, cat = _seed_filterable(client)
+    assert len(client.get("/transactions/", params={"category_id": cat["id"]}).json()) == 2
+    assert len(client.get("/transactions/", params={"account_id": acc["id"]}).json()) == 2
+    r = client.get("/transactions/", params={"min_amount": 200, "max_amount": 600})
+    assert sorted(t["amount_cents"] for t in r.json()) == [300, 500]
+
+
+def test_sort_transactions_by_amount(client):
+    _seed_filterable(client)
+    r = client.get("/transactions/", params={"sort": "amount", "order": "asc"})
+    assert [t["amount_cents"] for t in r.json()] == [100, 300, 500, 900]
+
+
+def test_paginate_filtered_and_sorted(client):
+    _seed_filterable(client)
+    params = {"type": "expense", "sort": "amount", "order": "desc", "limit": 2}
+    page = client.get("/transactions/", params=params).json()
+    assert [t["amount_cents"] for t in page["items"]] == [500, 300]
+    page = client.get("/transactions/", params={**params, "cursor": page["next_cursor"]}).json()
+    assert [t["amount_cents"] for t in page["items"]] == [100]
+    assert page["next_cursor"] is None
+
+
+def test_cursor_from_another_sort_is_rejected(client):
+    _seed_filterable(client)
+    page = client.get("/transactions/", params={"limit": 1}).json()
+    r = client.get("/transactions/", params={"limit": 1, "sort": "amount", "cursor": page["next_cursor"]})
+    assert r.status_code == 400
+
+
+def test_invalid_filter_is_rejected(client):
+    assert client.get("/transactions/", params={"month": "2024-13"}).status_code == 422
+    for bad in ("2024-1-5", "foo", "2024-01-32", "2024-01-15T00:00"):
+        assert client.get("/transactions/", params={"date_from": bad}).status_code == 422
+        assert client.get("/transactions/", params={"date_to": bad}).status_code == 422
+        assert client.get("/transactions/export", params={"date_from": bad}).status_code == 422
+    assert client.get("/transactions/", params={"sort": "note"}).status_code == 422
+
+
+def test_bulk_create_transactions(client):
+    acc = client.post("/accounts/", json={"type": "bank", "name": "Bulk", "balance": 1000}).json()
+    items = [
+        {**_TX, "account_id": acc["id"], "amount_cents": 100, "note": "alpha"},
+        {**_TX_INCOME, "account_id": acc["id"], "amount_cents": 500, "note": "bravo"},
+        {**_TX, "amount_cents": 50, "note": "charlie"},
+    ]
+    r = client.post("/transactions/bulk", json=items)
+    assert r.status_code == 200
+    ids = r.json()["ids"]
+    assert len(ids) == 3
+    listed = {t["id"]: t["note"] for t in client.get("/transactions/").json()}
+    assert [listed[i] for i in ids] == ["alpha", "bravo", "charlie"]
+    assert client.get("/accounts/Bulk").json()[0]["balance"] == 1400
+    assert len(client.get("/transactions/search", params={"q": "bravo"}).json()) == 1
+
+
+def test_bulk_create_validates_every_item(client):
+    r = client.post("/transactions/bulk", json=[_TX, {**_TX, "type": "transfer"}])
+    assert r.status_code == 422
+    assert client.get("/transactions/").json() == []
+
+
+def test_bulk_create_rejects_empty_list(client):
+    assert client.post("/transactions/bulk", json=[]).status_code == 422
+
+
+def test_bulk_create_is_all_or_nothing(db_conn):
+    db_conn.execute("INSERT INTO accounts (type, name, balance, user_id) VALUES ('bank', 'A', 0, 1)")
+    db_conn.commit()
+    good = TransactionCreate(**{**_TX, "account_id": 1})
+    bad = TransactionCreate.model_construct(**{**_TX, "type": "bogus", "account_id": 1})
+    writer = WriteQueue(connection_factory=lambda: db_conn, owns_connection=False)
+    try:
+        with pytest.raises(sqlite3.IntegrityError):
+            writer.execute(create_transactions, [good, bad], 1)
+    finally:
+        writer.close()
+    assert db_conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0] == 0
+    assert db_conn.execute("SELECT balance FROM accounts").fetchone()[0] == 0
+
+
+def _export(client, **params):
+    r = client.get("/transactions/export", params=params)
+    assert r.status_code == 200
+    return r
+
+
+def test_export_csv(client, monkeypatch):
+    monkeypatch.setattr("backend.app.routes.transaction.EXPORT_BATCH_SIZE", 2)
+    for day in range(1, 6):
+        client.post("/transactions/", json={**_TX, "date": f"2024-01-{day:02d}", "note": f"n,{day}"})
+    r = _export(client, format="csv", order="asc")
+    assert r.headers["content-type"].startswith("text/csv")
+    assert "attachment" in r.headers["content-disposition"]
+    lines = r.text.splitlines()
+    assert lines[0] == "id,type,amount_cents,date,note,category_id,account_id"
+    assert len(lines) == 6
+    assert lines[1].endswith(',expense,5000,2024-01-01,"n,1",,')
+
+
+def test_export_ndjson_filtered(client):
+    acc = client.post("/accounts/", json={"type": "bank", "name": "Main", "balance": 0}).json()
+    client.post("/transactions/", json={**_TX, "date": "2024-01-10", "account_id": acc["id"]})
+    client.post("/transactions/", json={**_TX, "date": "2024-02-10", "account_id": acc["id"]})
+    client.post("/transactions/", json={**_TX, "date": "2024-02-11"})
+    r = _export(client, format="ndjson", account_id=acc["id"], date_from="2024-02-01")
+    assert r.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in r.text.splitlines()]
+    assert [(row["date"], row["account_id"]) for row in rows] == [("2024-02-10", acc["id"])]
+
+
+def test_export_empty_csv_has_header(client):
+    assert _export(client).text.splitlines() == ["id,type,amount_cents,date,note,category_id,account_id"]
+
+
+def test_export_rejects_unknown_format(client):
+    assert client.get("/transactions/export", params={"format": "xml"}).status_code == 422
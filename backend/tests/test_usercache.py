@@ -0,0 +1,77 @@
+import asyncio
+import time
+
+from backend.app import auth, db
+from backend.app.db import ConnectionPool
+from backend.app.usercache import UserCache
+
+_USER = {"id": 1, "username": "alice"}
+
+
+def _stats(client):
+    return client.get("/metrics/auth").json()
+
+
+def test_token_is_resolved_from_cache(client, monkeypatch):
+    lookups = []
+    real = auth.get_user_by_username
+    monkeypatch.setattr(auth, "get_user_by_username", lambda *args: lookups.append(args[0]) or real(*args))
+    for _ in range(3):
+        assert client.get("/accounts/").status_code == 200
+    # The first request after login fills the cache; later ones never query users.
+    assert lookups == ["testuser"]
+    assert _stats(client)["hits"] >= 2
+
+
+def test_cache_hit_takes_no_connection(tmp_path, monkeypatch):
+    pool = ConnectionPool(str(tmp_path / "auth.db"), size=1)
+    monkeypatch.setattr(db, "_pool", pool)
+    token = auth.create_access_token({"sub": "alice"})
+    auth.get_user_cache().put(token, _USER, time.time() + 60, auth.get_user_cache().generation())
+
+    async def main():
+        return await auth.get_current_user(token, db.get_checkout())
+
+    assert asyncio.run(main()) == _USER
+    assert pool.stats()["checkouts"] == 0
+    auth.get_user_cache().discard(token)
+    pool.close()
+
+
+def test_bad_tokens_are_not_cached(client):
+    r = client.get("/accounts/", headers={"Authorization": "Bearer garbage"})
+    assert r.status_code == 401
+    assert _stats(client)["entries"] == 1
+
+
+def test_expiry_and_ttl():
+    cache = UserCache(ttl=60, max_entries=10)
+    assert not cache.put("expired", _USER, time.time() - 1, cache.generation())
+    assert cache.put("soon", _USER, time.time() + 0.05, cache.generation())
+    assert cache.get("soon") == _USER
+    time.sleep(0.06)
+    assert cache.get("soon") is None
+    assert not UserCache(ttl=0, max_entries=10).put("t", _USER, time.time() + 60, 0)
+
+
+def test_invalidate_and_stale_generation():
+    cache = UserCache(ttl=60, max_entries=10)
+    exp = time.time() + 60
+    generation = cache.generation()
+    cache.put("a1", _USER, exp, generation)
+    cache.put("b1", {"id": 2, "username": "bob"}, exp, generation)
+    cache.invalidate("alice")
+    assert cache.get("a1") is None and cache.get("b1") is not None
+    # A lookup that started before the invalidation must not be cached.
+    assert not cache.put("a2", _USER, exp, generation)
+
+
+def test_lru_bound():
+    cache = UserCache(ttl=60, max_entries=2)
+    exp = time.time() + 60
+    for token in ("t1", "t2"):
+        cache.put(token, _USER, exp, cache.generation())
+    cache.get("t1")
+    cache.put("t3", _USER, exp, cache.generation())
+    assert cache.get("t2") is None and cache.get("t1") is not None
+    assert cache.stats()["evictions"] == 1
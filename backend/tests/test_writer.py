@@ -0,0 +1,87 @@
+import sqlite3
+import threading
+
+import pytest
+
+from backend.app.writer import WriteQueue, WriteQueueFull
+
+
+@pytest.fixture()
+def writer(tmp_path):
+    path = str(tmp_path / "writer.db")
+    setup = sqlite3.connect(path)
+    setup.execute("CREATE TABLE t (x INTEGER)")
+    setup.commit()
+    setup.close()
+    w = WriteQueue(connection_factory=lambda: sqlite3.connect(path, check_same_thread=False))
+    yield w
+    w.close()
+
+
+def _insert(value, conn):
+    conn.execute("INSERT INTO t VALUES (?)", (value,))
+    conn.commit()
+    return threading.current_thread().name
+
+
+def _count(conn):
+    return conn.execute("SELECT COUNT(*) FROM t").fetchone()[0]
+
+
+def test_units_run_on_the_writer_thread(writer):
+    assert writer.execute(_insert, 1) == "db-writer"
+    assert writer.execute(_count) == 1
+
+
+def test_concurrent_submitters_are_serialised(writer):
+    threads = [threading.Thread(target=writer.execute, args=(_insert, i)) for i in range(20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert writer.execute(_count) == 20
+    assert writer.stats()["completed"] == 21
+
+
+def test_failed_unit_is_rolled_back_and_reraised(writer):
+    def _boom(conn):
+        conn.execute("INSERT INTO t VALUES (99)")
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        writer.execute(_boom)
+    assert writer.execute(_count) == 0
+    assert writer.stats()["failed"] == 1
+
+
+def test_full_queue_rejects(tmp_path):
+    running, gate = threading.Event(), threading.Event()
+    w = WriteQueue(connection_factory=lambda: sqlite3.connect(":memory:", check_same_thread=False),
+                   maxsize=1, timeout=0.05)
+    w.submit(lambda conn: (running.set(), gate.wait()))
+    try:
+        assert running.wait(2)
+        # The writer holds the first unit; one more fits in the queue.
+        w.submit(lambda conn: None)
+        with pytest.raises(WriteQueueFull):
+            w.submit(lambda conn: None)
+        assert w.stats()["rejected"] == 1
+    finally:
+        gate.set()
+        w.close()
+
+
+def test_stats_track_depth_and_wait(writer):
+    writer.execute(_insert, 1)
+    stats = writer.stats()
+    assert stats["depth"] == 0
+    assert stats["max_depth"] >= 1
+    assert stats["wait_seconds_avg"] >= 0
+
+
+def test_writer_metrics_endpoint(client):
+    client.post("/categories/", json={"name": "Food"})
+    r = client.get("/metrics/writer")
+    assert r.status_code == 200
+    assert {"depth", "max_depth", "wait_seconds_avg", "completed"} <= r.json().keys()
+    assert r.json()["completed"] >= 1
@@ -38,3 +38,15 @@ export async function deleteAccount(id) {
   const res = await fetchWithAuth(`${BASE}/${id}`, { method: 'DELETE' })
   if (!res.ok) throw new Error('Failed to delete account')
 }
+
+// Month-end balances between dateFrom and dateTo (YYYY-MM-DD, both optional;
+// default is the last 12 months). Returns { account_id, points: [{ date, balance }] }.
+export async function getAccountHistory(id, dateFrom, dateTo) {
+  const q = new URLSearchParams()
+  if (dateFrom) q.set('date_from', dateFrom)
+  if (dateTo) q.set('date_to', dateTo)
+  const qs = q.toString()
+  const res = await fetchWithAuth(`${BASE}/${id}/history${qs ? `?${qs}` : ''}`)
+  if (!res.ok) throw new Error('Failed to fetch account history')
+  return res.json()
+}
@@ -0,0 +1,15 @@
+import fetchWithAuth from './fetchWithAuth'
+
+const BASE = `${import.meta.env.VITE_API_BASE ?? ''}/reports`
+
+// Dashboard aggregates for one month (YYYY-MM): income/expense totals and
+// counts, per-category totals, a `trend`-month series ending at that month
+// and the month's most recent transactions.
+async function getSummary(month, trend = 6) {
+    const q = new URLSearchParams({ month, trend: String(trend) });
+    const res = await fetchWithAuth(`${BASE}/summary?${q}`);
+    if (!res.ok) throw new Error("Failed to fetch summary");
+    return await res.json();
+}
+
+export { getSummary }
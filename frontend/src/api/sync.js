@@ -0,0 +1,16 @@
+import fetchWithAuth from './fetchWithAuth'
+
+const BASE = `${import.meta.env.VITE_API_BASE ?? ''}/sync`
+
+// Rows changed since the data version a client last synced at (0 = none).
+// When `full` is true the response is a complete snapshot that replaces the
+// local copy; otherwise apply the upserted rows and the `deleted` ids, then
+// keep `version` for the next call.
+async function getChanges(since = 0) {
+    const q = new URLSearchParams({ since: String(since) });
+    const res = await fetchWithAuth(`${BASE}?${q}`);
+    if (!res.ok) throw new Error("Failed to sync");
+    return await res.json();
+}
+
+export { getChanges }
@@ -2,12 +2,40 @@ import fetchWithAuth from './fetchWithAuth'
 
 const BASE = `${import.meta.env.VITE_API_BASE ?? ''}/transactions`
 
-async function getTransactions() {
-    const res = await fetchWithAuth(`${BASE}/`);
+// Optional filters are passed straight through as query parameters:
+// type, month (YYYY-MM), date_from, date_to, category_id, account_id,
+// min_amount, max_amount, sort (date|amount|type|id), order (asc|desc).
+function toQuery(params = {}) {
+    const q = new URLSearchParams();
+    for (const [k, v] of Object.entries(params)) {
+        if (v !== undefined && v !== null && v !== "") q.set(k, String(v));
+    }
+    const str = q.toString();
+    return str ? `?${str}` : "";
+}
+
+async function getTransactions(filters = {}) {
+    const res = await fetchWithAuth(`${BASE}/${toQuery(filters)}`);
+    if (!res.ok) throw new Error("Failed to fetch transactions");
+    return await res.json();
+}
+
+// Fetches one page (newest first). Pass the previous page's next_cursor to
+// continue; next_cursor is null on the last page.
+async function getTransactionsPage(limit = 50, cursor = null, filters = {}) {
+    const res = await fetchWithAuth(`${BASE}/${toQuery({ ...filters, limit, cursor })}`);
     if (!res.ok) throw new Error("Failed to fetch transactions");
     return await res.json();
 }
 
+// Ranked full-text search over notes, category names and account names.
+// Every word matches as a prefix ("gro sup" finds "Grocery supplies").
+async function searchTransactions(q, limit = 20) {
+    const res = await fetchWithAuth(`${BASE}/search${toQuery({ q, limit })}`);
+    if (!res.ok) throw new Error("Failed to search transactions");
+    return await res.json();
+}
+
 async function getTransaction(id) {
     const res = await fetchWithAuth(`${BASE}/${id}`, {
         method: "GET"
@@ -35,6 +63,41 @@ async function addTransaction(transaction) {
     return res.json();
 }
 
+// Creates many transactions in one all-or-nothing request. Returns { ids }.
+async function addTransactionsBulk(transactions) {
+    const res = await fetchWithAuth(`${BASE}/bulk`, {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify(transactions),
+    });
+    if (!res.ok) throw new Error("Failed to add transactions");
+    return res.json();
+}
+
+// Uploads a CSV or OFX bank statement. `options` holds the form fields:
+// format (csv|ofx), account_id, and the CSV column mapping (date_column,
+// amount_column, note_column, type_column, category_column, account_column,
+// date_format, amount_scale, delimiter).
+// Returns { imported, duplicates, failed, errors, errors_truncated }.
+async function importTransactions(file, options = {}) {
+    const form = new FormData();
+    form.append("file", file);
+    for (const [k, v] of Object.entries(options)) {
+        if (v !== undefined && v !== null && v !== "") form.append(k, String(v));
+    }
+    const res = await fetchWithAuth(`${BASE}/import`, { method: "POST", body: form });
+    if (!res.ok) throw new Error("Failed to import transactions");
+    return res.json();
+}
+
+// Downloads every matching transaction as a Blob (format: csv|ndjson).
+// Accepts the same filters as getTransactions.
+async function exportTransactions(format = "csv", filters = {}) {
+    const res = await fetchWithAuth(`${BASE}/export${toQuery({ ...filters, format })}`);
+    if (!res.ok) throw new Error("Failed to export transactions");
+    return res.blob();
+}
+
 async function deleteTransaction(id) {
     const res = await fetchWithAuth(`${BASE}/${id}`, {
         method: "DELETE"
@@ -63,4 +126,4 @@ async function editTransaction(id, transaction) {
 }
 
 
-export { getTransactions, getTransaction, addTransaction, deleteTransaction, editTransaction }
\ No newline at end of file
+export { getTransactions, getTransactionsPage, searchTransactions, getTransaction, addTransaction, addTransactionsBulk, importTransactions, exportTransactions, deleteTransaction, editTransaction }
\ No newline at end of file
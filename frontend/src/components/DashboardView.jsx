@@ -1,5 +1,5 @@
 import React, { useEffect, useState, useMemo } from 'react'
-import { getTransactions } from '../api/transactions'
+import { getSummary } from '../api/reports'
 import { getCategories } from '../api/categories'
 import { getAccounts } from '../api/accounts'
 import { useCurrency } from '../context/CurrencyContext'
@@ -72,7 +72,7 @@ export default function DashboardView() {
   const now = new Date()
   const currentMonth = `${now.getFullYear()}-${String(now.getMonth() + 1).padStart(2, '0')}`
   const [selectedMonth, setSelectedMonth] = useState(currentMonth)
-  const [transactions, setTransactions] = useState([])
+  const [summary, setSummary]           = useState(null)
   const [categories, setCategories]     = useState([])
   const [accounts, setAccounts]         = useState([])
   const [loading, setLoading]           = useState(true)
@@ -81,19 +81,27 @@ export default function DashboardView() {
 
   useEffect(() => {
     let mounted = true
-    Promise.all([getTransactions(), getCategories(), getAccounts()])
-      .then(([txs, cats, accs]) => {
+    Promise.all([getCategories(), getAccounts()])
+      .then(([cats, accs]) => {
         if (mounted) {
-          setTransactions(txs)
           setCategories(cats)
           setAccounts(accs)
         }
       })
       .catch(err => { if (mounted) setError(err.message) })
-      .finally(() => { if (mounted) setLoading(false) })
     return () => { mounted = false }
   }, [])
 
+  // Totals, category breakdown, trend and recent rows are aggregated server-side.
+  useEffect(() => {
+    let mounted = true
+    getSummary(selectedMonth, 6)
+      .then(data => { if (mounted) setSummary(data) })
+      .catch(err => { if (mounted) setError(err.message) })
+      .finally(() => { if (mounted) setLoading(false) })
+    return () => { mounted = false }
+  }, [selectedMonth])
+
   // Total balance grouped by currency
   const accountTotals = useMemo(() => {
     const map = {}
@@ -117,14 +125,12 @@ export default function DashboardView() {
     return opts
   }, [])
 
-  const monthTxs = useMemo(
-    () => transactions.filter(t => t.date.startsWith(selectedMonth)),
-    [transactions, selectedMonth]
-  )
-
-  const monthIncome  = monthTxs.filter(t => t.type === 'income').reduce((s, t) => s + t.amount_cents, 0)
-  const monthExpense = monthTxs.filter(t => t.type === 'expense').reduce((s, t) => s + t.amount_cents, 0)
-  const monthBalance = monthIncome - monthExpense
+  const monthIncome  = summary?.income ?? 0
+  const monthExpense = summary?.expense ?? 0
+  const monthBalance = summary?.balance ?? 0
+  const incomeCount  = summary?.income_count ?? 0
+  const expenseCount = summary?.expense_count ?? 0
+  const monthCount   = incomeCount + expenseCount
 
   const pieData = useMemo(() => {
     const total = monthIncome + monthExpense
@@ -135,11 +141,12 @@ export default function DashboardView() {
     ]
   }, [monthIncome, monthExpense])
 
-  const buildCatPie = (txs) => {
+  const buildCatPie = (type) => {
     const totals = {}
-    txs.forEach(t => {
-      const name = categories.find(c => c.id === t.category_id)?.name ?? 'Uncategorized'
-      totals[name] = (totals[name] || 0) + t.amount_cents
+    const rows = (summary?.categories ?? []).filter(c => c.type === type)
+    rows.forEach(c => {
+      const name = categories.find(cat => cat.id === c.category_id)?.name ?? 'Uncategorized'
+      totals[name] = (totals[name] || 0) + c.total
     })
     const total = Object.values(totals).reduce((s, v) => s + v, 0)
     if (total === 0) return []
@@ -152,26 +159,19 @@ export default function DashboardView() {
       }))
   }
   // eslint-disable-next-line react-hooks/exhaustive-deps
-  const incomeCatData  = useMemo(() => buildCatPie(monthTxs.filter(t => t.type === 'income')),  [monthTxs, categories])
+  const incomeCatData  = useMemo(() => buildCatPie('income'),  [summary, categories])
   // eslint-disable-next-line react-hooks/exhaustive-deps
-  const expenseCatData = useMemo(() => buildCatPie(monthTxs.filter(t => t.type === 'expense')), [monthTxs, categories])
+  const expenseCatData = useMemo(() => buildCatPie('expense'), [summary, categories])
 
-  const barData = useMemo(() => {
-    return Array.from({ length: 6 }, (_, i) => {
-      const d = new Date(now.getFullYear(), now.getMonth() - (5 - i), 1)
-      const key = `${d.getFullYear()}-${String(d.getMonth() + 1).padStart(2, '0')}`
-      const txs = transactions.filter(t => t.date.startsWith(key))
-      return {
-        month:   MONTHS[d.getMonth()],
-        income:  txs.filter(t => t.type === 'income').reduce((s, t) => s + t.amount_cents, 0),
-        expense: txs.filter(t => t.type === 'expense').reduce((s, t) => s + t.amount_cents, 0),
-      }
-    })
-  }, [transactions])
+  const barData = useMemo(() =>
+    (summary?.trend ?? []).map(m => ({
+      month:   MONTHS[Number(m.month.slice(5, 7)) - 1],
+      income:  m.income,
+      expense: m.expense,
+    }))
+  , [summary])
 
-  const recent = useMemo(() =>
-    [...monthTxs].sort((a, b) => b.date.localeCompare(a.date) || b.id - a.id).slice(0, 7)
-  , [monthTxs])
+  const recent = summary?.recent ?? []
 
   if (loading) return (
     <div className='flex items-center justify-center py-32'>
@@ -196,7 +196,7 @@ export default function DashboardView() {
             Overview
           </h1>
           <p className='text-slate-500 text-sm mt-1'>
-            {monthTxs.length} transaction{monthTxs.length !== 1 ? 's' : ''} this month
+            {monthCount} transaction{monthCount !== 1 ? 's' : ''} this month
           </p>
         </div>
         <select
@@ -213,14 +213,14 @@ export default function DashboardView() {
         <StatCard
           label='Monthly Income'
           value={fmt(monthIncome)}
-          sub={`${monthTxs.filter(t => t.type === 'income').length} transactions`}
+          sub={`${incomeCount} transactions`}
           color='bg-emerald-500/15 text-emerald-400'
           icon={<svg className='w-5 h-5' fill='none' stroke='currentColor' strokeWidth='2' viewBox='0 0 24 24'><path strokeLinecap='round' strokeLinejoin='round' d='M7 11l5-5m0 0l5 5m-5-5v12' /></svg>}
         />
         <StatCard
           label='Monthly Expenses'
           value={fmt(monthExpense)}
-          sub={`${monthTxs.filter(t => t.type === 'expense').length} transactions`}
+          sub={`${expenseCount} transactions`}
           color='bg-rose-500/15 text-rose-400'
           icon={<svg className='w-5 h-5' fill='none' stroke='currentColor' strokeWidth='2' viewBox='0 0 24 24'><path strokeLinecap='round' strokeLinejoin='round' d='M17 13l-5 5m0 0l-5-5m5 5V6' /></svg>}
         />
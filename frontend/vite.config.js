@@ -1,14 +1,53 @@
 import { defineConfig } from 'vite';
 import react from '@vitejs/plugin-react';
-import { readFileSync } from 'fs';
+import { readdirSync, readFileSync, writeFileSync } from 'fs';
 import { resolve } from 'path';
+import { brotliCompressSync, constants, gzipSync } from 'zlib';
 
 const { version } = JSON.parse(
   readFileSync(resolve(__dirname, 'package.json'), 'utf-8')
 )
 
+// Writes .br and .gz siblings next to every compressible build output so the
+// backend can send them as-is instead of compressing per request
+// (backend/app/static.py). Files under `threshold` bytes are left alone.
+function precompress({ threshold = 1024 } = {}) {
+  const compressible = /\.(js|mjs|css|html|svg|json|txt|map|webmanifest)$/;
+  let outDir;
+  const walk = (dir) => readdirSync(dir, { withFileTypes: true }).flatMap((entry) => {
+    const path = resolve(dir, entry.name);
+    return entry.isDirectory() ? walk(path) : [path];
+  });
+  return {
+    name: 'precompress',
+    apply: 'build',
+    configResolved(config) {
+      outDir = resolve(config.root, config.build.outDir);
+    },
+    closeBundle() {
+      for (const file of walk(outDir)) {
+        if (!compressible.test(file)) continue;
+        const data = readFileSync(file);
+        if (data.length < threshold) continue;
+        const variants = {
+          '.br': brotliCompressSync(data, {
+            params: {
+              [constants.BROTLI_PARAM_QUALITY]: constants.BROTLI_MAX_QUALITY,
+              [constants.BROTLI_PARAM_SIZE_HINT]: data.length,
+            },
+          }),
+          '.gz': gzipSync(data, { level: 9 }),
+        };
+        for (const [suffix, compressed] of Object.entries(variants)) {
+          if (compressed.length < data.length) writeFileSync(file + suffix, compressed);
+        }
+      }
+    },
+  };
+}
+
 export default defineConfig({
-  plugins: [react()],
+  plugins: [react(), precompress()],
   define: {
     __APP_VERSION__: JSON.stringify(version),
   },